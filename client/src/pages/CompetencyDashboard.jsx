@@ -14,8 +14,11 @@ import {
   AlertIcon,
   Input,
   Collapse,
+  Button,
 } from "@chakra-ui/react";
 
+const API_BASE_URL = "https://interviewappbe-production.up.railway.app";
+
 const CompetencyDashboard = () => {
   const [competencyHistory, setCompetencyHistory] = useState([]);
   const [trends, setTrends] = useState([]);
@@ -24,32 +27,40 @@ const CompetencyDashboard = () => {
   const [error, setError] = useState(null);
   const [searchTerm, setSearchTerm] = useState("");
   const [expandedRows, setExpandedRows] = useState({});
+  // The history endpoint returns one page at a time; its next cursor comes in X-Next-Cursor
+  const [historyCursor, setHistoryCursor] = useState(null);
+  const [trendsCursor, setTrendsCursor] = useState(null);
 
-  useEffect(() => {
-    const fetchRecentChanges = async () => {
-      setLoading(true);
-      setError(null);
-
-      try {
-        const response = await fetch("https://interviewappbe-production.up.railway.app/api/get-trends-over-time");
-        if (!response.ok) throw new Error(`❌ Failed to fetch competency trends (${response.status})`);
-
-        const data = await response.json();
-        setTrends(data.trends || []);
-      } catch (err) {
-        setError(err.message);
-      } finally {
-        setLoading(false);
-      }
-    };
+  const fetchRecentChanges = async (cursor = null) => {
+    setLoading(true);
+    setError(null);
+
+    try {
+      const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+      const response = await fetch(`${API_BASE_URL}/api/get-trends-over-time${params}`);
+      if (!response.ok) throw new Error(`❌ Failed to fetch competency trends (${response.status})`);
 
+      const data = await response.json();
+      setTrends((prev) => (cursor ? [...prev, ...data] : data));
+      setTrendsCursor(response.headers.get("X-Next-Cursor"));
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  useEffect(() => {
     fetchRecentChanges();
   }, []);
 
-  const fetchCompetencyHistory = async (competency) => {
+  const fetchCompetencyHistory = async (competency, cursor = null) => {
     setLoading(true);
     setError(null);
-    setCompetencyHistory([]);
+    if (!cursor) {
+      setCompetencyHistory([]);
+      setHistoryCursor(null);
+    }
 
     if (!competency) {
       setLoading(false);
@@ -57,13 +68,15 @@ const CompetencyDashboard = () => {
     }
 
     try {
+      const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
       const response = await fetch(
-        `https://interviewappbe-production.up.railway.app/api/get-competency-history/${competency}`
+        `${API_BASE_URL}/api/get-competency-history/${encodeURIComponent(competency)}${params}`
       );
       if (!response.ok) throw new Error(`❌ Failed to fetch competency history (${response.status})`);
 
       const data = await response.json();
-      setCompetencyHistory(data.history || []);
+      setCompetencyHistory((prev) => (cursor ? [...prev, ...data] : data));
+      setHistoryCursor(response.headers.get("X-Next-Cursor"));
     } catch (err) {
       setError(err.message);
     } finally {
@@ -117,6 +130,12 @@ const CompetencyDashboard = () => {
         ))}
       </Select>
 
+      {trendsCursor && (
+        <Button size="sm" variant="link" mt="2" onClick={() => fetchRecentChanges(trendsCursor)} isLoading={loading}>
+          Load older months
+        </Button>
+      )}
+
       <Table variant="simple" mt="6">
         <Thead>
           <Tr>
@@ -175,6 +194,14 @@ const CompetencyDashboard = () => {
             ))}
         </Tbody>
       </Table>
+
+      {historyCursor && (
+        <Box display="flex" justifyContent="center" mt="4">
+          <Button onClick={() => fetchCompetencyHistory(selectedCompetency, historyCursor)} isLoading={loading}>
+            Load more
+          </Button>
+        </Box>
+      )}
     </Box>
   );
 };
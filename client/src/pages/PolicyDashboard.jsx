@@ -25,6 +25,8 @@ const PolicyDashboard = () => {
   const toast = useToast();
   const [policies, setPolicies] = useState([]);
   const [loadingPolicies, setLoadingPolicies] = useState(false);
+  // get-policies returns one page at a time; next_cursor fetches the next one
+  const [policiesCursor, setPoliciesCursor] = useState(null);
   const [uploadText, setUploadText] = useState("");
   const [chatQuery, setChatQuery] = useState("");
   const [chatResponse, setChatResponse] = useState("");
@@ -35,15 +37,17 @@ const PolicyDashboard = () => {
   const [chatMessages, setChatMessages] = useState([]); // {sender: 'user'|'bot', text: string}
 
   // Fetch policies from backend
-  const fetchPolicies = async () => {
+  const fetchPolicies = async (cursor = null) => {
     setLoadingPolicies(true);
     try {
+      const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
       const response = await fetch(
-        "https://interviewappbe-production.up.railway.app/api/get-policies"
+        `https://interviewappbe-production.up.railway.app/api/get-policies${params}`
       );
       if (!response.ok) throw new Error("Failed to fetch policies");
       const data = await response.json();
-      setPolicies(data.policies);
+      setPolicies((prev) => (cursor ? [...prev, ...data.policies] : data.policies));
+      setPoliciesCursor(data.next_cursor);
     } catch (error) {
       toast({
         title: "Error fetching policies",
@@ -183,6 +187,11 @@ const PolicyDashboard = () => {
             ))}
           </List>
         )}
+        {policiesCursor && !loadingPolicies && (
+          <Button mt="4" onClick={() => fetchPolicies(policiesCursor)}>
+            Load more
+          </Button>
+        )}
       </Box>
 
       {/* Upload Policy Section */}
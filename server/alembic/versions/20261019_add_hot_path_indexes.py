@@ -0,0 +1,55 @@
+"""Add indexes for hot foreign keys and lookup columns
+
+Revision ID: 20261019_hot_path_indexes
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+Indexes are built with CREATE INDEX CONCURRENTLY so production tables stay
+writable while they build. Postgres does not allow that inside a transaction,
+so each one runs in an autocommit block. IF NOT EXISTS keeps the migration
+safe to re-run if alembic_version is cleared (see migrate.py);
+an index left INVALID by an interrupted build is dropped and rebuilt.
+Names match the `index=True` / `Index(...)` declarations in models.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_hot_path_indexes'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_job_titles_department_id", "job_titles", ["department_id"]),
+    ("ix_interview_questions_job_title_id", "interview_questions", ["job_title_id"]),
+    ("ix_job_descriptions_job_title_id", "job_descriptions", ["job_title_id"]),
+    ("ix_scorecard_entries_candidate_id", "scorecard_entries", ["candidate_id"]),
+    ("ix_interview_feedback_candidate_id", "interview_feedback", ["candidate_id"]),
+    ("ix_application_history_candidate_id", "application_history", ["candidate_id"]),
+    ("ix_candidates_updated_at", "candidates", ["updated_at"]),
+    ("ix_audit_logs_timestamp", "audit_logs", ["timestamp"]),
+    ("ix_competency_evolution_name_title_level", "competency_evolution", ["competency_name", "job_title", "job_level"]),
+]
+
+
+def _is_invalid(name):
+    """An interrupted concurrent build leaves an INVALID index that IF NOT EXISTS would skip."""
+    return op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first() is not None
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        with op.get_context().autocommit_block():
+            if _is_invalid(name):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
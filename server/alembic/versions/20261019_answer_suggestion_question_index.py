@@ -0,0 +1,34 @@
+"""Index answer_suggestions by question
+
+Revision ID: 20261019_answer_question
+Revises: 20261019_drop_level_index
+Create Date: 2026-10-19 18:00:00.000000
+
+get-interview-questions loads each page's suggestions with selectinload:
+WHERE question_id IN (...). Without an index on the foreign key every page
+reads the whole table. Built concurrently, IF NOT EXISTS (see
+20261019_hot_path_indexes).
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261019_answer_question'
+down_revision = '20261019_drop_level_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_answer_suggestions_question_id", "answer_suggestions", ["question_id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_answer_suggestions_question_id", table_name="answer_suggestions",
+            postgresql_concurrently=True, if_exists=True,
+        )
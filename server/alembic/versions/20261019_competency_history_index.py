@@ -0,0 +1,33 @@
+"""Index competency history by competency and change date
+
+Revision ID: 20261019_competency_history
+Revises: 20261019_trend_rollups
+Create Date: 2026-10-19 16:00:00.000000
+
+Serves the keyset-paginated, date-bounded /api/get-competency-history:
+WHERE competency_name = ? AND (date_changed, id) < (?, ?) ORDER BY date_changed DESC, id DESC.
+Built concurrently, IF NOT EXISTS (see 20261019_hot_path_indexes).
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261019_competency_history'
+down_revision = '20261019_trend_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_competency_evolution_name_date", "competency_evolution", ["competency_name", "date_changed", "id"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_competency_evolution_name_date", table_name="competency_evolution",
+            postgresql_concurrently=True, if_exists=True,
+        )
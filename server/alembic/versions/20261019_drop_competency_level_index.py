@@ -0,0 +1,34 @@
+"""Drop the standalone index on competency_levels.level
+
+Revision ID: 20261019_drop_level_index
+Revises: 20261019_competency_history
+Create Date: 2026-10-19 17:00:00.000000
+
+get-job-title-details matches level labels by substring (LIKE '%x%'), which
+no btree index on the label can serve; the rows are reached through
+ix_competency_levels_competency_id_level instead. The single-column index only
+cost writes. Dropped concurrently, IF EXISTS (see 20261019_hot_path_indexes).
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261019_drop_level_index'
+down_revision = '20261019_competency_history'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_competency_levels_level", table_name="competency_levels",
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_competency_levels_level", "competency_levels", ["level"],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
@@ -0,0 +1,36 @@
+"""Index the keyset order of the policy list endpoints
+
+Revision ID: 20261019_policy_keyset
+Revises: 20261019_answer_question
+Create Date: 2026-10-19 19:00:00.000000
+
+get-policies pages by (created_at, id) and get-policy-versions by
+(created_at, id) within one (business, policy_type). With these indexes a
+page, however deep, is an index range scan instead of a sort of the whole
+table. Built concurrently, IF NOT EXISTS (see 20261019_hot_path_indexes).
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261019_policy_keyset'
+down_revision = '20261019_answer_question'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_policies_created_at_id", "policies", ["created_at", "id"]),
+    ("ix_hr_policy_versions_business_type_created", "hr_policy_versions",
+     ["business", "policy_type", "created_at", "id"]),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
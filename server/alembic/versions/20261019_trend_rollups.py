@@ -0,0 +1,39 @@
+"""Add running totals to competency_trends and rollup indexes
+
+Revision ID: 20261019_trend_rollups
+Revises: 20261019_hot_path_indexes
+Create Date: 2026-10-19 15:30:00.000000
+
+score_sum / score_count let trend_rollups.py add new scorecard scores into a
+month's average without rescanning. IF NOT EXISTS throughout: migrate.py runs
+create_all first, so on a fresh database the columns and indexes already
+exist. The rollup_watermarks table is created by create_all.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261019_trend_rollups'
+down_revision = '20261019_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_scorecard_entries_created_at", "scorecard_entries", ["created_at"]),
+    ("ix_competency_trends_period", "competency_trends", ["year", "month", "department", "competency_name"]),
+]
+
+
+def upgrade():
+    op.execute("ALTER TABLE competency_trends ADD COLUMN IF NOT EXISTS score_sum DOUBLE PRECISION")
+    op.execute("ALTER TABLE competency_trends ADD COLUMN IF NOT EXISTS score_count INTEGER")
+    for name, table, columns in INDEXES:
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    op.drop_column("competency_trends", "score_count")
+    op.drop_column("competency_trends", "score_sum")
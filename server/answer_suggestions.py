@@ -0,0 +1,141 @@
+"""
+Offline pre-generation of AnswerSuggestion rubrics.
+
+Fills `answer_suggestions` with scored example answers (one per score, 1-4) for
+every saved interview question that has none yet, so the interview UI can show
+a rubric without a live LLM call. Work runs on a small thread pool and stops
+taking new questions once the token budget is spent.
+
+Run from the API (POST /api/pregenerate-answer-suggestions) or standalone:
+    python answer_suggestions.py --concurrency 4 --token-budget 200000
+"""
+import argparse
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional
+
+from deps import SessionLocal
+from llm_guard import LLMUnavailableError
+from models import AnswerSuggestion, InterviewQuestion
+from structured_output import AnswerRubric, StructuredOutputError, generate_structured
+
+DEFAULT_CONCURRENCY = int(os.getenv("ANSWER_SUGGESTION_CONCURRENCY", "4"))
+DEFAULT_TOKEN_BUDGET = int(os.getenv("ANSWER_SUGGESTION_TOKEN_BUDGET", "200000"))
+
+_run_lock = threading.Lock()
+
+
+class TokenBudget:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def exhausted(self) -> bool:
+        with self._lock:
+            return self.spent >= self.limit
+
+    def add(self, tokens: int):
+        with self._lock:
+            self.spent += tokens
+
+
+def _generate_for_question(question_id: int, question: str, follow_up: Optional[str], competency: str,
+                           budget: TokenBudget) -> int:
+    if budget.exhausted():
+        return 0
+
+    prompt = f"""
+    Write example candidate answers to the following interview question, one for each
+    score from 1 (Poor) to 4 (Great), so interviewers can calibrate their scoring.
+
+    Competency: {competency}
+    Question: {question}
+    Follow-up: {follow_up or 'None'}
+    """
+    usage: Dict[str, int] = {}
+    try:
+        rubric = generate_structured(
+            AnswerRubric,
+            [{"role": "system", "content": "You are an experienced interviewer."},
+             {"role": "user", "content": prompt}],
+            endpoint="answer_suggestions",
+            max_tokens=800,
+            temperature=0.6,
+            usage=usage,
+        )
+    finally:
+        budget.add(usage.get("total_tokens", 0))
+
+    db = SessionLocal()
+    try:
+        # Another run may have filled this question while we were generating.
+        if db.query(AnswerSuggestion.id).filter(AnswerSuggestion.question_id == question_id).first():
+            return 0
+        best_per_score = {suggestion.score: suggestion.answer for suggestion in rubric.answers}
+        db.add_all(
+            AnswerSuggestion(question_id=question_id, score=score, answer=answer)
+            for score, answer in sorted(best_per_score.items())
+        )
+        db.commit()
+        return len(best_per_score)
+    finally:
+        db.close()
+
+
+def pregenerate_answer_suggestions(concurrency: int = DEFAULT_CONCURRENCY,
+                                   token_budget: int = DEFAULT_TOKEN_BUDGET) -> Dict[str, int]:
+    """Generates suggestions for every question without any. Only one run per process at a time."""
+    if not _run_lock.acquire(blocking=False):
+        logging.info("Answer suggestion pre-generation already running; skipping.")
+        return {"questions": 0, "suggestions": 0, "tokens": 0, "skipped": 1}
+
+    try:
+        db = SessionLocal()
+        try:
+            questions = (
+                db.query(InterviewQuestion.id, InterviewQuestion.question,
+                         InterviewQuestion.follow_up, InterviewQuestion.competency)
+                .outerjoin(AnswerSuggestion, AnswerSuggestion.question_id == InterviewQuestion.id)
+                .filter(AnswerSuggestion.id.is_(None))
+                .order_by(InterviewQuestion.id)
+                .all()
+            )
+        finally:
+            db.close()
+
+        budget = TokenBudget(token_budget)
+        filled = suggestions = 0
+        logging.info(f"🔄 Pre-generating answer suggestions for {len(questions)} questions...")
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="answer-suggestions") as pool:
+            futures = {pool.submit(_generate_for_question, *question, budget): question.id for question in questions}
+            for future in as_completed(futures):
+                try:
+                    created = future.result()
+                except (StructuredOutputError, LLMUnavailableError) as e:
+                    logging.warning(f"⚠️ No answer suggestions for question {futures[future]}: {e}")
+                    continue
+                except Exception as e:
+                    logging.error(f"❌ Failed to store answer suggestions for question {futures[future]}: {e}")
+                    continue
+                if created:
+                    filled += 1
+                    suggestions += created
+
+        if budget.exhausted():
+            logging.warning(f"⚠️ Answer suggestion token budget of {token_budget} reached; remaining questions deferred.")
+        logging.info(f"✅ Stored {suggestions} answer suggestions for {filled} questions ({budget.spent} tokens).")
+        return {"questions": filled, "suggestions": suggestions, "tokens": budget.spent, "skipped": 0}
+    finally:
+        _run_lock.release()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Pre-generate scored example answers for saved interview questions.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET)
+    args = parser.parse_args()
+    print(pregenerate_answer_suggestions(args.concurrency, args.token_budget))
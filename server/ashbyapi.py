@@ -20,6 +20,7 @@ from models import (
     ScorecardEntry, ApplicationHistory
 )
 from deps import get_db
+from resolution_cache import invalidate_job_titles
 
 # --- CONFIGURATION & SETUP ---
 
@@ -157,6 +158,7 @@ def upsert_job_title(db: Session, job_data: Dict) -> JobTitle:
     job = db.query(JobTitle).get(job_uuid)
     if not job:
         job = JobTitle(id=job_uuid)
+    previous_key = (job.department_id, job.job_title)
 
     job.job_title = job_data.get("title")
     dept_id = job_data.get("departmentId")
@@ -167,6 +169,8 @@ def upsert_job_title(db: Session, job_data: Dict) -> JobTitle:
 
     db.merge(job)
     db.commit()
+    if (job.department_id, job.job_title) != previous_key:
+        invalidate_job_titles()
     return job
 
 
@@ -0,0 +1,74 @@
+"""
+Serialization microbenchmark for the largest list payloads.
+
+Compares, per payload, the CPU time to turn an endpoint's return value into
+response bytes:
+    stdlib     jsonable_encoder + JSONResponse (FastAPI's default before)
+    orjson     jsonable_encoder + FastJSONResponse (the new default class)
+    direct     json_response: orjson only (what the list endpoints now do)
+
+    python bench_serialization.py            # default sizes
+    python bench_serialization.py --scale 5  # 5x the rows
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from responses import FastJSONResponse, json_response
+
+
+def payloads(scale: int) -> Dict[str, Any]:
+    now = datetime(2026, 10, 19, 12, 0, 0, 123456)
+    return {
+        "search-frameworks": {"frameworks": [
+            {"id": uuid.uuid4(), "department": f"Department {i}", "parent_id": None, "is_archived": False}
+            for i in range(2000 * scale)
+        ]},
+        "candidates": [
+            {"id": uuid.uuid4(), "name": f"Candidate {i}", "email": f"candidate{i}@example.com"}
+            for i in range(20000 * scale)
+        ],
+        "users": [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "is_approved": True,
+             "is_suspended": False, "role": "user"}
+            for i in range(2000 * scale)
+        ],
+        "get-policies": {"policies": [
+            {"id": i, "title": f"Policy {i}", "content": "Lorem ipsum dolor sit amet. " * 150,
+             "created_at": now - timedelta(minutes=i)}
+            for i in range(200 * scale)
+        ], "next_cursor": "eyJhIjoxfQ"},
+    }
+
+
+def _time(render: Callable[[], bytes], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(scale: int, repeat: int) -> None:
+    print(f"{'payload':<20}{'bytes':>10}{'stdlib ms':>12}{'orjson ms':>12}{'direct ms':>12}{'speedup':>10}")
+    for name, content in payloads(scale).items():
+        stdlib = _time(lambda: JSONResponse(jsonable_encoder(content)).body, repeat)
+        orjson_default = _time(lambda: FastJSONResponse(jsonable_encoder(content)).body, repeat)
+        direct = _time(lambda: json_response(content).body, repeat)
+        size = len(json_response(content).body)
+        print(f"{name:<20}{size:>10}{stdlib * 1000:>12.1f}{orjson_default * 1000:>12.1f}"
+              f"{direct * 1000:>12.1f}{stdlib / direct:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare JSON serialization paths on large list payloads.")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.scale, args.repeat)
@@ -0,0 +1,67 @@
+"""
+Startup benchmark: how long `import main` takes and how long the first request
+after it takes, each measured in a fresh interpreter so module caches do not
+carry over between runs.
+
+    python bench_startup.py              # 5 runs against /api/health, prints median / max
+    python bench_startup.py --runs 10 --path /api/get-departments
+
+Missing settings get dummy values, so the default run needs nothing external:
+with DATABASE_URL unset the app points at an in-memory SQLite database that
+/api/health never touches. Database-backed paths want a real DATABASE_URL
+(async endpoints on SQLite also need the aiosqlite driver); without one they
+answer 500, which is reported as the status and still timed.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DUMMY_ENV = {
+    "DATABASE_URL": "sqlite://",
+    "ASHBY_API_KEY": "bench",
+    "OPENAI_API_KEY": "bench",
+}
+
+_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(main.app, raise_server_exceptions=False)
+sent = time.perf_counter()
+status = client.get(sys.argv[1]).status_code
+done = time.perf_counter()
+print(json.dumps({"import": imported - started, "first_request": done - sent, "status": status}))
+"""
+
+
+def run_once(path: str) -> dict:
+    env = {**DUMMY_ENV, **os.environ}
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD, path],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Benchmark run failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(runs: int, path: str) -> None:
+    samples = [run_once(path) for _ in range(runs)]
+    for key in ("import", "first_request"):
+        values = [sample[key] * 1000 for sample in samples]
+        print(f"{key:>14}: median {statistics.median(values):7.1f} ms   max {max(values):7.1f} ms")
+    print(f"{'status':>14}: {sorted({sample['status'] for sample in samples})}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import time and first-request latency of main.app.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/api/health")
+    args = parser.parse_args()
+    main(args.runs, args.path)
@@ -0,0 +1,188 @@
+"""
+Bounded store for X-ray search candidates.
+
+Search hits are kept so `/candidate/{candidate_id}` can show details later.
+Entries expire after a TTL and the store is capped (LRU), so memory stays flat
+under sustained search traffic. IDs are prefixed with a per-search session ID,
+so results from different searches never collide.
+
+Backends (CANDIDATE_STORE_BACKEND):
+    memory  per-process TTL/LRU cache (default)
+    sql     `sourced_candidates` table shared across workers; uses
+            CANDIDATE_STORE_URL, or the main database when unset
+
+Async endpoints use the `a*` methods: the SQL backend's blocking session work
+runs on the threadpool, the memory backend stays on the event loop.
+"""
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import sessionmaker
+
+from cache import TTLCache
+from db_pool import build_engine
+from models import SourcedCandidateRecord
+
+BACKEND = os.getenv("CANDIDATE_STORE_BACKEND", "memory").lower()
+TTL_SECONDS = int(os.getenv("CANDIDATE_STORE_TTL_SECONDS", "3600"))
+MAX_ENTRIES = int(os.getenv("CANDIDATE_STORE_MAX_ENTRIES", "10000"))
+STORE_URL = os.getenv("CANDIDATE_STORE_URL")
+
+# SQL backend: prune expired/excess rows every N writes instead of on every write
+PRUNE_EVERY = 50
+
+
+def new_search_session_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def make_candidate_id(session_id: str, position: int) -> str:
+    return f"{session_id}-{position}"
+
+
+class CandidateStore(ABC):
+    @abstractmethod
+    def put_many(self, candidates: List[Dict[str, Any]]):
+        """Stores (or replaces) candidates by their "id"."""
+
+    @abstractmethod
+    def get(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        """A copy of the stored candidate, or None once it has expired or been evicted."""
+
+    def put(self, candidate: Dict[str, Any]):
+        self.put_many([candidate])
+
+    async def aput_many(self, candidates: List[Dict[str, Any]]):
+        await run_in_threadpool(self.put_many, candidates)
+
+    async def aget(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        return await run_in_threadpool(self.get, candidate_id)
+
+    async def aput(self, candidate: Dict[str, Any]):
+        await self.aput_many([candidate])
+
+
+class MemoryCandidateStore(CandidateStore):
+    def __init__(self, ttl: int = TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl)
+
+    def put_many(self, candidates: List[Dict[str, Any]]):
+        for candidate in candidates:
+            self._cache.set(candidate["id"], dict(candidate))
+
+    def get(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        candidate = self._cache.get(candidate_id)
+        return dict(candidate) if candidate is not None else None
+
+    # Nothing blocks here, so no threadpool hop
+    async def aput_many(self, candidates: List[Dict[str, Any]]):
+        self.put_many(candidates)
+
+    async def aget(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        return self.get(candidate_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+class SqlCandidateStore(CandidateStore):
+    def __init__(self, url: Optional[str] = None, ttl: int = TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        if url:
+            engine = build_engine(url)
+        else:
+            from deps import engine
+        SourcedCandidateRecord.__table__.create(bind=engine, checkfirst=True)
+        self.engine = engine
+        self._sessions = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+        self.ttl = timedelta(seconds=ttl)
+        self.max_entries = max_entries
+        self._writes = 0
+
+    def put_many(self, candidates: List[Dict[str, Any]]):
+        now = datetime.utcnow()
+        # One row per id (the last wins): an upsert may not touch a row twice
+        rows = list({
+            candidate["id"]: {"id": candidate["id"], "payload": candidate, "expires_at": now + self.ttl,
+                              "last_accessed": now}
+            for candidate in candidates
+        }.values())
+        if not rows:
+            return
+        with self._sessions() as db:
+            self._upsert(db, rows)
+            db.commit()
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                self._prune(db, now)
+
+    @staticmethod
+    def _upsert(db, rows: List[Dict[str, Any]]):
+        """One INSERT ... ON CONFLICT DO UPDATE for the batch; a merge per row on other databases."""
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            for row in rows:
+                db.merge(SourcedCandidateRecord(**row))
+            return
+        stmt = insert(SourcedCandidateRecord).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[SourcedCandidateRecord.id],
+            set_={column: stmt.excluded[column] for column in ("payload", "expires_at", "last_accessed")},
+        ))
+
+    def get(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        with self._sessions() as db:
+            record = db.query(SourcedCandidateRecord).filter(
+                SourcedCandidateRecord.id == candidate_id,
+                SourcedCandidateRecord.expires_at > now,
+            ).first()
+            if not record:
+                return None
+            record.last_accessed = now
+            payload = dict(record.payload)
+            db.commit()
+            return payload
+
+    def _prune(self, db, now: datetime):
+        """Drops expired rows, then the least recently used rows above the cap."""
+        db.query(SourcedCandidateRecord).filter(SourcedCandidateRecord.expires_at <= now).delete(synchronize_session=False)
+        cutoff = (
+            db.query(SourcedCandidateRecord.last_accessed)
+            .order_by(SourcedCandidateRecord.last_accessed.desc())
+            .offset(self.max_entries)
+            .limit(1)
+            .scalar()
+        )
+        if cutoff is not None:
+            db.query(SourcedCandidateRecord).filter(
+                SourcedCandidateRecord.last_accessed <= cutoff
+            ).delete(synchronize_session=False)
+        db.commit()
+
+
+def _build_store() -> CandidateStore:
+    if BACKEND == "sql":
+        logging.info("Using SQL-backed candidate store.")
+        return SqlCandidateStore(STORE_URL)
+    if BACKEND != "memory":
+        logging.warning(f"Unknown CANDIDATE_STORE_BACKEND '{BACKEND}', falling back to memory.")
+    return MemoryCandidateStore()
+
+
+_store: Optional[CandidateStore] = None
+
+
+def get_candidate_store() -> CandidateStore:
+    global _store
+    if _store is None:
+        _store = _build_store()
+    return _store
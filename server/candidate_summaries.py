@@ -0,0 +1,135 @@
+"""
+Cached, lazily generated AI summaries for sourced candidates.
+
+Summaries are keyed by a hash of the candidate's profile content, so an
+unchanged candidate is never summarised twice (the same profile found by two
+searches shares one summary). After a search, the top hits can be summarised
+in the background while the user is still on the results list; opening a
+candidate then normally needs no LLM call. Concurrent requests for the same
+profile share one in-flight generation.
+
+Pre-generation spends LLM calls on candidates nobody may open, so it is off
+unless SUMMARY_PREGENERATE_TOP_N is set.
+
+Configuration (environment):
+    SUMMARY_CACHE_TTL_SECONDS      summary cache TTL (86400)
+    SUMMARY_CACHE_MAX_ENTRIES      summary cache size (5000)
+    SUMMARY_PREGENERATE_TOP_N      search hits summarised in the background (0: off)
+    SUMMARY_PREGENERATE_CONCURRENCY parallel background summaries (2)
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from cache import TTLCache
+from candidate_store import get_candidate_store
+from llm_guard import chat_completion, run_blocking
+
+SUMMARY_PREGENERATE_TOP_N = int(os.getenv("SUMMARY_PREGENERATE_TOP_N", "0"))
+SUMMARY_PREGENERATE_CONCURRENCY = int(os.getenv("SUMMARY_PREGENERATE_CONCURRENCY", "2"))
+
+summary_cache = TTLCache(
+    int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000")),
+    float(os.getenv("SUMMARY_CACHE_TTL_SECONDS", "86400")),
+)
+
+_in_flight: Dict[str, asyncio.Future] = {}
+_background_tasks: set = set()
+
+# Fields that do not describe the profile itself
+_NON_CONTENT_FIELDS = {"id", "summary", "summary_hash"}
+
+
+def content_hash(candidate: Dict[str, Any]) -> str:
+    content = {key: value for key, value in candidate.items() if key not in _NON_CONTENT_FIELDS}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _generate_summary(candidate: Dict[str, Any]) -> str:
+    content = {key: value for key, value in candidate.items() if key not in _NON_CONTENT_FIELDS}
+    response = chat_completion(
+        "summarize_candidate",
+        model="gpt-3.5-turbo",
+        messages=[{
+            "role": "user",
+            "content": f"Summarize the following candidate's profile details in a concise paragraph: {content}",
+        }],
+        temperature=0.5,
+        max_tokens=100,
+    )
+    return response.choices[0].message.content.strip()
+
+
+def cached_summary(candidate: Dict[str, Any]) -> Optional[str]:
+    """Returns a summary without calling the LLM, if one exists for this content."""
+    digest = content_hash(candidate)
+    if candidate.get("summary") and candidate.get("summary_hash") == digest:
+        return candidate["summary"]
+    return summary_cache.get(digest)
+
+
+async def get_summary(candidate: Dict[str, Any]) -> str:
+    """Returns the summary for `candidate`, generating it at most once per content hash."""
+    summary = cached_summary(candidate)
+    if summary:
+        return summary
+
+    digest = content_hash(candidate)
+    pending = _in_flight.get(digest)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[digest] = future
+    try:
+        summary = await run_blocking(_generate_summary, candidate)
+        summary_cache.set(digest, summary)
+        future.set_result(summary)
+        return summary
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved; waiters get it through shield
+        raise
+    finally:
+        _in_flight.pop(digest, None)
+
+
+async def attach_summary(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Adds the summary to `candidate` and writes it back to the candidate store."""
+    digest = content_hash(candidate)
+    if candidate.get("summary") and candidate.get("summary_hash") == digest:
+        return candidate
+    candidate["summary"] = await get_summary(candidate)
+    candidate["summary_hash"] = digest
+    await get_candidate_store().aput(candidate)
+    return candidate
+
+
+def public_candidate(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """`candidate` without the bookkeeping fields kept for the store."""
+    return {key: value for key, value in candidate.items() if key != "summary_hash"}
+
+
+async def _pregenerate(candidates: List[Dict[str, Any]]):
+    semaphore = asyncio.Semaphore(SUMMARY_PREGENERATE_CONCURRENCY)
+
+    async def summarise(candidate):
+        async with semaphore:
+            try:
+                await attach_summary(dict(candidate))
+            except Exception as e:
+                logging.warning(f"Background summary for candidate {candidate.get('id')} failed: {e}")
+
+    await asyncio.gather(*(summarise(candidate) for candidate in candidates if not cached_summary(candidate)))
+
+
+def schedule_pregeneration(candidates: List[Dict[str, Any]]):
+    """Summarises the top search hits in the background without delaying the response."""
+    if SUMMARY_PREGENERATE_TOP_N <= 0 or not candidates:
+        return
+    task = asyncio.get_running_loop().create_task(_pregenerate(candidates[:SUMMARY_PREGENERATE_TOP_N]))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
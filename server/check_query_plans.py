@@ -0,0 +1,250 @@
+"""
+Query-plan check for the hot read paths.
+
+Seeds a scratch schema with a realistic volume of rows, runs EXPLAIN for the
+main query of each endpoint below and exits non-zero if any plan reads one of
+the checked tables with a sequential scan. The scratch tables come from
+models.py, whose index declarations match the
+20261019_hot_path_indexes migration.
+
+The checked statements are not hand-written SQL: each is built by the same
+query helper the endpoint executes (or, for relationship loads, by the ORM
+relationship), compiled for Postgres, so a change to an endpoint's query is
+checked as it ships.
+
+Needs a Postgres DATABASE_URL:
+    python check_query_plans.py                # seed a scratch schema, check, drop it
+    python check_query_plans.py --existing     # check against the current data instead
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import with_parent
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from competency_store import department_competency_job_titles_query, level_descriptions_query
+from framework_queries import (
+    interview_job_titles_query, interview_questions_query, job_description_query, job_titles_query,
+)
+from main import competency_history_query
+from models import AnswerSuggestion, ApplicationHistory, Base, Candidate, InterviewFeedback, ScorecardEntry
+from pagination import page_size
+from routers.policies import policies_query, policy_versions_query
+from routers.users import audit_logs_query
+
+SCRATCH_SCHEMA = "plan_check"
+
+# Seed volumes: large enough that an index beats a sequential scan
+DEPARTMENTS = 500
+JOB_TITLES = 10000
+QUESTIONS = 50000
+CANDIDATES = 20000
+ROWS_PER_CANDIDATE = 5
+AUDIT_LOGS = 50000
+POLICIES = 20000
+POLICY_VERSIONS = 50000
+EVOLUTION_ROWS = 50000
+COMPETENCIES_PER_JOB = 4
+LEVELS_PER_COMPETENCY = 6
+
+SEED_SQL = [
+    f"""INSERT INTO frameworks (id, department, is_archived)
+        SELECT md5('fw' || g)::uuid, 'Department ' || g, false FROM generate_series(1, {DEPARTMENTS}) g""",
+    f"""INSERT INTO job_titles (id, department_id, job_title, status, competencies, created_at, updated_at)
+        SELECT md5('job' || g)::uuid, md5('fw' || (g % {DEPARTMENTS} + 1))::uuid, 'Job ' || g, 'Open', '[]',
+               now(), now()
+        FROM generate_series(1, {JOB_TITLES}) g""",
+    f"""INSERT INTO job_descriptions (job_title_id, description, created_at)
+        SELECT md5('job' || g)::uuid, 'Description ' || g, now() FROM generate_series(1, {JOB_TITLES}) g""",
+    f"""INSERT INTO interview_questions (job_title_id, question, competency, competencies_covered, created_at)
+        SELECT md5('job' || (g % {JOB_TITLES} + 1))::uuid, 'Question ' || g, 'Competency ' || (g % 40), '[]', now()
+        FROM generate_series(1, {QUESTIONS}) g""",
+    f"""INSERT INTO answer_suggestions (question_id, score, answer)
+        SELECT q, s, 'Answer ' || q || '/' || s FROM generate_series(1, {QUESTIONS}) q, generate_series(1, 4) s""",
+    f"""INSERT INTO candidates (id, name, created_at, updated_at, archived)
+        SELECT md5('cand' || g)::uuid, 'Candidate ' || g, now(), now() - (g || ' minutes')::interval, false
+        FROM generate_series(1, {CANDIDATES}) g""",
+    f"""INSERT INTO scorecard_entries (id, candidate_id, skill, score, created_at)
+        SELECT md5('score' || g)::uuid, md5('cand' || (g % {CANDIDATES} + 1))::uuid, 'Skill ' || (g % 30), g % 4 + 1, now()
+        FROM generate_series(1, {CANDIDATES * ROWS_PER_CANDIDATE}) g""",
+    f"""INSERT INTO interview_feedback (id, candidate_id, interviewer_name, submitted_at)
+        SELECT md5('feedback' || g)::uuid, md5('cand' || (g % {CANDIDATES} + 1))::uuid, 'Interviewer ' || (g % 100), now()
+        FROM generate_series(1, {CANDIDATES * ROWS_PER_CANDIDATE}) g""",
+    f"""INSERT INTO application_history (id, candidate_id, status)
+        SELECT 'app-' || g, md5('cand' || (g % {CANDIDATES} + 1))::uuid, 'Active'
+        FROM generate_series(1, {CANDIDATES * ROWS_PER_CANDIDATE}) g""",
+    f"""INSERT INTO policies (title, content, created_at)
+        SELECT 'Policy ' || g, 'Content ' || g, now() - (g || ' minutes')::interval
+        FROM generate_series(1, {POLICIES}) g""",
+    f"""INSERT INTO hr_policy_versions (business, policy_type, draft_content, created_at)
+        SELECT 'Business ' || (g % 100), 'Type ' || (g % 10), 'Draft ' || g, now() - (g || ' minutes')::interval
+        FROM generate_series(1, {POLICY_VERSIONS}) g""",
+    f"""INSERT INTO audit_logs (admin_username, action, target_username, timestamp)
+        SELECT 'admin', 'approve', 'user' || g, now() - (g || ' minutes')::interval
+        FROM generate_series(1, {AUDIT_LOGS}) g""",
+    f"""INSERT INTO competency_evolution (competency_name, job_title, job_level, change_type, date_changed, category)
+        SELECT 'Competency ' || (g % 200), 'Job ' || (g % {JOB_TITLES} + 1), 'L' || (g % 6 + 1), 'Modified', now(), 'Core'
+        FROM generate_series(1, {EVOLUTION_ROWS}) g""",
+    f"""INSERT INTO competencies (id, job_title_id, name, position)
+        SELECT g, md5('job' || (g % {JOB_TITLES} + 1))::uuid, 'Competency ' || (g % 200), g / {JOB_TITLES}
+        FROM generate_series(1, {JOB_TITLES * COMPETENCIES_PER_JOB}) g""",
+    f"""INSERT INTO competency_levels (competency_id, level, description, position)
+        SELECT c, 'L' || l, 'Description ' || c || '/' || l, l
+        FROM generate_series(1, {JOB_TITLES * COMPETENCIES_PER_JOB}) c, generate_series(1, {LEVELS_PER_COMPETENCY}) l""",
+]
+
+def _children(relationship, candidate_id):
+    """The statement the ORM emits to load a candidate's `relationship` (e.g. on cascade delete)."""
+    return select(relationship.property.mapper.class_).where(
+        with_parent(Candidate(id=candidate_id), relationship)
+    )
+
+
+# (endpoint, statement builder, query that picks the builder's arguments from the data)
+CHECKS = [
+    ("get-job-titles",
+     lambda department_id: job_titles_query(department_id),
+     "SELECT department_id FROM job_titles WHERE department_id IS NOT NULL LIMIT 1"),
+    ("get-interview-job-titles",
+     lambda department_id: interview_job_titles_query(department_id),
+     "SELECT department_id FROM job_titles WHERE department_id IS NOT NULL LIMIT 1"),
+    ("get-interview-questions",
+     lambda job_title_id: interview_questions_query(job_title_id),
+     "SELECT job_title_id FROM interview_questions LIMIT 1"),
+    ("get-interview-questions (answer suggestions)",
+     lambda question_id: select(AnswerSuggestion).where(AnswerSuggestion.question_id.in_([question_id])),
+     "SELECT question_id FROM answer_suggestions LIMIT 1"),
+    ("get-job-description",
+     lambda job_title_id: job_description_query(job_title_id),
+     "SELECT job_title_id FROM job_descriptions LIMIT 1"),
+    ("candidate scorecards",
+     lambda candidate_id: _children(Candidate.scorecard_entries, candidate_id),
+     "SELECT candidate_id FROM scorecard_entries WHERE candidate_id IS NOT NULL LIMIT 1"),
+    ("candidate feedback",
+     lambda candidate_id: _children(Candidate.interview_feedback, candidate_id),
+     "SELECT candidate_id FROM interview_feedback WHERE candidate_id IS NOT NULL LIMIT 1"),
+    ("candidate application history",
+     lambda candidate_id: _children(Candidate.application_histories, candidate_id),
+     "SELECT candidate_id FROM application_history LIMIT 1"),
+    ("get-policies (paged)",
+     lambda: policies_query(limit=page_size(None)),
+     None),
+    ("get-policy-versions (paged)",
+     lambda business, policy_type: policy_versions_query(business, policy_type, limit=page_size(None)),
+     "SELECT business, policy_type FROM hr_policy_versions LIMIT 1"),
+    ("audit-logs (paged)",
+     lambda: audit_logs_query(limit=page_size(None)),
+     None),
+    ("get-competency-history (paged, last 90 days)",
+     lambda competency_name: competency_history_query(
+         competency_name, from_date=date.today() - timedelta(days=90), summary=True, limit=page_size(None),
+     ),
+     "SELECT competency_name FROM competency_evolution LIMIT 1"),
+    ("get-job-title-details (level filter)",
+     lambda job_title_id, job_level: level_descriptions_query(job_title_id, job_level),
+     "SELECT c.job_title_id, l.level AS job_level FROM competencies c "
+     "JOIN competency_levels l ON l.competency_id = c.id LIMIT 1"),
+    ("get-department-competencies",
+     lambda department_id: department_competency_job_titles_query(department_id),
+     "SELECT department_id FROM job_titles WHERE department_id IS NOT NULL LIMIT 1"),
+]
+
+CHECKED_TABLES = {
+    "job_titles", "job_descriptions", "interview_questions", "scorecard_entries", "interview_feedback",
+    "application_history", "candidates", "audit_logs", "competency_evolution",
+    "competencies", "competency_levels", "answer_suggestions", "policies", "hr_policy_versions",
+}
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, with its bind parameters processed as usual."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _plan_nodes(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def seq_scans(plan: Dict[str, Any]) -> List[str]:
+    """Checked tables that the plan reads with a sequential scan."""
+    return [
+        node["Relation Name"]
+        for node in _plan_nodes(plan["Plan"])
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in CHECKED_TABLES
+    ]
+
+
+def _seed(conn):
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCRATCH_SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCRATCH_SCHEMA}"))
+    conn.execute(text(f"SET search_path TO {SCRATCH_SCHEMA}"))
+    Base.metadata.create_all(bind=conn)
+    for statement in SEED_SQL:
+        conn.execute(text(statement))
+    conn.execute(text("ANALYZE"))
+
+
+def run_checks(conn) -> List[str]:
+    failures = []
+    for endpoint, build, params_query in CHECKS:
+        params = dict(conn.execute(text(params_query)).mappings().first() or {}) if params_query else {}
+        if params_query and not params:
+            print(f"⚠️  {endpoint}: no data to check against, skipped")
+            continue
+        plan = conn.execute(Explain(build(**params))).scalar()
+        plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+        scanned = seq_scans(plan)
+        if scanned:
+            failures.append(f"{endpoint}: sequential scan on {', '.join(sorted(set(scanned)))}")
+            print(f"❌ {endpoint}: Seq Scan on {', '.join(sorted(set(scanned)))}")
+        else:
+            print(f"✅ {endpoint}")
+    return failures
+
+
+def main(existing: bool) -> int:
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        print("DATABASE_URL is not set.")
+        return 2
+
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            if not existing:
+                _seed(conn)
+            failures = run_checks(conn)
+        finally:
+            # Nothing is kept: the scratch schema disappears with the rollback
+            transaction.rollback()
+
+    if failures:
+        print(f"{len(failures)} of {len(CHECKS)} queries fall back to a sequential scan.")
+        return 1
+    print("All checked queries use an index.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if a hot query plan uses a sequential scan.")
+    parser.add_argument("--existing", action="store_true", help="check the current data instead of a seeded schema")
+    args = parser.parse_args()
+    sys.exit(main(args.existing))
@@ -0,0 +1,191 @@
+"""
+The Competency Key spreadsheet, compiled once into a JSON artifact.
+
+Parsing the workbook needs pandas (and openpyxl), which together take longer
+to import than the rest of the app and stay resident afterwards. So the
+workbook is compiled into a small JSON file next to it, tagged with the
+sha256 of the source: workers load the JSON, with the Markdown the prompts
+use already rendered per competency, and only fall back to Excel (rewriting
+the artifact) when the source hash no longer matches.
+
+The source file is re-checked at most every KEY_RELOAD_SECONDS; an edited
+workbook is picked up without a restart.
+
+    python competency_key.py     # compile ahead of time (e.g. in the image build)
+
+Configuration (environment):
+    KEY_FILE             path to the workbook (data/Competency Key.xlsx)
+    KEY_COMPILED_FILE    path to the compiled artifact (<KEY_FILE>.json)
+    KEY_RELOAD_SECONDS   how often to check the workbook for changes (30)
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+KEY_FILE = os.getenv("KEY_FILE", "data/Competency Key.xlsx")
+KEY_COMPILED_FILE = os.getenv("KEY_COMPILED_FILE", f"{KEY_FILE}.json")
+KEY_RELOAD_SECONDS = float(os.getenv("KEY_RELOAD_SECONDS", "30"))
+SHEET_NAME = "Sheet1"
+FORMAT_VERSION = 1
+
+
+class CompetencyKey:
+    def __init__(self, competencies: Optional[Dict[str, Dict[str, str]]] = None,
+                 levels: Optional[List[str]] = None, snippets: Optional[Dict[str, str]] = None,
+                 source_hash: Optional[str] = None):
+        self.competencies = competencies or {}
+        self.levels = levels or []
+        # Pre-rendered Markdown block per competency
+        self.snippets = snippets if snippets is not None else render_snippets(self.competencies, self.levels)
+        self.source_hash = source_hash
+        self.markdown = "\n".join(["## Competency Key", *self.snippets.values()]) if self.snippets else ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "format": FORMAT_VERSION,
+            "source_sha256": self.source_hash,
+            "levels": self.levels,
+            "competencies": self.competencies,
+            "snippets": self.snippets,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompetencyKey":
+        return cls(
+            competencies=data["competencies"], levels=data["levels"],
+            snippets=data["snippets"], source_hash=data["source_sha256"],
+        )
+
+
+def render_snippets(competencies: Dict[str, Dict[str, str]], levels: List[str]) -> Dict[str, str]:
+    return {
+        comp: "\n".join([f"### {comp}", *(f"- **{lvl}**: {lvl_map[lvl]}" for lvl in levels), ""])
+        for comp, lvl_map in competencies.items()
+    }
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_workbook(path: str, source_hash: Optional[str] = None) -> CompetencyKey:
+    import pandas as pd
+
+    # Read into a DataFrame
+    key_df = pd.read_excel(path, sheet_name=SHEET_NAME)
+
+    # ─── Normalize headers: strip whitespace and lowercase ──────────
+    key_df.columns = key_df.columns.str.strip().str.lower()
+
+    # If there's no 'level' column, but the first column is unnamed, rename it
+    if "level" not in key_df.columns:
+        first_col = key_df.columns[0]
+        if first_col.startswith("unnamed"):
+            key_df = key_df.rename(columns={first_col: "level"})
+        else:
+            raise RuntimeError(
+                f"Competency Key sheet must have a 'level' column; got: {list(key_df.columns)}"
+            )
+
+    # Column-wise: one dict per competency, no per-row Python loop
+    key_df = key_df.set_index("level").astype(str)
+    key_df = key_df.apply(lambda column: column.str.strip().str.replace("\n", " ", regex=False))
+    levels = [str(level) for level in key_df.index]
+    key_df.index = levels
+    competencies = key_df.to_dict()
+    return CompetencyKey(competencies=competencies, levels=levels, source_hash=source_hash)
+
+
+def _read_compiled(path: str) -> Optional[CompetencyKey]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("format") != FORMAT_VERSION:
+        return None
+    return CompetencyKey.from_dict(data)
+
+
+def compile_key(source: str = KEY_FILE, target: str = KEY_COMPILED_FILE) -> CompetencyKey:
+    """Parses the workbook and writes the artifact atomically (a failed write only costs the next boot)."""
+    key = parse_workbook(source, source_hash=file_hash(source))
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(key.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, target)
+    except OSError as e:
+        logging.warning(f"⚠️ Could not write compiled competency key {target}: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return key
+
+
+def load_key(source: str = KEY_FILE, target: str = KEY_COMPILED_FILE) -> CompetencyKey:
+    """The compiled artifact when it matches the source hash, otherwise a fresh compile."""
+    if not os.path.exists(source):
+        # Deployments may ship only the artifact
+        compiled = _read_compiled(target)
+        if compiled is None:
+            logging.warning(f"⚠️ Competency key file not found: {source}. Continuing without it.")
+            return CompetencyKey()
+        return compiled
+
+    compiled = _read_compiled(target)
+    if compiled is not None and compiled.source_hash == file_hash(source):
+        return compiled
+    logging.info(f"🔄 Compiling competency key from {source}")
+    return compile_key(source, target)
+
+
+_key: Optional[CompetencyKey] = None
+_source_stat: Optional[Tuple[int, int]] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_competency_key() -> CompetencyKey:
+    """The current key; reloaded when the workbook changes, empty if it cannot be read (logged)."""
+    global _key, _source_stat, _checked_at
+    now = time.monotonic()
+    if _key is not None and now - _checked_at < KEY_RELOAD_SECONDS:
+        return _key
+    with _lock:
+        if _key is not None and now - _checked_at < KEY_RELOAD_SECONDS:
+            return _key
+        _checked_at = now
+        stat = _stat(KEY_FILE)
+        if _key is not None and stat == _source_stat:
+            return _key
+        try:
+            _key = load_key()
+            logging.info(f"✅ Loaded competency key ({len(_key.competencies)} competencies)")
+        except Exception as e:
+            logging.error(f"❌ Failed to load competency key: {e}")
+            if _key is None:
+                _key = CompetencyKey()
+        _source_stat = stat
+    return _key
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    compiled_key = compile_key()
+    print(f"Compiled {len(compiled_key.competencies)} competencies to {KEY_COMPILED_FILE}")
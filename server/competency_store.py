@@ -0,0 +1,180 @@
+"""
+Normalized competency storage.
+
+JobTitle.competencies stays the JSON document the API returns. The
+`competencies` and `competency_levels` tables hold the same data, one row per
+competency and per level description. Reads that filter by name, job title or
+level run in SQL (the first two against their indexes), instead of loading
+whole job rows and walking the JSON in Python.
+
+Writers that change JobTitle.competencies call `sync_job_title` in the same
+transaction. It only touches the rows of competencies that actually changed.
+`backfill` (a run-once data migration) fills the tables for existing job titles.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, lazyload
+
+from models import Competency, CompetencyLevel, JobTitle
+
+BACKFILL_BATCH_SIZE = 500
+
+
+class _Parsed:
+    """One competency from the JSON document, in row form."""
+
+    def __init__(self, name: str, category: Optional[str], description: Optional[str],
+                 levels: List[Tuple[str, Optional[str]]]):
+        self.name = name
+        self.category = category
+        self.description = description
+        self.levels = levels
+
+
+def _parse(competencies: Optional[Iterable[Any]]) -> List[_Parsed]:
+    parsed = []
+    for competency in competencies or []:
+        if not isinstance(competency, dict) or not competency.get("name"):
+            continue
+        descriptions = competency.get("descriptions")
+        levels = [
+            (str(level), None if description is None else str(description))
+            for level, description in (descriptions.items() if isinstance(descriptions, dict) else [])
+        ]
+        parsed.append(_Parsed(
+            name=str(competency["name"]),
+            category=competency.get("category"),
+            description=competency.get("description"),
+            levels=levels,
+        ))
+    return parsed
+
+
+def _level_rows(levels: List[Tuple[str, Optional[str]]]) -> List[CompetencyLevel]:
+    return [
+        CompetencyLevel(level=level, description=description, position=position)
+        for position, (level, description) in enumerate(levels)
+    ]
+
+
+def _new_row(item: _Parsed, position: int) -> Competency:
+    return Competency(
+        name=item.name, category=item.category, description=item.description,
+        position=position, levels=_level_rows(item.levels),
+    )
+
+
+def sync_job_title(db: Session, job: JobTitle) -> None:
+    """
+    Brings the job title's normalized rows in line with job.competencies.
+    Unchanged competencies are left alone; a changed one has its own row (and,
+    if they differ, its level rows) updated. A category assigned to a row
+    (e.g. by AI categorization) is kept when the document does not carry one.
+    """
+    existing: Dict[str, List[Competency]] = {}
+    for row in job.competency_rows:
+        existing.setdefault(row.name, []).append(row)
+
+    rows = []
+    for position, item in enumerate(_parse(job.competencies)):
+        matches = existing.get(item.name)
+        if not matches:
+            rows.append(_new_row(item, position))
+            continue
+        row = matches.pop(0)
+        if row.position != position:
+            row.position = position
+        if item.category and row.category != item.category:
+            row.category = item.category
+        if row.description != item.description:
+            row.description = item.description
+        if [(level.level, level.description) for level in row.levels] != item.levels:
+            row.levels = _level_rows(item.levels)
+        rows.append(row)
+
+    # Rows left in `existing` are deleted by the delete-orphan cascade
+    if rows != list(job.competency_rows):
+        job.competency_rows = rows
+
+
+def backfill(db: Session) -> int:
+    """Fills the normalized tables for job titles that have competencies but no rows yet."""
+    has_rows = select(Competency.id).where(Competency.job_title_id == JobTitle.id).exists()
+    pending = (
+        db.query(JobTitle.id, JobTitle.competencies)
+        .filter(JobTitle.competencies.isnot(None), ~has_rows)
+        .all()
+    )
+    created = 0
+    for start in range(0, len(pending), BACKFILL_BATCH_SIZE):
+        for job in pending[start:start + BACKFILL_BATCH_SIZE]:
+            rows = [_new_row(item, position) for position, item in enumerate(_parse(job.competencies))]
+            for row in rows:
+                row.job_title_id = job.id
+            db.add_all(rows)
+            created += len(rows)
+        db.flush()
+    logging.info(f"✅ Normalized {created} competencies from {len(pending)} job titles.")
+    return created
+
+
+# -------------------- QUERIES -------------------- #
+
+def level_descriptions_query(job_title_id, job_level: str):
+    """
+    Level descriptions of a job title whose level label contains `job_level`, in
+    document order. The substring match (LIKE '%x%', as the JSON filter it
+    replaced) cannot use an index on the label; the job title's competencies
+    are found by index and their few level rows through
+    ix_competency_levels_competency_id_level, then filtered.
+    """
+    return (
+        select(Competency.id, Competency.name, CompetencyLevel.level, CompetencyLevel.description)
+        .join(CompetencyLevel, CompetencyLevel.competency_id == Competency.id)
+        .where(
+            Competency.job_title_id == job_title_id,
+            CompetencyLevel.level.contains(job_level, autoescape=True),
+        )
+        .order_by(Competency.position, Competency.id, CompetencyLevel.position)
+    )
+
+
+def group_level_descriptions(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """[{"name", "descriptions": {level: description}}] from level_descriptions_query rows."""
+    grouped: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        entry = grouped.setdefault(row.id, {"name": row.name, "descriptions": {}})
+        entry["descriptions"][row.level] = row.description
+    return list(grouped.values())
+
+
+def department_competency_rows(db: Session, department_id) -> List[Competency]:
+    return (
+        db.query(Competency)
+        .options(lazyload(Competency.levels))  # levels are not needed here
+        .join(JobTitle, JobTitle.id == Competency.job_title_id)
+        .filter(JobTitle.department_id == department_id)
+        .order_by(JobTitle.job_title, Competency.position)
+        .all()
+    )
+
+
+def department_competency_job_titles_query(department_id):
+    return (
+        select(Competency.name, JobTitle.job_title)
+        .join(JobTitle, JobTitle.id == Competency.job_title_id)
+        .where(JobTitle.department_id == department_id)
+        .distinct()
+        .order_by(Competency.name, JobTitle.job_title)
+    )
+
+
+def department_competency_job_titles(db: Session, department_id) -> List[Dict[str, Any]]:
+    """Each competency name in a department with the job titles that list it."""
+    rows = db.execute(department_competency_job_titles_query(department_id)).all()
+    job_titles: Dict[str, List[str]] = {}
+    for row in rows:
+        job_titles.setdefault(row.name, []).append(row.job_title)
+    return [{"competency": name, "job_titles": titles} for name, titles in job_titles.items()]
@@ -0,0 +1,216 @@
+"""
+Response compression and the frontend's static files.
+
+CompressionMiddleware brotli- or gzip-encodes responses according to the
+client's Accept-Encoding. Only complete, single-message bodies of at least
+COMPRESS_MIN_BYTES with a text-like content type are compressed: JSON from
+the API, small static files. Streamed bodies and responses that already
+carry a Content-Encoding pass through untouched. Brotli needs the `brotli`
+package; without it only gzip is offered.
+
+SPAStaticFiles serves the React build:
+    - `<file>.br` / `<file>.gz` written next to an asset at image build time
+      (`python compression.py client_build`) are served instead of the asset
+      when the client accepts them, so nothing is compressed per request
+    - content-hashed filenames (static/js/main.bc7907e8.js) are cached as
+      immutable for a year; everything else, index.html included, is
+      revalidated on every use
+    - paths without a file extension outside /api fall back to index.html,
+      so client-side routes survive a reload
+
+Configuration (environment):
+    COMPRESS_MIN_BYTES       smallest body worth compressing (1024)
+    COMPRESS_GZIP_LEVEL      gzip level for responses (6)
+    COMPRESS_BROTLI_QUALITY  brotli quality for responses (4; build-time assets use 11)
+"""
+import argparse
+import gzip
+import mimetypes
+import os
+import re
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+COMPRESSIBLE_EXTENSIONS = (".html", ".js", ".css", ".json", ".map", ".svg", ".txt", ".xml", ".ico")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+# CRA build output: name.<8+ hex digits>.ext
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.")
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Codings the client accepts (q > 0); '*' stands for any."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip())
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Brotli when available and accepted, else gzip, else None."""
+    if not accept_encoding:
+        return None
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _compressible_type(headers) -> bool:
+    return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding")) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # held until the body shows whether it is worth compressing
+                return
+            if start is None:
+                await send(message)
+                return
+            held, start = start, None
+            headers = MutableHeaders(raw=held["headers"])
+            body = message.get("body", b"")
+            if _compressible_type(headers) and "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+            if (
+                message["type"] != "http.response.body"
+                or message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or "no-transform" in headers.get("cache-control", "")
+                or held["status"] == 206
+                or not _compressible_type(headers)
+            ):
+                await send(held)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag  # the bytes differ from the identity representation
+            await send(held)
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+
+class SPAStaticFiles(StaticFiles):
+    """StaticFiles for the React build; see the module docstring."""
+
+    def __init__(self, directory: str):
+        super().__init__(directory=directory, html=True)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404 or path.split("/", 1)[0] == "api" or os.path.splitext(path)[1]:
+                raise
+        return await super().get_response("index.html", scope)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE if HASHED_NAME.search(os.path.basename(full_path)) else REVALIDATE_CACHE,
+        }
+        serve_path = full_path
+        if full_path.endswith(COMPRESSIBLE_EXTENSIONS):
+            headers["Vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+                if encoding in accepted and os.path.isfile(full_path + suffix):
+                    serve_path = full_path + suffix
+                    stat_result = os.stat(serve_path)
+                    headers["Content-Encoding"] = encoding
+                    break
+
+        response = FileResponse(
+            serve_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            media_type=mimetypes.guess_type(full_path)[0] or "text/plain",
+            headers=headers,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def precompress(directory: str, minimum_size: int = MIN_BYTES) -> int:
+    """Writes .br (when brotli is installed) and .gz siblings of compressible assets; returns files written."""
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as source:
+                body = source.read()
+            if len(body) < minimum_size:
+                continue
+            variants = [(".gz", gzip.compress(body, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append((".br", brotli.compress(body, quality=11)))
+            for suffix, data in variants:
+                if len(data) < len(body):  # no point serving a bigger file
+                    with open(path + suffix, "wb") as target:
+                        target.write(data)
+                    written += 1
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-compress the frontend build for SPAStaticFiles.")
+    parser.add_argument("directory", nargs="?", default=os.path.join(os.path.dirname(__file__), "client_build"))
+    args = parser.parse_args()
+    print(f"{precompress(args.directory)} compressed files written to {args.directory}")
@@ -0,0 +1,132 @@
+"""
+Run-once data migrations.
+
+Each migration records its name in `data_migrations` when it commits, so later
+boots skip it with a single primary-key lookup. The state row is inserted
+before the work, in the same transaction: a second worker booting at the same
+time blocks on that row and then skips, instead of doing the work twice.
+
+Run by migrate.py before deploys, or standalone:
+    python data_migrations.py                 # run pending migrations
+    python data_migrations.py --force NAME    # re-run one migration
+"""
+import argparse
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from competency_store import backfill as normalize_competencies
+from models import Competency, CompetencyEvolution, CompetencyLevel, CompetencyTrend, DataMigration, JobTitle
+
+
+def migrate_existing_competencies(db: Session) -> int:
+    """
+    Transfers historical competency data to competency_evolution, so every
+    existing competency has an "Initial Record". Reads the normalized
+    competency tables (filled by normalize_competencies). Set-based: one
+    query for the keys already recorded, one for the competencies, one for
+    their levels, one bulk insert.
+    """
+    existing = set(
+        db.query(CompetencyEvolution.competency_name, CompetencyEvolution.job_title)
+        .filter(CompetencyEvolution.job_level == "N/A")
+        .all()
+    )
+    competencies = (
+        db.query(Competency.id, Competency.name, JobTitle.job_title)
+        .join(JobTitle, JobTitle.id == Competency.job_title_id)
+        .order_by(JobTitle.job_title, Competency.position)
+        .all()
+    )
+    descriptions: Dict[int, Dict[str, Optional[str]]] = {}
+    for level in (
+        db.query(CompetencyLevel.competency_id, CompetencyLevel.level, CompetencyLevel.description)
+        .order_by(CompetencyLevel.competency_id, CompetencyLevel.position)
+    ):
+        descriptions.setdefault(level.competency_id, {})[level.level] = level.description
+
+    now = datetime.utcnow()
+    rows = []
+    for competency in competencies:
+        key = (competency.name, competency.job_title)
+        if key in existing:
+            continue
+        existing.add(key)
+        rows.append({
+            "competency_name": competency.name,
+            "job_title": competency.job_title,
+            "job_level": "N/A",  # Since we're bulk importing
+            "change_type": "Initial Record",
+            "old_value": "None",
+            "new_value": str(descriptions.get(competency.id, {})),
+            "date_changed": now,
+        })
+
+    if rows:
+        db.bulk_insert_mappings(CompetencyEvolution, rows)
+    return len(rows)
+
+
+def drop_seeded_trends(db: Session) -> int:
+    """
+    Deletes the competency_trends rows seeded with average_score=0 before
+    trend_rollups existed. They carry no score count, so they are not monthly
+    averages; the rollups recreate any (competency, department, month) that has
+    scores.
+    """
+    return db.query(CompetencyTrend).filter(CompetencyTrend.score_count.is_(None)).delete(synchronize_session=False)
+
+
+# Run in this order
+MIGRATIONS: Dict[str, Callable[[Session], Optional[int]]] = {
+    "normalize_competencies": normalize_competencies,
+    "migrate_existing_competencies": migrate_existing_competencies,
+    "drop_seeded_trends": drop_seeded_trends,
+}
+
+
+def run_once(db: Session, name: str, migration: Callable[[Session], Optional[int]], force: bool = False) -> bool:
+    """Runs `migration` unless it already completed. Returns True if it ran."""
+    if force:
+        db.query(DataMigration).filter(DataMigration.name == name).delete()
+    elif db.get(DataMigration, name) is not None:
+        return False
+
+    try:
+        db.add(DataMigration(name=name))
+        db.flush()  # claims the name; a concurrent run waits here, then fails the insert
+        result = migration(db)
+        db.get(DataMigration, name).details = {"result": result}
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logging.info(f"Data migration '{name}' completed by another process; skipping.")
+        return False
+    except Exception as e:
+        db.rollback()
+        logging.error(f"❌ Data migration '{name}' failed: {e}")
+        return False
+
+    logging.info(f"✅ Data migration '{name}' done: {result}")
+    return True
+
+
+def run_pending(db: Session, force: Optional[str] = None):
+    DataMigration.__table__.create(bind=db.get_bind(), checkfirst=True)
+    for name, migration in MIGRATIONS.items():
+        run_once(db, name, migration, force=(name == force))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Run pending run-once data migrations.")
+    parser.add_argument("--force", choices=sorted(MIGRATIONS), help="re-run this migration even if it completed")
+    args = parser.parse_args()
+
+    from deps import SessionLocal
+
+    with SessionLocal() as session:
+        run_pending(session, force=args.force)
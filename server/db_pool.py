@@ -0,0 +1,189 @@
+"""
+Database engine construction and connection pool metrics.
+
+Pool behaviour is driven by the environment so it can be tuned per deployment
+without code changes. `DB_PGBOUNCER=true` targets a PgBouncer endpoint in
+transaction pooling mode: SQLAlchemy stops pooling (PgBouncer does it) and no
+session-level settings are sent, since they would leak between clients that
+share a server connection.
+
+The same settings apply to the asyncpg engine behind `deps.get_async_db`.
+
+Configuration (environment):
+    DB_POOL_SIZE              persistent connections per worker (10)
+    DB_MAX_OVERFLOW           extra connections under burst load (20)
+    DB_POOL_TIMEOUT           seconds to wait for a free connection (30)
+    DB_POOL_RECYCLE           recycle connections older than this many seconds (1800)
+    DB_POOL_PRE_PING          test connections on checkout (true)
+    DB_STATEMENT_TIMEOUT_MS   server-side statement timeout, 0 disables (30000)
+    DB_APPLICATION_NAME       application_name reported to Postgres (interviewapp)
+    DB_PGBOUNCER              PgBouncer transaction pooling mode (false)
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", "true")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "interviewapp")
+DB_PGBOUNCER = _env_bool("DB_PGBOUNCER", "false")
+
+
+class PoolMetrics:
+    """Checkout wait times, pool timeouts and connect errors, recorded by `InstrumentedQueuePool`."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connect_errors = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, error: Exception = None):
+        with self._lock:
+            if error is None:
+                self.checkouts += 1
+            elif isinstance(error, PoolTimeoutError):
+                self.timeouts += 1
+            else:
+                self.connect_errors += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts + self.connect_errors
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connect_errors": self.connect_errors,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long each checkout waits for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception as e:
+            self.metrics.record(time.perf_counter() - start, e)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def build_engine(url: str) -> Engine:
+    backend = make_url(url).get_backend_name()
+    if backend != "postgresql":
+        # SQLite and friends (tests, local tooling) keep SQLAlchemy's defaults
+        return create_engine(url, pool_pre_ping=DB_POOL_PRE_PING)
+
+    connect_args: Dict[str, Any] = {"application_name": DB_APPLICATION_NAME}
+    if DB_PGBOUNCER:
+        if DB_STATEMENT_TIMEOUT_MS:
+            logging.info("DB_PGBOUNCER is set; configure statement_timeout on the database role instead.")
+        return create_engine(url, poolclass=NullPool, connect_args=connect_args)
+
+    if DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+def async_database_url(url: str) -> str:
+    """Maps a sync database URL onto its async driver (asyncpg for Postgres)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in ("postgres", "postgresql"):
+        return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    return url
+
+
+def build_async_engine(url: str):
+    # Imported here so the sync app does not need the async extras to start
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    if make_url(url).get_backend_name() != "postgresql":
+        return create_async_engine(url, pool_pre_ping=DB_POOL_PRE_PING)
+
+    server_settings = {"application_name": DB_APPLICATION_NAME}
+    if DB_PGBOUNCER:
+        # Transaction pooling cannot keep per-connection prepared statements: turn off
+        # both asyncpg's statement cache and the SQLAlchemy dialect's own one
+        return create_async_engine(
+            url, poolclass=NullPool,
+            connect_args={
+                "server_settings": server_settings, "statement_cache_size": 0, "prepared_statement_cache_size": 0,
+            },
+        )
+
+    if DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT_MS)
+    return create_async_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={"server_settings": server_settings},
+    )
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__, "pgbouncer_mode": DB_PGBOUNCER}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout_seconds": DB_POOL_TIMEOUT,
+            "recycle_seconds": DB_POOL_RECYCLE,
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
@@ -1,10 +1,10 @@
 import os
 from fastapi import Header, HTTPException
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 import jwt
 
+from db_pool import async_database_url, build_async_engine, build_engine
 from models import AuditLog, User
 
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -16,8 +16,41 @@ if not DATABASE_URL:
     PGDATABASE = os.getenv("PGDATABASE", "railway")
     DATABASE_URL = f"postgresql://{PGUSER}:{PGPASSWORD}@{PGHOST}:{PGPORT}/{PGDATABASE}"
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Pool size, recycle, timeouts and PgBouncer mode come from the environment (see db_pool)
+engine = build_engine(DATABASE_URL)
+
+
+class AppSession(Session):
+    """Session class of the app's sessions, sync and async; etags.py hooks its flushes."""
+
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AppSession)
+
+# Async engine for read-heavy async routes; created on first use (needs asyncpg)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+_async_engine = None
+_async_sessionmaker = None
+
+
+def get_async_engine():
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        _async_engine = build_async_engine(ASYNC_DATABASE_URL)
+        _async_sessionmaker = sessionmaker(
+            bind=_async_engine, class_=AsyncSession, sync_session_class=AppSession,
+            autoflush=False, expire_on_commit=False,
+        )
+    return _async_engine
+
+
+async def dispose_async_engine():
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
 
 JWT_SECRET = os.getenv("JWT_SECRET", "your_jwt_secret")
 
@@ -30,6 +63,12 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    get_async_engine()
+    async with _async_sessionmaker() as db:
+        yield db
+
 # Dependency to get current admin from JWT token
 
 def get_current_admin(authorization: str = Header(...)):
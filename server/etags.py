@@ -0,0 +1,116 @@
+"""
+Version-based ETags for read-mostly endpoints.
+
+Tables are grouped into scopes. Every flush of an app session
+(deps.AppSession) that inserts, updates or deletes a row of a scope's tables
+bumps that scope's counter in `data_versions`, in the same transaction as
+the write. Readers therefore never see new data under an old version.
+
+An endpoint's ETag is built from the versions of the scopes it reads. The
+`conditional` / `aconditional` dependencies read those versions (one
+primary-key query) before the endpoint runs. If the client's If-None-Match
+still matches, they answer 304 straight away and the endpoint's own queries
+never run. Otherwise they set ETag and Cache-Control on the response.
+
+Bulk statements (bulk_insert_mappings, Query.update/delete) bypass the flush
+and do not bump versions; none of them touch these scopes.
+
+Configuration (environment):
+    ETAG_CACHE_CONTROL   Cache-Control for versioned responses ("private, no-cache":
+                         browsers keep the body but revalidate every time)
+    ETAG_SALT            part of every ETag; change it when a response format changes
+"""
+import os
+from itertools import chain
+from typing import Dict, Iterable, Optional
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from deps import AppSession, get_async_db, get_db
+from models import (
+    AnswerSuggestion, Competency, CompetencyLevel, DataVersion, Framework, InterviewQuestion, JobDescription, JobTitle,
+)
+
+CACHE_CONTROL = os.getenv("ETAG_CACHE_CONTROL", "private, no-cache")
+ETAG_SALT = os.getenv("ETAG_SALT", "1")
+
+SCOPES = {
+    "frameworks": (Framework, JobTitle, Competency, CompetencyLevel),
+    "job_descriptions": (JobDescription,),
+    "interview_questions": (InterviewQuestion, AnswerSuggestion),
+}
+_SCOPE_BY_CLASS = {model: scope for scope, models in SCOPES.items() for model in models}
+
+
+# -------------------- WRITES -------------------- #
+
+def _bump_statement(dialect_name: str, scope: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return update(DataVersion).where(DataVersion.name == scope).values(version=DataVersion.version + 1)
+    return insert(DataVersion).values(name=scope, version=1).on_conflict_do_update(
+        index_elements=[DataVersion.name], set_={"version": DataVersion.version + 1}
+    )
+
+
+@event.listens_for(AppSession, "after_flush")
+def _bump_versions(session: Session, flush_context) -> None:
+    # new / dirty / deleted still describe what this flush wrote
+    changed = chain(
+        session.new, session.deleted, (obj for obj in session.dirty if session.is_modified(obj)),
+    )
+    scopes = {_SCOPE_BY_CLASS[type(obj)] for obj in changed if type(obj) in _SCOPE_BY_CLASS}
+    if not scopes:
+        return
+    connection = session.connection()
+    for scope in sorted(scopes):  # fixed order: concurrent writers lock the rows the same way
+        connection.execute(_bump_statement(connection.dialect.name, scope))
+
+
+# -------------------- READS -------------------- #
+
+def _versions_query(scopes: Iterable[str]):
+    return select(DataVersion.name, DataVersion.version).where(DataVersion.name.in_(list(scopes)))
+
+
+def make_etag(scopes: Iterable[str], versions: Dict[str, int]) -> str:
+    return 'W/"{}-{}"'.format(ETAG_SALT, ".".join(f"{scope}{versions.get(scope, 0)}" for scope in scopes))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any((c[2:] if c.startswith("W/") else c) == opaque for c in candidates)
+
+
+def _respond(request: Request, response: Response, etag: str) -> None:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        # FastAPI sends 304 without a body
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+def conditional(*scopes: str):
+    """Route dependency for endpoints on the sync session."""
+    def dependency(request: Request, response: Response, db: Session = Depends(get_db)):
+        versions = dict(db.execute(_versions_query(scopes)).all())
+        _respond(request, response, make_etag(scopes, versions))
+    return dependency
+
+
+def aconditional(*scopes: str):
+    """Route dependency for endpoints on the async session."""
+    async def dependency(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+        versions = dict((await db.execute(_versions_query(scopes))).all())
+        _respond(request, response, make_etag(scopes, versions))
+    return dependency
@@ -0,0 +1,114 @@
+"""
+Read queries over frameworks and job titles that several endpoints share.
+
+Each function issues a fixed number of SQL statements regardless of how many
+job titles a department has (no per-row lazy loads), and compares UUID
+columns natively so their indexes can be used.
+
+The `*_query` builders return the statements the endpoints execute, so
+check_query_plans.py can EXPLAIN exactly those.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, selectinload
+
+from models import CompetencyEvolution, Framework, InterviewQuestion, JobDescription, JobTitle
+
+
+def job_titles_query(department_id):
+    """get-job-titles: the department's job title names."""
+    return select(JobTitle.job_title).where(JobTitle.department_id == department_id)
+
+
+def job_description_query(job_title_id):
+    """get-job-description: the job title's (first) description."""
+    return select(JobDescription).where(JobDescription.job_title_id == job_title_id).limit(1)
+
+
+def interview_questions_query(job_title_id):
+    """get-interview-questions: the saved questions, with their pre-generated rubrics in one extra query."""
+    return (
+        select(InterviewQuestion)
+        .options(selectinload(InterviewQuestion.answers))
+        .where(InterviewQuestion.job_title_id == job_title_id)
+    )
+
+
+def interview_job_titles_query(department_id):
+    return (
+        select(JobTitle.id, JobTitle.job_title, JobTitle.competencies, JobDescription.description)
+        .outerjoin(JobDescription, JobDescription.job_title_id == JobTitle.id)
+        .where(JobTitle.department_id == department_id)
+        .order_by(JobTitle.job_title, JobTitle.id, JobDescription.id)
+    )
+
+
+def interview_job_titles(db: Session, department: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Job titles of a department with their competencies and job description.
+    Returns None when the department does not exist. Two statements total.
+    """
+    department_id = db.query(Framework.id).filter(Framework.department == department).limit(1).scalar()
+    if department_id is None:
+        return None
+
+    rows = db.execute(interview_job_titles_query(department_id)).all()
+
+    job_titles: Dict[Any, Dict[str, Any]] = {}
+    for row in rows:
+        # A job title may have several descriptions; keep the first, as before
+        if row.id not in job_titles:
+            job_titles[row.id] = {
+                "job_title": row.job_title,
+                "competencies": row.competencies if row.competencies else [],
+                "job_description": row.description,
+            }
+    return list(job_titles.values())
+
+
+def competency_categories(db: Session, names: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Category per competency name, taken from its first CompetencyEvolution record. One statement."""
+    names = {name for name in names if name}
+    if not names:
+        return {}
+    first_records = (
+        db.query(func.min(CompetencyEvolution.id))
+        .filter(CompetencyEvolution.competency_name.in_(names))
+        .group_by(CompetencyEvolution.competency_name)
+    )
+    rows = (
+        db.query(CompetencyEvolution.competency_name, CompetencyEvolution.category)
+        .filter(CompetencyEvolution.id.in_(first_records.subquery().select()))
+        .all()
+    )
+    return {row.competency_name: row.category for row in rows}
+
+
+def categorized_framework(db: Session, framework_id, categories: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """
+    A framework's competencies grouped by category, seeded with `categories`.
+    Returns None when the framework does not exist. Three statements total.
+    """
+    framework = db.query(Framework.id, Framework.department).filter(Framework.id == framework_id).first()
+    if not framework:
+        return None
+
+    job_titles = db.query(JobTitle.job_title, JobTitle.competencies).filter(JobTitle.department_id == framework_id).all()
+    competencies = [competency for job in job_titles for competency in (job.competencies or [])]
+    category_by_name = competency_categories(db, (competency.get("name") for competency in competencies))
+
+    categorized_competencies: Dict[str, List[Dict[str, Any]]] = {category: [] for category in categories}
+    for competency in competencies:
+        category = (category_by_name.get(competency.get("name")) or "").strip()
+        if not category:
+            logging.warning(f"⚠️ No category found for '{competency.get('name')}', defaulting to 'Uncategorized'.")
+            category = "Uncategorized"
+        categorized_competencies.setdefault(category, []).append(competency)
+
+    return {
+        "id": framework.id,
+        "department": framework.department,
+        "competencies_by_category": categorized_competencies,
+    }
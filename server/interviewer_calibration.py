@@ -0,0 +1,206 @@
+"""
+Interviewer calibration: who scores harshly or leniently.
+
+Scores are fetched as plain column tuples (no ORM objects) and reduced to
+running totals per (interviewer, candidate): sum, sum of squares and count.
+Each refresh only fetches the scorecard entries created since the previous
+one (a watermark on created_at) and adds their totals in, so the cost of a
+refresh follows the number of new entries, not the table size. Every
+statistic below is derived from those totals with vectorized pandas/NumPy.
+
+Per interviewer:
+    mean, variance     of all their scores
+    z_score            (mean - overall mean) / (overall std / sqrt(count)):
+                       how far their mean sits from everyone's, in standard
+                       errors; <= -2 is reported as "harsh", >= 2 "lenient"
+    agreement          share of their candidates where scoring above / below
+                       the overall mean matched the candidate's consensus
+                       overall_recommendation (feedback, averaged per candidate)
+
+Results are cached for CALIBRATION_CACHE_SECONDS. Entries are counted once
+they are CALIBRATION_LAG_SECONDS old (so rows of transactions still open at
+refresh time are not skipped), and the totals are rebuilt from scratch every
+CALIBRATION_REBUILD_SECONDS to pick up edited or deleted entries.
+
+    python interviewer_calibration.py --bench 200000   # time the statistics on synthetic data
+
+Imports pandas; the analytics router imports this module on first use so
+app startup does not pay for it.
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import InterviewFeedback, ScorecardEntry
+
+CACHE_SECONDS = float(os.getenv("CALIBRATION_CACHE_SECONDS", "60"))
+LAG = timedelta(seconds=float(os.getenv("CALIBRATION_LAG_SECONDS", "60")))
+REBUILD_SECONDS = float(os.getenv("CALIBRATION_REBUILD_SECONDS", "3600"))
+Z_THRESHOLD = 2.0
+EPOCH = datetime(1970, 1, 1)
+
+TOTALS = ["sum", "sumsq", "count"]
+
+# overall_recommendation labels (Ashby sends e.g. "Strong Yes", "StrongNo") -> direction
+RECOMMENDATION_SCORES = {"strongyes": 2.0, "yes": 1.0, "no": -1.0, "strongno": -2.0}
+
+
+def pair_totals(interviewers, candidates, scores) -> pd.DataFrame:
+    """Running totals per (interviewer, candidate) for a batch of scores."""
+    frame = pd.DataFrame({
+        "interviewer": interviewers,
+        "candidate": candidates,
+        "sum": np.asarray(scores, dtype=float),
+    })
+    frame["sumsq"] = frame["sum"] ** 2
+    frame["count"] = 1
+    return frame.groupby(["interviewer", "candidate"], sort=False)[TOTALS].sum()
+
+
+def recommendation_by_candidate(candidates, recommendations) -> pd.Series:
+    """Mean recommendation direction per candidate; unknown labels are ignored."""
+    labels = pd.Series(recommendations, dtype="object").fillna("").astype(str)
+    directions = labels.str.lower().str.replace(r"[^a-z]", "", regex=True).map(RECOMMENDATION_SCORES)
+    frame = pd.DataFrame({"candidate": candidates, "direction": directions}).dropna()
+    return frame.groupby("candidate")["direction"].mean()
+
+
+def calibration_stats(pairs: pd.DataFrame, recommendations: pd.Series, min_scores: int = 1) -> Dict[str, Any]:
+    """Per-interviewer statistics from (interviewer, candidate) totals; fully vectorized."""
+    total = pairs[TOTALS].sum()
+    if total["count"] == 0:
+        return {"overall": {"mean": None, "std": None, "entries": 0}, "interviewers": []}
+    overall_mean = total["sum"] / total["count"]
+    overall_var = max(total["sumsq"] / total["count"] - overall_mean ** 2, 0.0)
+    overall_std = float(np.sqrt(overall_var))
+
+    per = pairs.groupby(level="interviewer")[TOTALS].sum()
+    mean = per["sum"] / per["count"]
+    # Sample variance from the totals; undefined for a single score
+    variance = (per["sumsq"] - per["count"] * mean ** 2) / (per["count"] - 1)
+    variance = variance.where(per["count"] > 1).clip(lower=0)
+    z_score = (mean - overall_mean) / (overall_std / np.sqrt(per["count"])) if overall_std > 0 else mean * 0.0
+
+    # Agreement: did the interviewer land on the same side as the candidate's recommendation?
+    deviation = pd.Series(pairs["sum"].to_numpy() / pairs["count"].to_numpy() - overall_mean, index=pairs.index)
+    direction = recommendations.reindex(pairs.index.get_level_values("candidate")).to_numpy()
+    rated = ~np.isnan(direction) & (direction != 0) & (deviation.to_numpy() != 0)
+    agrees = rated & (np.sign(deviation.to_numpy()) == np.sign(direction))
+    interviewer_index = pairs.index.get_level_values("interviewer")
+    rated_candidates = pd.Series(rated, index=interviewer_index).groupby(level=0).sum()
+    agreeing = pd.Series(agrees, index=interviewer_index).groupby(level=0).sum()
+    agreement = (agreeing / rated_candidates).where(rated_candidates > 0)
+
+    result = pd.DataFrame({
+        "scores": per["count"].astype(int),
+        "candidates": pairs.groupby(level="interviewer").size(),
+        "mean": mean,
+        "variance": variance,
+        "z_score": z_score,
+        "agreement": agreement,
+        "rated_candidates": rated_candidates.astype(int),
+    })
+    result = result[result["scores"] >= min_scores].sort_values("z_score")
+    result["calibration"] = np.select(
+        [result["z_score"] <= -Z_THRESHOLD, result["z_score"] >= Z_THRESHOLD], ["harsh", "lenient"], "calibrated"
+    )
+    rows = result.round(4).astype(object).where(result.notna(), None).reset_index().to_dict("records")
+    return {
+        "overall": {"mean": round(float(overall_mean), 4), "std": round(overall_std, 4), "entries": int(total["count"])},
+        "interviewers": rows,
+    }
+
+
+class CalibrationCache:
+    """Running totals plus the last result; one per process."""
+
+    def __init__(self):
+        self.pairs = pd.DataFrame(columns=TOTALS, index=pd.MultiIndex.from_arrays([[], []], names=["interviewer", "candidate"]))
+        self.watermark = EPOCH
+        self.rebuilt_at = 0.0
+        self.result: Optional[Dict[str, Any]] = None
+        self.result_key = None
+        self.computed_at = 0.0
+        self.lock = threading.Lock()
+
+    def _fetch_new(self, db: Session, until: datetime) -> None:
+        rows = db.execute(
+            select(ScorecardEntry.interviewer_id, ScorecardEntry.candidate_id, ScorecardEntry.score).where(
+                ScorecardEntry.created_at > self.watermark,
+                ScorecardEntry.created_at <= until,
+                ScorecardEntry.interviewer_id.isnot(None),
+                ScorecardEntry.score.isnot(None),
+            )
+        ).all()
+        if rows:
+            interviewers, candidates, scores = zip(*rows)
+            batch = pair_totals(interviewers, [str(candidate) for candidate in candidates], scores)
+            self.pairs = batch if self.pairs.empty else self.pairs.add(batch, fill_value=0)
+        self.watermark = until
+
+    def get(self, db: Session, min_scores: int = 1) -> Dict[str, Any]:
+        with self.lock:
+            now = time.monotonic()
+            if self.result is not None and self.result_key == min_scores and now - self.computed_at < CACHE_SECONDS:
+                return self.result
+
+            if now - self.rebuilt_at >= REBUILD_SECONDS:
+                self._reset()
+                self.rebuilt_at = now
+            self._fetch_new(db, datetime.utcnow() - LAG)
+
+            feedback = db.execute(
+                select(InterviewFeedback.candidate_id, InterviewFeedback.overall_recommendation)
+                .where(InterviewFeedback.overall_recommendation.isnot(None))
+            ).all()
+            candidates, labels = zip(*feedback) if feedback else ((), ())
+            recommendations = recommendation_by_candidate([str(candidate) for candidate in candidates], labels)
+
+            self.result = {
+                "computed_at": datetime.utcnow().isoformat(),
+                **calibration_stats(self.pairs, recommendations, min_scores),
+            }
+            self.result_key = min_scores
+            self.computed_at = now
+            return self.result
+
+    def _reset(self):
+        """Drops the totals so the next fetch starts from the beginning."""
+        self.pairs = self.pairs.iloc[0:0]
+        self.watermark = EPOCH
+
+
+calibration_cache = CalibrationCache()
+
+
+def interviewer_calibration(db: Session, min_scores: int = 1) -> Dict[str, Any]:
+    return calibration_cache.get(db, min_scores)
+
+
+def _bench(entries: int) -> None:
+    rng = np.random.default_rng(0)
+    interviewers = rng.integers(0, 300, entries).astype(str)
+    candidates = rng.integers(0, entries // 5, entries).astype(str)
+    scores = rng.integers(1, 5, entries)
+    labels = rng.choice(["Strong Yes", "Yes", "No", "Strong No"], entries // 5)
+
+    started = time.perf_counter()
+    pairs = pair_totals(interviewers, candidates, scores)
+    recommendations = recommendation_by_candidate(np.arange(entries // 5).astype(str), labels)
+    stats = calibration_stats(pairs, recommendations)
+    elapsed = time.perf_counter() - started
+    print(f"{entries} entries, {len(stats['interviewers'])} interviewers: {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the calibration statistics on synthetic scores.")
+    parser.add_argument("--bench", type=int, default=200000, metavar="ENTRIES")
+    _bench(parser.parse_args().bench)
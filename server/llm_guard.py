@@ -0,0 +1,251 @@
+"""
+Circuit breaking, deadlines and hedged requests around OpenAI chat completions.
+
+Every chat completion goes through `chat_completion`, which
+  - fails fast with `CircuitOpenError` while the breaker for that model is open,
+  - bounds the call by a per-endpoint deadline (no client-side retries), and
+  - optionally hedges: if the first attempt has not answered after a short
+    delay, a second identical request is raised and the first answer wins.
+
+Async endpoints should run LLM work through `run_blocking`, which uses a
+dedicated, bounded thread pool so a slow provider cannot tie up the event loop
+or the threadpool that serves the non-LLM endpoints.
+
+The OpenAI SDK (and the client, which needs OPENAI_API_KEY) is imported on
+the first call rather than with this module; `warm_up` imports it ahead of
+time, off the request path.
+
+Configuration (environment):
+    LLM_DEFAULT_DEADLINE_SECONDS   default per-call deadline (30)
+    LLM_DEADLINES                  per-endpoint overrides, e.g. "assess_candidate_answer=8,categorize_with_ai=4"
+    LLM_HEDGE_DELAY_SECONDS        wait before raising the hedge request (1.5)
+    LLM_MAX_CONCURRENCY            size of the LLM worker pool (16)
+    LLM_BREAKER_WINDOW_SECONDS     rolling window for error/latency rates (30)
+    LLM_BREAKER_MIN_CALLS          calls required in the window before tripping (5)
+    LLM_BREAKER_ERROR_RATE         error share that opens the breaker (0.5)
+    LLM_BREAKER_SLOW_CALL_SECONDS  latency above which a call counts as slow (10)
+    LLM_BREAKER_SLOW_RATE          slow-call share that opens the breaker (0.5)
+    LLM_BREAKER_COOLDOWN_SECONDS   time the breaker stays open before probing (20)
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Dict, Tuple
+
+DEFAULT_DEADLINE = float(os.getenv("LLM_DEFAULT_DEADLINE_SECONDS", "30"))
+HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "1.5"))
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+BREAKER_WINDOW = float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", "30"))
+BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_SLOW_CALL = float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", "10"))
+BREAKER_SLOW_RATE = float(os.getenv("LLM_BREAKER_SLOW_RATE", "0.5"))
+BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "20"))
+
+
+def _provider_errors() -> Tuple[type, ...]:
+    """Provider-side failures trip the breaker; request errors (4xx) do not."""
+    import openai
+
+    return openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError
+
+
+def warm_up() -> None:
+    """Imports the OpenAI SDK and builds the client so the first LLM call does not pay for it."""
+    try:
+        import openai_client  # noqa: F401
+    except Exception as e:
+        logging.warning(f"⚠️ OpenAI client not ready: {e}")
+
+
+class LLMUnavailableError(Exception):
+    """Base class for fast failures when the LLM provider cannot serve a call."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised without calling the provider while a model's breaker is open."""
+
+
+class LLMDeadlineExceeded(LLMUnavailableError):
+    """Raised when a call does not complete within its endpoint deadline."""
+
+
+def _parse_deadlines(raw: str) -> Dict[str, float]:
+    deadlines = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        name, _, seconds = item.partition("=")
+        try:
+            deadlines[name.strip()] = float(seconds)
+        except ValueError:
+            logging.warning(f"Ignoring invalid LLM_DEADLINES entry: {item}")
+    return deadlines
+
+
+ENDPOINT_DEADLINES = _parse_deadlines(
+    os.getenv("LLM_DEADLINES", "assess_candidate_answer=8,categorize_with_ai=4")
+)
+
+
+def deadline_for(endpoint: str) -> float:
+    return ENDPOINT_DEADLINES.get(endpoint, DEFAULT_DEADLINE)
+
+
+class CircuitBreaker:
+    """Rolling-window breaker on error rate and slow-call rate for one model."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "closed"
+        self.opened_at = 0.0
+        self._calls = deque()  # (finished_at, ok, latency)
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        while self._calls and now - self._calls[0][0] > BREAKER_WINDOW:
+            self._calls.popleft()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= BREAKER_COOLDOWN:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record(self, ok: bool, latency: float):
+        now = time.monotonic()
+        with self._lock:
+            if self.state == "half_open":
+                self._probe_in_flight = False
+                if ok and latency < BREAKER_SLOW_CALL:
+                    self.state = "closed"
+                    self._calls.clear()
+                    logging.info(f"LLM circuit for {self.name} closed")
+                else:
+                    self._open(now)
+                return
+
+            self._calls.append((now, ok, latency))
+            self._trim(now)
+            total = len(self._calls)
+            if self.state != "closed" or total < BREAKER_MIN_CALLS:
+                return
+            errors = sum(1 for _, call_ok, _ in self._calls if not call_ok)
+            slow = sum(1 for _, _, call_latency in self._calls if call_latency >= BREAKER_SLOW_CALL)
+            if errors / total >= BREAKER_ERROR_RATE or slow / total >= BREAKER_SLOW_RATE:
+                self._open(now)
+
+    def _open(self, now: float):
+        self.state = "open"
+        self.opened_at = now
+        logging.warning(f"LLM circuit for {self.name} opened")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.monotonic())
+            total = len(self._calls)
+            return {
+                "state": self.state,
+                "calls_in_window": total,
+                "errors_in_window": sum(1 for _, ok, _ in self._calls if not ok),
+                "slow_in_window": sum(1 for _, _, latency in self._calls if latency >= BREAKER_SLOW_CALL),
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+_llm_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="llm")
+_hedge_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="llm-hedge")
+
+
+def breaker_for(model: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker(model)
+        return _breakers[model]
+
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+def _attempt(breaker: CircuitBreaker, deadline: float, kwargs: Dict[str, Any]):
+    started = time.monotonic()
+    try:
+        import openai
+        from openai_client import client
+    except Exception:
+        # No usable client (SDK or OPENAI_API_KEY missing) is still an outcome: a half-open probe must settle
+        breaker.record(False, time.monotonic() - started)
+        raise
+
+    try:
+        response = client.with_options(timeout=deadline, max_retries=0).chat.completions.create(**kwargs)
+    except openai.APITimeoutError as e:
+        breaker.record(False, time.monotonic() - started)
+        raise LLMDeadlineExceeded(f"{breaker.name} call exceeded {deadline:.1f}s") from e
+    except _provider_errors():
+        breaker.record(False, time.monotonic() - started)
+        raise
+    except Exception:
+        # Request-side errors say nothing about provider health.
+        breaker.record(True, time.monotonic() - started)
+        raise
+    breaker.record(True, time.monotonic() - started)
+    return response
+
+
+def chat_completion(endpoint: str, hedge: bool = False, **kwargs):
+    """
+    Guarded replacement for `client.chat.completions.create(**kwargs)`.
+    `endpoint` selects the deadline; `hedge` enables a second, racing attempt.
+    """
+    model = kwargs.get("model", "gpt-3.5-turbo")
+    breaker = breaker_for(model)
+    deadline = deadline_for(endpoint)
+    if not breaker.allow():
+        raise CircuitOpenError(f"LLM circuit for {model} is open")
+
+    if not hedge or HEDGE_DELAY >= deadline:
+        return _attempt(breaker, deadline, kwargs)
+
+    started = time.monotonic()
+    pending = {_hedge_pool.submit(_attempt, breaker, deadline, kwargs)}
+    done, pending = wait(pending, timeout=HEDGE_DELAY)
+    if not done and breaker.allow():
+        remaining = max(deadline - (time.monotonic() - started), 0.1)
+        pending.add(_hedge_pool.submit(_attempt, breaker, remaining, kwargs))
+
+    last_error = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            last_error = future.exception()
+        remaining = deadline - (time.monotonic() - started)
+        if not pending or remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+
+    if last_error is not None:
+        raise last_error
+    raise LLMDeadlineExceeded(f"{model} call exceeded {deadline:.1f}s")
+
+
+async def run_blocking(fn: Callable, *args, **kwargs):
+    """Runs blocking LLM work on the dedicated LLM pool instead of the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_llm_pool, partial(fn, *args, **kwargs))
@@ -2,29 +2,49 @@ import os
 import asyncio
 import logging
 import threading
+from datetime import date, datetime, timedelta
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 
 import bcrypt
 import jwt
-import pandas as pd
-import httpx
 import bleach
-from bs4 import BeautifulSoup
 
-from fastapi import FastAPI, HTTPException, Depends, Path, Header, Query, Body
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, Path, Header, Query, Body, BackgroundTasks, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 from dotenv import load_dotenv
-from alembic import command
-from alembic.config import Config
-from sqlalchemy import text
+from sqlalchemy import exists, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from deps import engine, SessionLocal, get_db
+from deps import engine, SessionLocal, dispose_async_engine, get_async_db, get_db, get_current_admin
+from compression import CompressionMiddleware, SPAStaticFiles
+from db_pool import pool_stats
+from etags import aconditional, conditional
+from competency_key import get_competency_key
+from competency_store import (
+    department_competency_job_titles, department_competency_rows, group_level_descriptions,
+    level_descriptions_query, sync_job_title,
+)
+from trend_rollups import rollup_trends_periodically
+from framework_queries import (
+    categorized_framework, interview_job_titles, interview_questions_query, job_description_query, job_titles_query,
+)
+from pagination import NEXT_CURSOR_HEADER, PAGE_SIZE_DEFAULT, keyset, page_size, split_page
+from resolution_cache import (
+    aload_job_title,
+    aresolve_department_id,
+    aresolve_job_title_id,
+    invalidate_departments,
+    invalidate_job_titles,
+    load_job_title,
+    resolution_cache_stats,
+    resolve_department_id,
+    resolve_job_title_id,
+)
 
 # Load environment variables from .env
 load_dotenv()
@@ -36,102 +56,40 @@ from models import (
     InterviewQuestion, AnswerSuggestion, CompetencyEvolution, IPWhitelist,
     HRPolicyVersion, Policy, AuditLog
 )
-from schemas import CompetencyCreate, UserUpdateRequest, IPWhitelistRequest
+from schemas import (
+    CandidateSummary, CompetencyCreate, FrameworkSearchResponse, UserUpdateRequest, IPWhitelistRequest,
+)
+from responses import FastJSONResponse, json_response
+from llm_guard import (
+    BREAKER_COOLDOWN, LLMDeadlineExceeded, LLMUnavailableError, chat_completion, get_breaker_states,
+    run_blocking, warm_up as warm_up_llm_client,
+)
+from structured_output import (
+    AnswerAssessmentBatch, CompetencyBreakdown, GeneratedInterviewQuestions, StructuredOutputError,
+    generate_structured, get_parse_stats,
+)
 
 # --- Ashby Integration Import ---
 # CORRECT: We only need the router from our new ashbyapi module.
 # The sync functions will be triggered via API endpoints defined within the router.
 from ashbyapi import router as ashby_router
-# Functions used during startup and periodic updates
-
-import subprocess
-
-# Load environment variables
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
-
-# Fetch DATABASE_URL from Railway variables
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    PGUSER = os.getenv("PGUSER", "postgres")
-    PGPASSWORD = os.getenv("PGPASSWORD")
-    if not PGPASSWORD:
-        raise ValueError("Database password not provided in environment variables.")
-    PGHOST = os.getenv("PGHOST", "postgres.railway.internal")
-    PGPORT = os.getenv("PGPORT", "5432")
-    PGDATABASE = os.getenv("PGDATABASE", "railway")
-    DATABASE_URL = f"postgresql://{PGUSER}:{PGPASSWORD}@{PGHOST}:{PGPORT}/{PGDATABASE}"
-
-# Use shared engine from deps
-
-# Test Database Connection (For Debugging)
-try:
-    connection = engine.connect()
-    logging.info("✅ Connected to the database successfully!")
-    connection.close()
-except Exception as e:
-    logging.error(f"❌ Failed to connect to the database: {e}")
-
-def reset_alembic_history():
-    print("🛠  Resetting Alembic version table...")
-    with engine.begin() as conn:
-        conn.execute(text("DELETE FROM alembic_version"))
-    print("✅ Alembic version table cleared.")
-
-def run_migrations():
-    alembic_cfg = Config("alembic.ini")
-    reset_alembic_history()
-    command.upgrade(alembic_cfg, "head")
-
-# ✅ Step 1: Reset history
-reset_alembic_history()
-
-# ✅ Step 2: Run migrations
-run_migrations()
-
-app = FastAPI()
-# Safe conditional mount for React frontend (avoids Railway crash)
-frontend_dir = os.path.join(os.path.dirname(__file__), "client_build")
-if os.path.isdir(frontend_dir):
-    app.mount("/", StaticFiles(directory=frontend_dir, html=True), name="frontend")
-
-    @app.get("/{full_path:path}", include_in_schema=False)
-    async def spa_catchall(full_path: str):
-        return FileResponse(os.path.join(frontend_dir, "index.html"))
-
-# Configure CORS before including any routers or endpoints
-origins = [
-    "https://interviewapp-react-production.up.railway.app",
-    "http://localhost:3000"
-]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+from answer_suggestions import pregenerate_answer_suggestions
+from candidate_store import get_candidate_store, make_candidate_id, new_search_session_id
+from candidate_summaries import attach_summary, public_candidate, schedule_pregeneration, summary_cache
+from search_backend import (
+    cache_stats as search_cache_stats, close_http_client, fetch_search_page, normalize_search,
+    normalize_xray, search_results_cache, xray_query_cache,
 )
-
-# Include the Ashby router after the middleware is in place
-app.include_router(ashby_router)
-
 from routers.users import router as users_router
 from routers.policies import router as policies_router
-from openai_client import client
+from routers.analytics import router as analytics_router
 
-app.include_router(users_router)
-app.include_router(policies_router)
-
-# Serve built React frontend if present
-frontend_dir = os.path.join(os.path.dirname(__file__), "client_build")
-if os.path.isdir(frontend_dir):
-    app.mount("/", StaticFiles(directory=frontend_dir, html=True), name="frontend")
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 
-    @app.get("/{full_path:path}", include_in_schema=False)
-    async def spa_catchall(full_path: str):
-        return FileResponse(os.path.join(frontend_dir, "index.html"))
+# Schema (Alembic) and data migrations run from migrate.py, not on import.
+# Routes below register on `router`; create_app() assembles the application.
+router = APIRouter()
 
 # Ashby API Key
 ASHBY_API_KEY = os.getenv("ASHBY_API_KEY")
@@ -143,67 +101,17 @@ else:
 # JWT secret key
 JWT_SECRET = os.getenv("JWT_SECRET", "your_jwt_secret")
 
+CORS_ORIGINS = [
+    "https://interviewapp-react-production.up.railway.app",
+    "http://localhost:3000"
+]
+
 STATIC_CATEGORIES = [
     "Technical Skills", "Leadership & Management", "Soft Skills",
     "Process & Delivery", "Domain-Specific Knowledge"
 ]
 
-# Database setup comes from deps (SessionLocal)
-
-# ─── LOAD YOUR EXCEL KEY ──────────────────────────────────────────────
-# Allow overriding the path via environment variable
-KEY_FILE = os.getenv("KEY_FILE", "data/Competency Key.xlsx")
-SHEET_NAME = "Sheet1"
-
-competency_key: Dict[str, Dict[str, str]] = {}
-levels: List[str] = []
-KEY_MD = ""
-
-if os.path.exists(KEY_FILE):
-    try:
-        # Read into a DataFrame
-        key_df = pd.read_excel(KEY_FILE, sheet_name=SHEET_NAME)
-
-        # ─── Normalize headers: strip whitespace and lowercase ──────────
-        key_df.columns = key_df.columns.str.strip().str.lower()
-
-        # If there's no 'level' column, but the first column is unnamed, rename it
-        if "level" not in key_df.columns:
-            first_col = key_df.columns[0]
-            if first_col.startswith("unnamed"):
-                key_df = key_df.rename(columns={first_col: "level"})
-            else:
-                raise RuntimeError(
-                    f"Competency Key sheet must have a 'level' column; got: {list(key_df.columns)}"
-                )
-
-        # Build the lookup dict
-        levels = key_df["level"].tolist()
-        for comp in key_df.columns.drop("level"):
-            competency_key[comp] = {
-                row["level"]: str(row[comp]).strip().replace("\n", " ")
-                for _, row in key_df.iterrows()
-            }
-
-        # Serialize once into a big Markdown lookup block
-        _md = ["## Competency Key"]
-        for comp, lvl_map in competency_key.items():
-            _md.append(f"### {comp}")
-            for lvl in levels:
-                _md.append(f"- **{lvl}**: {lvl_map[lvl]}")
-            _md.append("")
-        KEY_MD = "\n".join(_md)
-        logging.info(f"✅ Loaded competency key from {KEY_FILE}")
-    except Exception as e:
-        logging.error(f"❌ Failed to load competency key: {e}")
-else:
-    logging.warning(f"⚠️ Competency key file not found: {KEY_FILE}. Continuing without it.")
-
-# ─────────────────────────────────────────────────────────────────────
-
-# (Re)import asyncio and logging if needed
-import asyncio
-import logging
+# The Competency Key workbook is parsed on first use (see competency_key)
 
 async def update_candidates():
     """ Runs every 6 hours to update candidates from Ashby """
@@ -220,23 +128,6 @@ async def update_candidates():
         await asyncio.sleep(21600)  # 6 hours
 
 
-# Create database tables (warning: does not auto-migrate existing tables)
-Base.metadata.create_all(bind=engine)
-
-# -------------------- DEPENDENCY -------------------- #
-
-def run_migrations():
-    """Run Alembic migrations automatically on app startup."""
-    try:
-        logging.info("🚀 Running Alembic migrations...")
-        subprocess.run(["alembic", "upgrade", "head"], check=True)
-        logging.info("✅ Alembic migrations applied successfully.")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"❌ Error running migrations: {e}")
-
-# Run migrations before starting the app
-run_migrations()
-
 # -------------------- Pydantic MODELS -------------------- #
 	
 class Position(BaseModel):
@@ -291,6 +182,17 @@ class AnswerAssessmentRequest(BaseModel):
     question: str
     candidate_answer: str
 
+class AnswerPair(BaseModel):
+    question: str
+    candidate_answer: str
+    competency: Optional[str] = None
+
+class BatchAnswerAssessmentRequest(BaseModel):
+    answers: List[AnswerPair] = Field(..., min_items=1)
+    candidate_id: Optional[UUID] = None  # required when store=True
+    interviewer_id: Optional[str] = None
+    store: bool = False
+
 # Define structure of a single question
 class InterviewQuestionRequest(BaseModel):
     question: str
@@ -325,7 +227,7 @@ class SearchRequest(BaseModel):
     query: str
     filters: FilterModel
 
-class Candidate(BaseModel):
+class SourcedCandidate(BaseModel):
     id: str
     name: str
     jobTitle: str
@@ -333,9 +235,6 @@ class Candidate(BaseModel):
     location: str
     summary: Optional[str] = None  # Added for AI-generated summary
 
-# In-memory storage for candidates, purely for demonstration purposes.
-candidate_storage: Dict[str, Dict[str, Any]] = {}
-
 # -------------------- HELPER FUNCTIONS -------------------- #
 def get_competencies_for_job(db: Session, job_title: str):
     """
@@ -412,7 +311,10 @@ def log_competency_change(
         raise HTTPException(status_code=500, detail=f"Failed to log competency change: {str(e)}")
 
 def categorize_with_ai(competency_name, competency_description=""):
-    """ Uses GPT-3.5 to categorize a competency into predefined categories. """
+    """
+    Uses GPT-3.5 to categorize a competency into predefined categories.
+    Returns None when the model is unavailable or answers with something else.
+    """
     try:
         prompt = f"""
         Categorize the following competency into one of these categories:
@@ -424,7 +326,9 @@ def categorize_with_ai(competency_name, competency_description=""):
         Only return the category name from the list above.
         """
 
-        response = client.chat.completions.create(
+        response = chat_completion(
+            "categorize_with_ai",
+            hedge=True,
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=15,
@@ -433,10 +337,11 @@ def categorize_with_ai(competency_name, competency_description=""):
 
         ai_category = response.choices[0].message.content.strip()
 
-        return ai_category if ai_category in STATIC_CATEGORIES else "Uncategorized"
+        return ai_category if ai_category in STATIC_CATEGORIES else None
 
     except Exception as e:
-        return "Uncategorized"  # Fallback in case of error
+        logging.warning(f"Could not categorize competency '{competency_name}': {e}")
+        return None
 
 def categorize_competency(competency_name):
     """
@@ -444,7 +349,8 @@ def categorize_competency(competency_name):
     """
     try:
         # 🔥 AI Call for Categorization
-        response = client.chat.completions.create(
+        response = chat_completion(
+            "categorize_competency",
             model="gpt-3.5-turbo",
             messages=[
                 {
@@ -460,7 +366,7 @@ def categorize_competency(competency_name):
             ]
         )
         
-        ai_category = response["choices"][0]["message"]["content"].strip()
+        ai_category = response.choices[0].message.content.strip()
         if ai_category in STATIC_CATEGORIES:
             return ai_category  # ✅ If AI assigns a valid category, return it
 
@@ -502,6 +408,7 @@ def fetch_and_store_data(session):
             )
             session.merge(new_dept)  # ✅ Prevents duplicates
         session.commit()
+        invalidate_departments()
         logging.info(f"✅ {len(departments)} departments stored successfully!")
     else:
         logging.warning("⚠️ No departments found in API response.")
@@ -531,6 +438,7 @@ def fetch_and_store_data(session):
 
             session.merge(new_job)
         session.commit()
+        invalidate_job_titles()
         logging.info(f"✅ {len(jobs)} jobs stored successfully!")
     else:
         logging.warning("⚠️ No jobs found in API response.")
@@ -541,6 +449,11 @@ def fetch_and_store_data(session):
 # ... other imports
 
 def generate_xray_query(query: str, filters: Dict[str, Any]) -> str:
+    cache_key = normalize_search(query, filters)
+    cached = xray_query_cache.get(cache_key)
+    if cached:
+        return cached
+
     prompt = (
         f"Optimize the following candidate search description into an X-ray search query for sourcing candidates, "
         f"targeting professional profiles on LinkedIn. "
@@ -549,16 +462,18 @@ def generate_xray_query(query: str, filters: Dict[str, Any]) -> str:
         f"Return a single search query string."
     )
     try:
-        response = client.chat.completions.create(
+        response = chat_completion(
+            "generate_xray_query",
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.5,
             max_tokens=50,
         )
-        xray_query = response["choices"][0]["message"]["content"].strip()
+        xray_query = response.choices[0].message.content.strip()
+        xray_query_cache.set(cache_key, xray_query)
     except Exception as e:
         print("OpenAI API error:", e)
-        # Fallback query if API call fails
+        # Fallback query if API call fails (not cached, so the next search retries the AI)
         xray_query = f'site:linkedin.com/in/ "{query}"'
     return xray_query
 
@@ -566,28 +481,34 @@ def generate_xray_query(query: str, filters: Dict[str, Any]) -> str:
 # Function to perform a search request using the generated X-ray query
 # -----------------------------------------------------------------------------
 async def perform_search(xray_query: str) -> List[dict]:
-    headers = {"User-Agent": "Mozilla/5.0"}
-    url = "https://www.google.com/search"
-    params = {"q": xray_query}
+    cache_key = normalize_xray(xray_query)
+    cached = search_results_cache.get(cache_key)
+    if cached is not None:
+        # Re-store so the hits stay resolvable for /candidate/{id} as long as the cached list
+        await get_candidate_store().aput_many(cached)
+        return [dict(candidate) for candidate in cached]
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, params=params, headers=headers, timeout=10.0)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"HTTP request failed: {e}")
+    try:
+        # Shared pooled client; the backend URL is configurable (see search_backend)
+        response = await fetch_search_page(xray_query)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"HTTP request failed: {e}")
     
     if response.status_code != 200:
         raise HTTPException(status_code=response.status_code, detail="Search engine error")
 
+    from bs4 import BeautifulSoup  # only this endpoint parses HTML
+
     soup = BeautifulSoup(response.text, "html.parser")
     results = []
+    session_id = new_search_session_id()  # scopes IDs to this search so they never collide
     
     # Naively parse search result snippets (this part is illustrative and may need refining)
     for element in soup.find_all("div", class_="BNeawe"):
         text = element.get_text().strip()
         if text:
             candidate = {
-                "id": str(len(results) + 1),
+                "id": make_candidate_id(session_id, len(results) + 1),
                 "name": text.split()[0] if text.split() else "Unknown",
                 "jobTitle": " ".join(text.split()[1:3]) if len(text.split()) >= 3 else "Unknown",
                 "company": f"Company {len(results) + 1}",
@@ -595,91 +516,69 @@ async def perform_search(xray_query: str) -> List[dict]:
             }
             results.append(candidate)
     
-    # Save retrieved candidates for later details/summarization
-    for candidate in results:
-        candidate_storage[candidate["id"]] = candidate
+    # Save retrieved candidates for later details/summarization (bounded, TTL-evicted store)
+    await get_candidate_store().aput_many(results)
+    search_results_cache.set(cache_key, [dict(candidate) for candidate in results])
 
     return results
 
 # -----------------------------------------------------------------------------
 # POST /search: Generate query, perform search, and return candidates
 # -----------------------------------------------------------------------------
-@app.post("/search")
+@router.post("/search")
 async def search_candidates(request: SearchRequest):
     filters_dict = request.filters.dict()
     
     # Use AI to generate an optimized X-ray search query
-    xray_query = generate_xray_query(request.query, filters_dict)
+    xray_query = await run_blocking(generate_xray_query, request.query, filters_dict)
     print("Generated X-ray query:", xray_query)
     
     # Execute the search using the AI-optimized query
     search_results = await perform_search(xray_query)
+    # When enabled, summarise the top hits in the background so opening them needs no LLM call
+    schedule_pregeneration(search_results)
     return search_results
 
 # -----------------------------------------------------------------------------
 # GET /candidate/{candidate_id}: Retrieve candidate details and AI summary
 # -----------------------------------------------------------------------------
-@app.get("/candidate/{candidate_id}")
+@router.get("/candidate/{candidate_id}")
 async def get_candidate(candidate_id: str):
-    candidate = candidate_storage.get(candidate_id)
+    store = get_candidate_store()
+    candidate = await store.aget(candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    # AI Feature: Summarize candidate details
-    summary_prompt = (
-        f"Summarize the following candidate's profile details in a concise paragraph: {candidate}"
-    )
+    # AI Feature: Summarize candidate details (cached by profile content, usually pre-generated)
     try:
-        summary_response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": summary_prompt}],
-            temperature=0.5,
-            max_tokens=100,
-        )
-        summary = summary_response["choices"][0]["message"]["content"].strip()
-        candidate["summary"] = summary
+        candidate = await attach_summary(candidate)
     except Exception as e:
         print("Error generating summary:", e)
         candidate["summary"] = "Summary unavailable due to an error."
     
-    return candidate
+    return public_candidate(candidate)
 
 
-@app.get("/api/get-interview-job-titles")
+@router.get("/api/get-interview-job-titles")
 async def get_interview_job_titles(department: str, db: Session = Depends(get_db)):
     try:
-        department_framework = db.query(Framework).filter(Framework.department == department).first()
-        if not department_framework:
+        # One joined query on the native UUID column instead of a lookup per job title
+        job_titles = interview_job_titles(db, department)
+        if job_titles is None:
             logging.error(f"❌ Department '{department}' not found in Framework table.")
             raise HTTPException(status_code=404, detail=f"Department '{department}' not found.")
-        
-        job_titles = db.query(JobTitle).filter(JobTitle.department_id == department_framework.id).all()
         if not job_titles:
             logging.warning(f"⚠️ No job titles found for department: {department}")
-            return {"job_titles": []}
         
-        return {
-            "job_titles": [
-                {
-                    "job_title": job.job_title,
-                    "competencies": job.competencies if job.competencies else [],
-                    "job_description": (
-                        lambda entry: entry.description if entry else None
-                    )(
-                        db.query(JobDescription)
-                        .filter(cast(JobDescription.job_title_id, String) == str(job.id))
-                        .first()
-                    ),
-                }
-                for job in job_titles
-            ]
-        }
+        return {"job_titles": job_titles}
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"❌ Error fetching interview job titles for department {department}: {e}")
         raise HTTPException(status_code=500, detail="Error fetching interview job titles.")
 
 
-@app.post("/api/generate-interview-questions")
+@router.post("/api/generate-interview-questions")
 async def generate_interview_questions(request: GenerateInterviewQuestionsRequest):
     try:
         job_title = request.job_title
@@ -688,7 +587,7 @@ async def generate_interview_questions(request: GenerateInterviewQuestionsReques
 
         logging.info(f"🛠️ Generating questions for: {job_title} in {department} with competencies {competencies}")
 
-        # 🔥 AI Prompt - Explicit JSON instruction
+        # 🔥 AI Prompt - the response shape is enforced by the GeneratedInterviewQuestions schema
         prompt = f"""
         You are an expert interview question generator. 
         Generate structured interview questions for the role of {job_title} in {department}.
@@ -696,48 +595,38 @@ async def generate_interview_questions(request: GenerateInterviewQuestionsReques
         **Focus on these competencies:** {", ".join(competencies) if competencies else "General skills"}.
         For each competency, generate **at least 2-3 questions**.
         Each question should have a follow-up question.
-
-        ### **Format output as strict JSON (NO extra text, only JSON response)**:
-        
-        [
-          {{"competency": "Software Engineering", "question": "Primary Question 1", "follow_up": "Follow-up Question 1"}},
-          {{"competency": "Design Thinking", "question": "Primary Question 2", "follow_up": "Follow-up Question 2"}}
-        ]
         """
 
-        chat_completion = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert interview question generator. Only return valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=2500,
-            temperature=0.7,
-        )
-
-        raw_ai_response = chat_completion.choices[0].message.content.strip()
-
-        logging.info(f"✅ Raw AI Response (Before Parsing): {raw_ai_response}")
-
-        # 🔥 Fix OpenAI Wrapping JSON in Markdown Blocks
-        cleaned_response = raw_ai_response.strip().replace("```json", "").replace("```", "")
-
-        # 🔄 Try Parsing JSON
         try:
-            generated_questions = json.loads(cleaned_response)
-            logging.info(f"✅ Parsed Questions: {generated_questions}")
-        except json.JSONDecodeError as e:
-            logging.error(f"❌ AI Response is not valid JSON. Error: {e}")
-            generated_questions = []
+            generated = await run_blocking(
+                generate_structured,
+                GeneratedInterviewQuestions,
+                [
+                    {"role": "system", "content": "You are an expert interview question generator."},
+                    {"role": "user", "content": prompt}
+                ],
+                endpoint="generate_interview_questions",
+                max_tokens=2500,
+                temperature=0.7,
+                allow_partial=True,
+            )
+        except StructuredOutputError as e:
+            logging.error(f"❌ AI response did not match the question schema: {e}")
+            raise HTTPException(status_code=502, detail="AI returned an invalid question set. Please try again.")
+
+        generated_questions = [q.dict() for q in generated.questions]
+        logging.info(f"✅ Parsed Questions: {generated_questions}")
 
         return {"questions": generated_questions}
 
+    except (HTTPException, LLMUnavailableError):
+        raise
     except Exception as e:
         logging.error(f"❌ Error generating interview questions: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate interview questions")
 
 
-@app.post("/api/save-interview-questions")
+@router.post("/api/save-interview-questions")
 async def save_interview_questions(request: SaveInterviewQuestionsRequest, db: Session = Depends(get_db)):
     try:
         job_title = db.query(JobTitle).filter(JobTitle.job_title == request.job_title).first()
@@ -768,7 +657,7 @@ async def save_interview_questions(request: SaveInterviewQuestionsRequest, db: S
         raise HTTPException(status_code=500, detail=f"Error saving interview questions: {e}")
 
 
-@app.post("/api/assess-candidate-answer")
+@router.post("/api/assess-candidate-answer")
 async def assess_candidate_answer(request: AnswerAssessmentRequest):
     """
     AI-powered evaluation of a candidate's interview response.
@@ -785,7 +674,10 @@ async def assess_candidate_answer(request: AnswerAssessmentRequest):
     - Explanation: [Why the score was given]
     """
 
-    response = client.chat.completions.create(
+    response = await run_blocking(
+        chat_completion,
+        "assess_candidate_answer",
+        hedge=True,
         model="gpt-3.5-turbo",
         messages=[{"role": "system", "content": "You are an experienced interviewer."},
                   {"role": "user", "content": prompt}],
@@ -803,7 +695,121 @@ async def assess_candidate_answer(request: AnswerAssessmentRequest):
     }
 
 
-@app.post("/api/save-custom-question")
+ASSESS_BATCH_SIZE = int(os.getenv("ASSESS_BATCH_SIZE", "4"))
+ASSESS_BATCH_CONCURRENCY = int(os.getenv("ASSESS_BATCH_CONCURRENCY", "3"))
+
+
+def assess_answer_batch(pairs: List[tuple]) -> Dict[int, Dict[str, Any]]:
+    """
+    Scores a batch of (index, AnswerPair) in one structured call.
+    Pairs the model skipped are re-requested once on their own.
+    """
+    results: Dict[int, Dict[str, Any]] = {}
+    pending = list(pairs)
+    for _ in range(2):
+        items = "\n\n".join(
+            f"[{index}] Question: {pair.question}\n    Candidate's Answer: {pair.candidate_answer}"
+            for index, pair in pending
+        )
+        prompt = f"""
+        Evaluate the candidate's response to each of the following interview questions.
+        For every numbered item, provide its index, a score from 1 (Poor) to 4 (Great),
+        and an explanation of why the score was given.
+
+        {items}
+        """
+        batch = generate_structured(
+            AnswerAssessmentBatch,
+            [{"role": "system", "content": "You are an experienced interviewer."},
+             {"role": "user", "content": prompt}],
+            endpoint="assess_candidate_answers",
+            max_tokens=300 * len(pending),
+            temperature=0.6,
+            allow_partial=True,
+        )
+        wanted = {index for index, _ in pending}
+        for assessment in batch.assessments:
+            if assessment.index in wanted:
+                results[assessment.index] = {"score": assessment.score, "explanation": assessment.explanation}
+        pending = [(index, pair) for index, pair in pending if index not in results]
+        if not pending:
+            break
+    return results
+
+
+@router.post("/api/assess-candidate-answers")
+async def assess_candidate_answers(request: BatchAnswerAssessmentRequest, db: Session = Depends(get_db)):
+    """
+    Scores every question/answer pair of an interview in a few batched LLM calls,
+    optionally storing the results as scorecard entries for the candidate.
+    A batch that fails (invalid output, LLM unavailable) leaves its answers
+    unscored (`scored: false`) without discarding the other batches; only when
+    the LLM was unavailable for every batch does the request fail with 503.
+    """
+    if request.store:
+        if not request.candidate_id:
+            raise HTTPException(status_code=400, detail="candidate_id is required to store assessments.")
+        if not db.query(Candidate.id).filter(Candidate.id == request.candidate_id).first():
+            raise HTTPException(status_code=404, detail="Candidate not found.")
+
+    indexed = list(enumerate(request.answers))
+    batches = [indexed[i:i + ASSESS_BATCH_SIZE] for i in range(0, len(indexed), ASSESS_BATCH_SIZE)]
+    semaphore = asyncio.Semaphore(ASSESS_BATCH_CONCURRENCY)
+
+    unavailable: List[LLMUnavailableError] = []
+
+    async def run_batch(batch):
+        async with semaphore:
+            try:
+                return await run_blocking(assess_answer_batch, batch)
+            except StructuredOutputError as e:
+                logging.error(f"❌ Batch assessment failed for items {[i for i, _ in batch]}: {e}")
+            except LLMUnavailableError as e:
+                logging.warning(f"⚠️ LLM unavailable for items {[i for i, _ in batch]}: {e}")
+                unavailable.append(e)
+            return {}
+
+    scored: Dict[int, Dict[str, Any]] = {}
+    for batch_result in await asyncio.gather(*(run_batch(batch) for batch in batches)):
+        scored.update(batch_result)
+    if len(unavailable) == len(batches):
+        raise unavailable[0]
+
+    assessments = []
+    for index, pair in indexed:
+        result = scored.get(index)
+        assessments.append({
+            "index": index,
+            "question": pair.question,
+            "competency": pair.competency,
+            "score": result["score"] if result else None,
+            "explanation": result["explanation"] if result else "Assessment unavailable.",
+            "scored": result is not None,
+        })
+
+    stored = 0
+    if request.store:
+        submitted_at = datetime.utcnow()
+        for assessment in assessments:
+            if assessment["score"] is None:
+                continue
+            db.add(ScorecardEntry(
+                candidate_id=request.candidate_id,
+                category="AI Answer Assessment",
+                skill=assessment["competency"] or "Interview Answer",
+                score=assessment["score"],
+                comments=assessment["explanation"],
+                interviewer_id=request.interviewer_id,
+                submitted_at=submitted_at,
+                metadata_json={"source": "ai_assessment", "question": assessment["question"]},
+            ))
+            stored += 1
+        db.commit()
+
+    return {"assessments": assessments, "stored": stored}
+
+
+@router.post("/api/save-custom-question")
 async def save_custom_question(request: SaveQuestionRequest, db: Session = Depends(get_db)):
     """
     Saves a custom interview question.
@@ -825,16 +831,19 @@ async def save_custom_question(request: SaveQuestionRequest, db: Session = Depen
     return {"success": True, "message": "Question saved successfully."}
 
 
-@app.get("/api/get-interview-questions/{job_title}")
-async def get_interview_questions(job_title: str, db: Session = Depends(get_db)):
+@router.get("/api/get-interview-questions/{job_title}", dependencies=[Depends(aconditional("interview_questions", "frameworks"))])
+async def get_interview_questions(job_title: str, db: AsyncSession = Depends(get_async_db)):
     """
     Retrieves saved interview questions for a job title.
     """
-    job = db.query(JobTitle).filter(JobTitle.job_title == job_title).first()
-    if not job:
+    job_id = (await db.execute(
+        select(JobTitle.id).where(JobTitle.job_title == job_title).limit(1)
+    )).scalar()
+    if not job_id:
         raise HTTPException(status_code=404, detail="Job title not found.")
 
-    questions = db.query(InterviewQuestion).filter(InterviewQuestion.job_title_id == job.id).all()
+    # Pre-generated rubrics come in one extra query
+    questions = (await db.execute(interview_questions_query(job_id))).scalars().all()
 
     return {
         "questions": [
@@ -843,16 +852,42 @@ async def get_interview_questions(job_title: str, db: Session = Depends(get_db))
                 "question": q.question,
                 "follow_up": q.follow_up,
                 "competencies_covered": q.competencies_covered if q.competencies_covered else [],  # ✅ Fix
+                "answer_suggestions": [
+                    {"score": a.score, "answer": a.answer}
+                    for a in sorted(q.answers, key=lambda a: a.score)
+                ],
             }
             for q in questions
         ]
     }
 
+
+@router.post("/api/pregenerate-answer-suggestions")
+async def trigger_answer_suggestions(
+    background_tasks: BackgroundTasks,
+    concurrency: Optional[int] = Query(None, ge=1, le=16),
+    token_budget: Optional[int] = Query(None, ge=1),
+    admin: dict = Depends(get_current_admin),
+):
+    """
+    Starts the offline job that fills scored example answers for saved questions
+    that have none, under a concurrency and token budget.
+    """
+    kwargs = {}
+    if concurrency:
+        kwargs["concurrency"] = concurrency
+    if token_budget:
+        kwargs["token_budget"] = token_budget
+    background_tasks.add_task(pregenerate_answer_suggestions, **kwargs)
+    return {"success": True, "message": "Answer suggestion generation started."}
+
 # 1) Generate Competencies (one call per position)
 # 1) Generate Competencies with Brave/Owners/Inclusive breakdown
-@app.post("/api/generate-competencies")
+@router.post("/api/generate-competencies")
 async def generate_competencies(request: GenerateRequest):
     results = []
+    # Parsed on first use, off the event loop
+    key_md = (await run_blocking(get_competency_key)).markdown
 
     for pos in request.positions:
         # Build a focused prompt for this single position
@@ -862,7 +897,7 @@ one each for Brave, Owners, and Inclusive—summarizing how the following role s
 at the specified levels.
 
 Competency Key:
-{KEY_MD}
+{key_md}
 
 Role: {pos.title}  (Department: {request.department})
 
@@ -877,38 +912,24 @@ Role: {pos.title}  (Department: {request.department})
 | Commercial Awareness     | {pos.commercialAwareness} |
 | Collaboration & Team Work| {pos.collaborationTeamWork} |
 
-Please output **exactly** in this format (no extra text):
-
-Brave: [one sentence]
-Owners: [one sentence]
-Inclusive: [one sentence]
+Return one sentence for each of Brave, Owners and Inclusive.
 """
-        # Call OpenAI
-        resp = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert HR consultant."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1500,
-            temperature=0.6,
-        )
-        text = resp.choices[0].message.content.strip()
-
-        # Parse the three lines
-        breakdown = {"Brave": "", "Owners": "", "Inclusive": ""}
-        for line in text.splitlines():
-            for key in breakdown:
-                if line.startswith(f"{key}:"):
-                    breakdown[key] = line.split(f"{key}:", 1)[1].strip()
-
-        # Fallback if any label was missed
-        # e.g. take the first three sentences in order
-        if not all(breakdown.values()):
-            parts = [s.strip() for s in text.split("\n") if ":" in s]
-            for idx, key in enumerate(breakdown.keys()):
-                if idx < len(parts):
-                    breakdown[key] = parts[idx].split(":",1)[1].strip()
+        # Call OpenAI with the breakdown schema enforced
+        try:
+            breakdown = (await run_blocking(
+                generate_structured,
+                CompetencyBreakdown,
+                [
+                    {"role": "system", "content": "You are an expert HR consultant."},
+                    {"role": "user", "content": prompt}
+                ],
+                endpoint="generate_competencies",
+                max_tokens=1500,
+                temperature=0.6,
+            )).dict()
+        except StructuredOutputError as e:
+            logging.error(f"❌ Competency breakdown for {pos.title} did not match the schema: {e}")
+            raise HTTPException(status_code=502, detail=f"AI returned an invalid breakdown for {pos.title}.")
 
         results.append({
             "title": pos.title,
@@ -954,7 +975,7 @@ def log_competency_change(
 
 
 # Updated /api/save-competencies endpoint
-@app.post("/api/save-competencies")
+@router.post("/api/save-competencies")
 async def save_competencies(request: SaveCompetencyRequest, db: Session = Depends(get_db)):
     """
     Saves new competencies and logs newly created ones.
@@ -982,6 +1003,7 @@ async def save_competencies(request: SaveCompetencyRequest, db: Session = Depend
                 job_title=job_title["job_title"],
                 competencies=processed_competencies
             )
+            sync_job_title(db, job_title_entry)
             db.add(job_title_entry)
 
             # Log competency creation for each competency in this job title
@@ -1000,6 +1022,7 @@ async def save_competencies(request: SaveCompetencyRequest, db: Session = Depend
 
         # Commit all changes at once
         db.commit()
+        invalidate_job_titles()
         return {"success": True, "message": "Competency framework saved successfully", "department_id": str(department_id)}
 
     except Exception as e:
@@ -1010,35 +1033,39 @@ async def save_competencies(request: SaveCompetencyRequest, db: Session = Depend
 
         
 # 3) Search Frameworks
-@app.get("/api/search-frameworks")
+@router.get("/api/search-frameworks", response_model=FrameworkSearchResponse)
 async def search_frameworks(query: str = "", db: Session = Depends(get_db)):
     try:
+        # Only the summary columns; no ORM objects
+        frameworks = db.query(Framework.id, Framework.department, Framework.parent_id, Framework.is_archived)
         # If the query is empty, return all frameworks
         if not query.strip():
             logging.info("No query provided, fetching all frameworks.")
-            frameworks = db.query(Framework).all()
         else:
             logging.info(f"Query provided: {query}, searching frameworks by department.")
             # Now filtering only by department name
-            frameworks = db.query(Framework).filter(
-                Framework.department.ilike(f"%{query}%")
-            ).all()
+            frameworks = frameworks.filter(Framework.department.ilike(f"%{query}%"))
+        frameworks = frameworks.all()
 
         if not frameworks:
             logging.info("No frameworks found for the query.")
-            return {"frameworks": []}
 
-        return {"frameworks": [
-            {key: value for key, value in framework.__dict__.items() if key != "_sa_instance_state"}
+        return json_response({"frameworks": [
+            {
+                "id": framework.id,
+                "department": framework.department,
+                "parent_id": framework.parent_id,
+                "is_archived": framework.is_archived,
+            }
             for framework in frameworks
-        ]}
+        ]})
 
     except Exception as e:
         logging.error(f"Error searching frameworks: {e}")
         raise HTTPException(status_code=500, detail="Error searching frameworks.")
 
 # 4) Get Framework by ID
-@app.get("/api/get-framework/{id}")
+@router.get("/api/get-framework/{id}", dependencies=[Depends(conditional("frameworks"))])
 async def get_framework(id: int, db: Session = Depends(get_db)):
     framework = db.query(Framework).filter(Framework.id == id).first()
     if not framework:
@@ -1059,25 +1086,22 @@ async def get_framework(id: int, db: Session = Depends(get_db)):
     }
 
 # 5) Get Job Title Details (by Department & JobTitle)
-@app.get("/api/get-framework/{department}/{jobTitle}")
-async def get_job_title_details(department: str, jobTitle: str, db: Session = Depends(get_db)):
+@router.get("/api/get-framework/{department}/{jobTitle}", dependencies=[Depends(aconditional("frameworks"))])
+async def get_job_title_details(department: str, jobTitle: str, db: AsyncSession = Depends(get_async_db)):
     try:
-        framework = db.query(Framework).filter(Framework.department == department).first()
+        department_id = await aresolve_department_id(db, department)
         
-        if not framework:
+        if not department_id:
             raise HTTPException(status_code=404, detail="Department not found.")
         
-        job_title = db.query(JobTitle).filter(
-            JobTitle.job_title == jobTitle,
-            JobTitle.department_id == framework.id
-        ).first()
+        job_title = await aload_job_title(db, department_id, jobTitle)
 
         if not job_title:
             raise HTTPException(status_code=404, detail="Job title not found.")
         
         # Return job title details
         return {
-            "department": framework.department,
+            "department": department,
             "job_title": job_title.job_title,
             "job_levels": job_title.job_levels,  # can be split in frontend
             "competencies": job_title.competencies,
@@ -1089,7 +1113,7 @@ async def get_job_title_details(department: str, jobTitle: str, db: Session = De
         raise HTTPException(status_code=500, detail=str(e))
 
 # 6) Delete a framework by ID
-@app.delete("/api/delete-framework/{id}")
+@router.delete("/api/delete-framework/{id}")
 async def delete_framework(id: int = Path(..., title="Framework ID"), db: Session = Depends(get_db)):
     try:
         framework = db.query(Framework).filter(Framework.id == id).first()
@@ -1102,76 +1126,55 @@ async def delete_framework(id: int = Path(..., title="Framework ID"), db: Sessio
         
         db.delete(framework)
         db.commit()
+        invalidate_departments()
         return {"success": True, "message": f"Framework with id {id} deleted successfully"}
     except Exception as e:
         logging.error(f"Error deleting framework: {e}")
         raise HTTPException(status_code=500, detail="Error deleting framework.")
 
 # 7) Get all job titles for a given department
-@app.get("/api/get-job-titles")
-async def get_job_titles(department: str, db: Session = Depends(get_db)):
+@router.get("/api/get-job-titles", dependencies=[Depends(aconditional("frameworks"))])
+async def get_job_titles(department: str, db: AsyncSession = Depends(get_async_db)):
     try:
-        department_framework = db.query(Framework).filter(Framework.department == department).first()
+        department_id = await aresolve_department_id(db, department)
 
-        if not department_framework:
+        if not department_id:
             raise HTTPException(status_code=404, detail="Department not found")
 
-        job_titles = db.query(JobTitle).filter(JobTitle.department_id == department_framework.id).all()
+        job_titles = (await db.execute(job_titles_query(department_id))).scalars().all()
 
         return {"job_titles": [
-            {"job_title": job.job_title} for job in job_titles
+            {"job_title": job_title} for job_title in job_titles
         ]}
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error fetching job titles for department {department}: {e}")
         raise HTTPException(status_code=500, detail="Error fetching job titles.")
 
 # 8) Get Job Title Details (filtered by specific job_level)
-@app.get("/api/get-job-title-details/{department}/{job_title}/{job_level}")
-async def get_job_title_details(department: str, job_title: str, job_level: str, db: Session = Depends(get_db)):
+@router.get("/api/get-job-title-details/{department}/{job_title}/{job_level}")
+async def get_job_title_details(department: str, job_title: str, job_level: str, db: AsyncSession = Depends(get_async_db)):
     try:
         logging.info(f"Fetching job title details for department: {department}, job_title: {job_title}, job_level: {job_level}")
-        framework = db.query(Framework).filter(Framework.department == department).first()
-        if not framework:
+        framework_id = await aresolve_department_id(db, department)
+        if not framework_id:
             raise HTTPException(status_code=404, detail="Framework for the department not found")
         
-        job_title_entry = db.query(JobTitle).filter(
-            JobTitle.job_title == job_title,
-            JobTitle.department_id == framework.id
-        ).first()
-        if not job_title_entry:
+        job_title_id = await aresolve_job_title_id(db, framework_id, job_title)
+        if not job_title_id:
             raise HTTPException(status_code=404, detail="Job title not found")
-        
-        competencies = job_title_entry.competencies or []
-        competency_for_level = []
-        for competency in competencies:
-            # Ensure competency is a dict and get descriptions safely
-            if not isinstance(competency, dict):
-                continue
-            descriptions = competency.get("descriptions", {})
-            if not isinstance(descriptions, dict):
-                descriptions = {}
-            # Filter descriptions based on job_level string
-            filtered_descriptions = {
-                level: description
-                for level, description in descriptions.items()
-                if job_level in level
-            }
-            if filtered_descriptions:
-                competency_for_level.append({
-                    "name": competency.get("name", ""),
-                    "descriptions": filtered_descriptions
-                })
-        
-        # Use getattr to safely retrieve salary_min and salary_max, defaulting to None if they don't exist
-        salary_min = getattr(job_title_entry, "salary_min", None)
-        salary_max = getattr(job_title_entry, "salary_max", None)
-        
+
+        # Level filtering runs in SQL over competency_levels; the JSON document is not loaded
+        rows = (await db.execute(level_descriptions_query(job_title_id, job_level))).all()
+
         return {
-            "job_title": job_title_entry.job_title,
+            "job_title": job_title,
             "job_level": job_level,
-            "salary_min": salary_min,
-            "salary_max": salary_max,
-            "competencies": competency_for_level
+            # job_titles has no salary columns
+            "salary_min": None,
+            "salary_max": None,
+            "competencies": group_level_descriptions(rows)
         }
     except HTTPException as he:
         raise he
@@ -1181,7 +1184,7 @@ async def get_job_title_details(department: str, job_title: str, job_level: str,
 
 
 # 9) **UPDATE** Job Title Details (new)
-@app.put("/api/update-job-title-details/{department}/{job_title}/{job_level}")
+@router.put("/api/update-job-title-details/{department}/{job_title}/{job_level}")
 async def update_job_title_details(
     department: str,
     job_title: str,
@@ -1193,14 +1196,11 @@ async def update_job_title_details(
     Updates job title details, including salary and competencies.
     Ensures competency changes are saved in `job_titles` and logged in `competency_evolution`.
     """
-    framework = db.query(Framework).filter(Framework.department == department).first()
-    if not framework:
+    department_id = resolve_department_id(db, department)
+    if not department_id:
         raise HTTPException(status_code=404, detail="Department not found")
 
-    job_title_entry = db.query(JobTitle).filter(
-        JobTitle.job_title == job_title,
-        JobTitle.department_id == framework.id
-    ).first()
+    job_title_entry = load_job_title(db, department_id, job_title)
     if not job_title_entry:
         raise HTTPException(status_code=404, detail="Job title not found")
 
@@ -1252,8 +1252,10 @@ async def update_job_title_details(
                     db=db
                 )
 
-        # ✅ **SAVE updated competencies to `job_titles`**
-        job_title_entry.competencies = updated_data.competencies
+        # ✅ **SAVE updated competencies to `job_titles`** (only the changed normalized rows are written)
+        if updated_data.competencies != job_title_entry.competencies:
+            job_title_entry.competencies = updated_data.competencies
+            sync_job_title(db, job_title_entry)
 
     # ✅ **Ensure salaries are also updated**
     if updated_data.salaryMin is not None:
@@ -1274,47 +1276,7 @@ async def update_job_title_details(
         "competencies": job_title_entry.competencies
     }
 
-def populate_initial_trends(db: Session):
-    """
-    Populates competency_trend table with the latest competency data for tracking.
-    This should only run if no competency trend data exists.
-    """
-    try:
-        existing_trends = db.query(CompetencyTrend).count()
-        logging.info(f"🔍 Checking existing competency trends... Found: {existing_trends}")
-
-        if existing_trends > 0:
-            logging.info("✅ Competency trend data already exists. Skipping population.")
-            return
-
-        job_titles = db.query(JobTitle).all()
-        migrated_count = 0
-
-        for job in job_titles:
-            if not job.competencies:
-                continue
-
-            for competency in job.competencies:
-                logging.info(f"📌 Adding competency to trends: {competency['name']} in {job.framework.department}")
-
-                new_entry = CompetencyTrend(
-                    competency_name=competency["name"],
-                    month=datetime.utcnow().month,
-                    year=datetime.utcnow().year,
-                    average_score=0,  # Set initial score for tracking
-                    department=job.framework.department,
-                )
-                db.add(new_entry)
-                migrated_count += 1
-
-        db.commit()
-        logging.info(f"✅ Populated {migrated_count} competencies into competency_trend.")
-
-    except Exception as e:
-        db.rollback()
-        logging.error(f"❌ Failed to populate competency trends: {e}")
-
-@app.post("/api/generate-job-description")
+@router.post("/api/generate-job-description")
 async def generate_job_description(request: GenerateJobDescriptionRequest):
     """
     Generates a job description using OpenAI.
@@ -1329,7 +1291,9 @@ async def generate_job_description(request: GenerateJobDescriptionRequest):
     {req_lines}
     """
 
-    response = client.chat.completions.create(
+    response = await run_blocking(
+        chat_completion,
+        "generate_job_description",
         model="gpt-3.5-turbo",
         messages=[{"role": "user", "content": prompt}],
         max_tokens=1000,
@@ -1341,33 +1305,30 @@ async def generate_job_description(request: GenerateJobDescriptionRequest):
 
 import bleach
 
-@app.post("/api/save-job-description")
+@router.post("/api/save-job-description")
 async def save_job_description(request: SaveJobDescriptionRequest, db: Session = Depends(get_db)):
     """
     Saves a job description to the database after sanitizing the HTML.
     """
     clean_html = bleach.clean(request.description, tags=["p", "br", "b", "i", "u", "strong", "em", "ul", "ol", "li"])  # ✅ Allows only safe tags
 
-    framework = db.query(Framework).filter(Framework.department == request.department).first()
-    if not framework:
+    department_id = resolve_department_id(db, request.department)
+    if not department_id:
         raise HTTPException(status_code=404, detail="Department not found.")
 
-    job_title_entry = db.query(JobTitle).filter(
-        JobTitle.job_title == request.job_title, 
-        JobTitle.department_id == framework.id
-    ).first()
+    job_title_id = resolve_job_title_id(db, department_id, request.job_title)
 
-    if not job_title_entry:
+    if not job_title_id:
         raise HTTPException(status_code=404, detail="Job title not found.")
 
-    existing_description = db.query(JobDescription).filter(JobDescription.job_title_id == job_title_entry.id).first()
+    existing_description = db.query(JobDescription).filter(JobDescription.job_title_id == job_title_id).first()
 
     if existing_description:
         existing_description.description = clean_html  # ✅ Store sanitized HTML
         existing_description.updated_at = str(datetime.utcnow())
     else:
         new_description = JobDescription(
-            job_title_id=job_title_entry.id,
+            job_title_id=job_title_id,
             description=clean_html,  # ✅ Store sanitized HTML
         )
         db.add(new_description)
@@ -1375,31 +1336,28 @@ async def save_job_description(request: SaveJobDescriptionRequest, db: Session =
     db.commit()
     return {"success": True, "message": "Job description saved successfully"}
 
-@app.get("/api/get-job-description/{department}/{job_title}")
+@router.get("/api/get-job-description/{department}/{job_title}", dependencies=[Depends(conditional("job_descriptions", "frameworks"))])
 async def get_job_description(department: str, job_title: str, db: Session = Depends(get_db)):
     """
     Retrieves a stored job description by department and job title.
     """
-    framework = db.query(Framework).filter(Framework.department == department).first()
-    if not framework:
+    department_id = resolve_department_id(db, department)
+    if not department_id:
         raise HTTPException(status_code=404, detail="Department not found.")
 
-    job_title_entry = db.query(JobTitle).filter(
-        JobTitle.job_title == job_title, 
-        JobTitle.department_id == framework.id
-    ).first()
+    job_title_id = resolve_job_title_id(db, department_id, job_title)
 
-    if not job_title_entry:
+    if not job_title_id:
         raise HTTPException(status_code=404, detail="Job title not found.")
 
-    job_description = db.query(JobDescription).filter(JobDescription.job_title_id == job_title_entry.id).first()
+    job_description = db.execute(job_description_query(job_title_id)).scalars().first()
     
     if not job_description:
         raise HTTPException(status_code=404, detail="No job description found for this role.")
 
     return {"job_description": job_description.description}  # ✅ Returns HTML safely
 
-@app.post("/api/analyze-job-description")
+@router.post("/api/analyze-job-description")
 async def analyze_job_description(description: str = Body(..., embed=True)):
     """
     Uses AI to analyze job descriptions for biased language and suggests neutral alternatives.
@@ -1419,7 +1377,9 @@ async def analyze_job_description(description: str = Body(..., embed=True)):
         - **Overall Score:** [1-10, with 10 being fully inclusive]
         """
 
-        response = client.chat.completions.create(
+        response = await run_blocking(
+            chat_completion,
+            "analyze_job_description",
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=500,
@@ -1429,10 +1389,12 @@ async def analyze_job_description(description: str = Body(..., embed=True)):
         analysis = response.choices[0].message.content.strip()
         return {"analysis": analysis}
 
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to analyze job description: {str(e)}")
 
-@app.post("/api/improve-job-description")
+@router.post("/api/improve-job-description")
 async def improve_job_description(description: str = Body(..., embed=True)):
     """
     Uses AI to refine a job description, making it more structured, engaging, and inclusive.
@@ -1452,7 +1414,9 @@ async def improve_job_description(description: str = Body(..., embed=True)):
         Provide the improved version only, without extra commentary.
         """
 
-        response = client.chat.completions.create(
+        response = await run_blocking(
+            chat_completion,
+            "improve_job_description",
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=700,
@@ -1462,46 +1426,58 @@ async def improve_job_description(description: str = Body(..., embed=True)):
         improved_description = response.choices[0].message.content.strip()
         return {"improved_description": improved_description}
 
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to improve job description: {str(e)}")
 
-@app.get("/api/get-department-competencies/{department}")
+@router.get("/api/get-department-competencies/{department}")
 async def get_department_competencies(department: str, db: Session = Depends(get_db)):
     """ Retrieves competencies for a department, assigning AI categories if missing. """
     try:
-        framework = db.query(Framework).filter(Framework.department == department).first()
-        if not framework:
+        department_id = resolve_department_id(db, department)
+        if not department_id:
             raise HTTPException(status_code=404, detail="Department not found")
 
-        job_titles = db.query(JobTitle).filter(JobTitle.department_id == framework.id).all()
+        rows = department_competency_rows(db, department_id)
+
+        # Categorize the uncategorized competencies concurrently, one call per distinct competency
+        pending = list({(row.name, row.description or "") for row in rows if not row.category})
+        assigned = dict(zip(pending, await asyncio.gather(
+            *(run_blocking(categorize_with_ai, name, description) for name, description in pending)
+        )))
 
         competencies = {}
-        for job in job_titles:
-            for competency in job.competencies:
-                # Use stored category or assign a new one via AI
-                category = competency.get("category") or categorize_with_ai(competency["name"], competency.get("description", ""))
-                
-                # Store AI-assigned category back to DB (so it doesn’t run again)
-                competency["category"] = category
-                db.commit()  # Save category to DB
-
-                # Group by category
-                if category not in competencies:
-                    competencies[category] = []
-
-                competencies[category].append({
-                    "competency": competency["name"],
-                    "description": competency.get("description", "No description available"),
-                })
+        categorized = False
+        for competency in rows:
+            category = competency.category
+            if not category:
+                category = assigned[(competency.name, competency.description or "")]
+                if category:
+                    # Store AI-assigned category back to DB (so it doesn’t run again)
+                    competency.category = category
+                    categorized = True
+                else:
+                    category = "Uncategorized"  # shown, not stored: the next request retries
+
+            # Group by category
+            competencies.setdefault(category, []).append({
+                "competency": competency.name,
+                "description": competency.description if competency.description is not None else "No description available",
+            })
+
+        if categorized:
+            db.commit()  # Save categories to DB in one transaction
 
         return {"competencies": competencies}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 # -------------------- FASTAPI STARTUP EVENT -------------------- #
-@app.on_event("startup")
 def on_startup():
     """
     On server startup, run the initial Ashby data sync in a background thread
@@ -1528,61 +1504,165 @@ def on_startup():
     # Start background task for periodic updates
     loop = asyncio.get_event_loop()
     loop.create_task(update_candidates())
+    # Roll new scorecard scores into competency_trends (incremental, see trend_rollups)
+    loop.create_task(rollup_trends_periodically(SessionLocal))
+
+    # Import the OpenAI SDK in the background so the first AI request does not pay for it
+    threading.Thread(target=warm_up_llm_client, daemon=True).start()
+
+
+async def on_shutdown():
+    await close_http_client()
+    await dispose_async_engine()
 
 
 # Health check endpoint
-@app.get("/")
+@router.get("/api/health")
 def health_check():
     return {"status": "OK"}
 
-@app.get("/api/get-competency-history/{competency_name}")
+@router.get("/api/admin/db-pool")
+def db_pool_statistics(admin: dict = Depends(get_current_admin)):
+    """Live connection pool usage: checked out, overflow, checkout wait times and timeouts."""
+    return pool_stats(engine)
+
+@router.get("/api/llm/breakers")
+def llm_breakers():
+    """Current circuit-breaker state per model."""
+    return get_breaker_states()
+
+@router.get("/api/search/cache-stats")
+def search_cache_statistics():
+    """Hit/miss counters for the X-ray query, search result and candidate summary caches."""
+    return {**search_cache_stats(), "candidate_summaries": summary_cache.stats()}
+
+@router.get("/api/frameworks/cache-stats")
+def framework_cache_statistics():
+    """Hit ratios of the department / job title resolution caches."""
+    return resolution_cache_stats()
+
+@router.get("/api/llm/parse-stats")
+def llm_parse_stats():
+    """Structured-output parse counters per schema, including the first-pass failure rate."""
+    return get_parse_stats()
+
+def competency_history_query(competency_name: str, department_id=None, from_date: Optional[date] = None,
+                             to_date: Optional[date] = None, summary: bool = False, cursor: Optional[str] = None,
+                             limit: int = PAGE_SIZE_DEFAULT):
+    """The statement behind get-competency-history (also EXPLAINed by check_query_plans.py)."""
+    columns = [
+        CompetencyEvolution.id, CompetencyEvolution.competency_name, CompetencyEvolution.job_title,
+        CompetencyEvolution.job_level, CompetencyEvolution.change_type, CompetencyEvolution.date_changed,
+    ]
+    if not summary:
+        columns += [CompetencyEvolution.old_value, CompetencyEvolution.new_value]
+    query = select(*columns).where(CompetencyEvolution.competency_name == competency_name)
+    if department_id:
+        # Semi-join on job_titles (department_id, job_title) instead of an IN over every title string
+        query = query.where(exists().where(
+            JobTitle.department_id == department_id, JobTitle.job_title == CompetencyEvolution.job_title
+        ))
+    if from_date:
+        query = query.where(CompetencyEvolution.date_changed >= datetime.combine(from_date, datetime.min.time()))
+    if to_date:
+        query = query.where(
+            CompetencyEvolution.date_changed < datetime.combine(to_date + timedelta(days=1), datetime.min.time())
+        )
+    return keyset(
+        query, (CompetencyEvolution.date_changed, CompetencyEvolution.id), cursor, (datetime.fromisoformat, int), limit,
+    )
+
+
+@router.get("/api/get-competency-history/{competency_name}")
 async def get_competency_history(
     competency_name: str,
+    response: Response,
     department: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    from_date: Optional[date] = Query(None),
+    to_date: Optional[date] = Query(None),
+    summary: bool = Query(False),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Retrieves historical changes of a specific competency, filtered by department if provided.
+    Newest change first, one page at a time (next cursor in the X-Next-Cursor header),
+    so a competency edited thousands of times still loads quickly. from_date / to_date (YYYY-MM-DD, inclusive) optionally bound
+    the period. summary=true leaves out the old/new value payloads (they are not read
+    from the database either).
     """
     try:
-        query = db.query(CompetencyEvolution).filter(
-            CompetencyEvolution.competency_name == competency_name
-        )
+        limit = page_size(limit)
+        department_id = None
         if department:
-            query = query.filter(CompetencyEvolution.job_title.in_(
-                db.query(JobTitle.job_title).join(Framework).filter(Framework.department == department)
-            ))
+            department_id = await aresolve_department_id(db, department)
+            if not department_id:
+                return []
+        query = competency_history_query(competency_name, department_id, from_date, to_date, summary, cursor, limit)
 
-        history = query.all()
+        history, next_cursor = split_page(
+            (await db.execute(query)).all(), limit, lambda record: (record.date_changed, record.id)
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
-        return [
-            {
+        records = []
+        for record in history:
+            item = {
                 "competency_name": record.competency_name,
                 "job_title": record.job_title,
                 "job_level": record.job_level,
                 "change_type": record.change_type,
-                "old_value": record.old_value,
-                "new_value": record.new_value,
                 "date_changed": record.date_changed.isoformat() if isinstance(record.date_changed, datetime) else record.date_changed,
             }
-            for record in history
-        ]
+            if not summary:
+                item["old_value"] = record.old_value
+                item["new_value"] = record.new_value
+            records.append(item)
+        return records
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch competency history: {str(e)}")
 
-@app.get("/api/get-trends-over-time")
+@router.get("/api/get-trends-over-time")
 async def get_trends_over_time(
-    department: Optional[str] = Query(None), db: Session = Depends(get_db)
+    response: Response,
+    department: Optional[str] = Query(None),
+    from_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    to_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Retrieves competency trends over time, filtered by department if provided.
+    Reads the monthly rollups (one row per competency, department and month)
+    maintained by trend_rollups, never the raw scorecards.
+    Newest month first, one page at a time (next cursor in the X-Next-Cursor header).
+    from_month / to_month (YYYY-MM, inclusive) bound the period.
     """
     try:
-        query = db.query(CompetencyTrend)
+        limit = page_size(limit)
+        # Rows without a score count were never rolled up (seeded zeros or a rebuild's leftovers)
+        query = select(CompetencyTrend).where(CompetencyTrend.score_count.isnot(None))
         if department:
-            query = query.filter(CompetencyTrend.department == department)
+            query = query.where(CompetencyTrend.department == department)
+        period = tuple_(CompetencyTrend.year, CompetencyTrend.month)
+        if from_month:
+            query = query.where(period >= tuple_(*map(int, from_month.split("-"))))
+        if to_month:
+            query = query.where(period <= tuple_(*map(int, to_month.split("-"))))
+        query = keyset(
+            query, (CompetencyTrend.year, CompetencyTrend.month, CompetencyTrend.id), cursor, (int, int, int), limit
+        )
 
-        trends = query.all()
+        trends, next_cursor = split_page(
+            (await db.execute(query)).scalars().all(), limit, lambda trend: (trend.year, trend.month, trend.id)
+        )
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
         return [
             {
@@ -1594,16 +1674,18 @@ async def get_trends_over_time(
             }
             for trend in trends
         ]
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch competency trends: {str(e)}")
 
-@app.get("/api/get-departments")
-async def get_departments(db: Session = Depends(get_db)):
+@router.get("/api/get-departments", dependencies=[Depends(aconditional("frameworks"))])
+async def get_departments(db: AsyncSession = Depends(get_async_db)):
     """
     Retrieves all unique departments from the Framework table, including department IDs.
     """
     try:
-        frameworks = db.query(Framework.id, Framework.department).distinct().all()
+        frameworks = (await db.execute(select(Framework.id, Framework.department).distinct())).all()
         department_list = [{"id": f.id, "department": f.department} for f in frameworks]
 
         if not department_list:
@@ -1616,82 +1698,35 @@ async def get_departments(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Failed to fetch departments")
 
 
-@app.get("/api/get-department-competencies/{department}")
+@router.get("/api/get-department-competencies/{department}")
 async def get_department_competencies(department: str, db: Session = Depends(get_db)):
     """
     Fetches all competencies across a department, along with associated job titles.
     """
     # Fetch the framework record for the specified department.
-    framework = db.query(Framework).filter(Framework.department == department).first()
-    if not framework:
+    department_id = resolve_department_id(db, department)
+    if not department_id:
         raise HTTPException(status_code=404, detail=f"Department '{department}' not found.")
 
-    # Fetch all job titles for this department.
-    job_titles = db.query(JobTitle).filter(JobTitle.department_id == framework.id).all()
-
-    # Aggregate competencies across all job titles.
-    competency_map = {}
-    for job in job_titles:
-        if job.competencies:  # Ensure competencies exist
-            for comp in job.competencies:  # Loop through the JSON list
-                comp_name = comp.get("name")  # Extract competency name
-                if comp_name:
-                    if comp_name in competency_map:
-                        competency_map[comp_name].add(job.job_title)
-                    else:
-                        competency_map[comp_name] = {job.job_title}
-
-    # Convert set values to lists for JSON response compatibility.
-    competencies_list = [{"competency": comp, "job_titles": list(job_titles)} for comp, job_titles in competency_map.items()]
-
+    # Competency names and their job titles, aggregated in SQL
     return {
-        "department": framework.department,
-        "competencies": competencies_list
+        "department": department,
+        "competencies": department_competency_job_titles(db, department_id)
     }
 
-@app.get("/api/get-categorized-framework/{id}")
-async def get_categorized_framework(id: int, db: Session = Depends(get_db)):
+@router.get("/api/get-categorized-framework/{id}")
+async def get_categorized_framework(id: UUID, db: Session = Depends(get_db)):
     logging.info(f"🔍 Fetching framework for ID: {id}")
 
-    framework = db.query(Framework).filter(Framework.id == id).first()
+    # Categories for every competency come from one query, grouped in memory
+    framework = categorized_framework(db, id, STATIC_CATEGORIES)
     if not framework:
         raise HTTPException(status_code=404, detail="Framework not found")
 
-    # Ensure categories exist
-    categorized_competencies = {category: [] for category in STATIC_CATEGORIES}
-
-    for job in framework.job_titles:
-        logging.info(f"🔍 Processing job title: {job.job_title}")
-
-        for competency in job.competencies:
-            competency_name = competency.get("name")
-            logging.info(f"🔎 Looking up competency: {competency_name}")
-
-            competency_record = db.query(CompetencyEvolution).filter(
-                CompetencyEvolution.competency_name == competency_name
-            ).first()
-
-            # Ensure category exists in response
-            if competency_record and competency_record.category:
-                category = competency_record.category.strip()
-            else:
-                logging.warning(f"⚠️ No category found for '{competency_name}', defaulting to 'Uncategorized'.")
-                category = "Uncategorized"
-
-            if category not in categorized_competencies:
-                categorized_competencies[category] = []  # Ensure category exists
-
-            categorized_competencies[category].append(competency)
-
-    # 🚨 **Fix: Ensure a valid response structure is always returned**
-    return {
-        "id": framework.id,
-        "department": framework.department,
-        "competencies_by_category": categorized_competencies or {},  # 🔥 Prevents frontend crash
-    }
+    return framework
 
 
-@app.post("/api/add-competency")
+@router.post("/api/add-competency")
 async def add_competency(competency: CompetencyCreate, db: Session = Depends(get_db)):
     """
     Adds a new competency and assigns a category if it doesn't exist.
@@ -1726,87 +1761,83 @@ async def add_competency(competency: CompetencyCreate, db: Session = Depends(get
     return {"message": "Competency added successfully", "category": assigned_category}
     
 # -------------------- MIGRATION FUNCTION -------------------- #
-def migrate_existing_competencies(db: Session):
-    """
-    Transfers historical competency data from job_titles to competency_evolution.
-    This ensures we have a record of all existing competencies in the evolution tracking table.
-    """
-    try:
-        # Get all job titles
-        job_titles = db.query(JobTitle).all()
-        migrated_count = 0
-
-        for job in job_titles:
-            if not job.competencies:  # Skip if no competencies
-                continue
-
-            for competency in job.competencies:
-                competency_name = competency["name"]
-                descriptions = str(competency["descriptions"])  # Convert JSON to string for storage
-                
-                # Check if this competency already exists in competency_evolution
-                existing_entry = db.query(CompetencyEvolution).filter(
-                    CompetencyEvolution.competency_name == competency_name,
-                    CompetencyEvolution.job_title == job.job_title,
-                    CompetencyEvolution.job_level == "N/A",  # Since we're bulk importing
-                ).first()
-
-                if not existing_entry:
-                    # Insert into competency_evolution as an "Initial Record"
-                    new_entry = CompetencyEvolution(
-                        competency_name=competency_name,
-                        job_title=job.job_title,
-                        job_level="N/A",
-                        change_type="Initial Record",
-                        old_value="None",
-                        new_value=descriptions,
-                        date_changed=datetime.utcnow()
-                    )
-                    db.add(new_entry)
-                    migrated_count += 1
-
-        db.commit()  # Commit all new entries
-        logging.info(f"✅ Migrated {migrated_count} competency records from job_titles to competency_evolution.")
-
-    except Exception as e:
-        db.rollback()
-        logging.error(f"❌ Failed to migrate competency data: {e}")
-
-@app.get("/candidates")
+@router.get("/candidates", response_model=List[CandidateSummary])
 def get_candidates(db: Session = Depends(get_db)):
     """Return all candidates stored in the local database."""
-    cands = db.query(Candidate).all()
-    return [
-        {
-            "id": str(c.id),
-            "name": c.name,
-            "email": c.email,
-        }
-        for c in cands
-    ]
+    cands = db.query(Candidate.id, Candidate.name, Candidate.email).all()
+    return json_response([{"id": c.id, "name": c.name, "email": c.email} for c in cands])
 
-@app.get("/interviews")
+@router.get("/interviews")
 def get_interviews():
     return fetch_interview_list()
 
-@app.get("/jobs")
+@router.get("/jobs")
 def get_jobs():
     return fetch_job_list()
 
-@app.get("/departments")
+@router.get("/departments")
 def get_departments():
     return fetch_department_list()
 
 
-# -------------------- RUN MIGRATION AT STARTUP -------------------- #
-with SessionLocal() as db:
-    migrate_existing_competencies(db)
+# -------------------- APP FACTORY -------------------- #
+async def llm_unavailable_handler(request, exc: LLMUnavailableError):
+    """LLM provider incidents fail fast with 503/504 instead of hanging the worker."""
+    status_code = 504 if isinstance(exc, LLMDeadlineExceeded) else 503
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": f"AI service temporarily unavailable: {exc}"},
+        headers={"Retry-After": str(int(BREAKER_COOLDOWN))},
+    )
+
+
+def create_app() -> FastAPI:
+    """
+    Builds the application without touching the database: no connections,
+    migrations or file parsing happen here, so a replica is ready as soon as
+    uvicorn has imported it. Run `python migrate.py` before deploying.
+    """
+    app = FastAPI(on_startup=[on_startup], on_shutdown=[on_shutdown], default_response_class=FastJSONResponse)
+
+    # Configure CORS before including any routers or endpoints
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],  # paged list endpoints return their cursor here
+    )
+    # brotli/gzip for JSON and other text bodies above COMPRESS_MIN_BYTES
+    app.add_middleware(CompressionMiddleware)
+    app.add_exception_handler(LLMUnavailableError, llm_unavailable_handler)
+
+    app.include_router(ashby_router)
+    app.include_router(users_router)
+    app.include_router(policies_router)
+    app.include_router(analytics_router)
+    app.include_router(router)
+
+    # Serve built React frontend if present; mounted last so the API routes match first.
+    # SPAStaticFiles also answers client-side routes with index.html.
+    frontend_dir = os.path.join(os.path.dirname(__file__), "client_build")
+    if os.path.isdir(frontend_dir):
+        app.mount("/", SPAStaticFiles(directory=frontend_dir), name="frontend")
+
+    return app
+
+
+app = create_app()
 
 
 # -------------------- MAIN -------------------- #
 if __name__ == "__main__":
     import uvicorn
 
+    from migrate import migrate
+
+    migrate()
+
     logging.info("🔄 Fetching and storing departments & jobs before server start...")
 
     session = SessionLocal()
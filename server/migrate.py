@@ -0,0 +1,91 @@
+"""
+Schema and data migrations, run once per deploy before the web processes start.
+
+The app used to do all of this on import (reset alembic_version, upgrade,
+create_all, data migrations), so every worker of every replica repeated it
+before it could serve. Now:
+    python migrate.py          # create missing tables, alembic upgrade head, run-once data migrations
+
+It is the release step (Procfile `release:`, or the platform's pre-deploy
+command), so replicas start serving without waiting on it. start.sh only runs
+it when RUN_MIGRATIONS=1, for single-instance setups. On Postgres the whole
+run holds an advisory lock: a second concurrent run waits and then finds
+nothing left to do, instead of racing on `alembic upgrade` and the concurrent
+index builds.
+"""
+import logging
+import os
+from contextlib import contextmanager
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+
+from data_migrations import run_pending
+from deps import SessionLocal, engine
+from models import Base
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+# pg_advisory_lock key shared by every migrate.py run
+MIGRATION_LOCK_KEY = 804217
+
+
+def _alembic_config() -> Config:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    return config
+
+
+def clear_unknown_revision(config: Config) -> None:
+    """
+    Forgets a recorded revision the scripts no longer contain (older revisions
+    were retired), so `upgrade head` can proceed. A known revision is kept:
+    resetting it on every boot would re-run every migration.
+    """
+    if not inspect(engine).has_table("alembic_version"):
+        return
+    known = {script.revision for script in ScriptDirectory.from_config(config).walk_revisions()}
+    with engine.begin() as conn:
+        recorded = [row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))]
+        unknown = [revision for revision in recorded if revision not in known]
+        if unknown:
+            logging.warning(f"⚠️ Clearing unknown Alembic revision(s): {', '.join(unknown)}")
+            conn.execute(text("DELETE FROM alembic_version"))
+
+
+@contextmanager
+def migration_lock():
+    """Serializes migrate.py runs on Postgres; a no-op elsewhere."""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    # A connection of its own: the lock is held by the session, not a transaction
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        logging.info("🔒 Waiting for the migration lock...")
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+
+def migrate() -> None:
+    with migration_lock():
+        # Missing tables first (create_all does not alter existing ones); the
+        # revisions then alter existing tables and are written to be idempotent
+        Base.metadata.create_all(bind=engine)
+
+        config = _alembic_config()
+        clear_unknown_revision(config)
+        logging.info("🚀 Running Alembic migrations...")
+        command.upgrade(config, "head")
+
+        with SessionLocal() as db:
+            run_pending(db)
+    logging.info("✅ Migrations complete.")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    migrate()
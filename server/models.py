@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey, Boolean, Float, DateTime, Date
+from sqlalchemy import Column, Integer, String, Text, JSON, ForeignKey, Boolean, Float, DateTime, Date, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID  
@@ -9,13 +9,37 @@ Base = declarative_base()
 
 class Policy(Base):
     __tablename__ = "policies"
+    __table_args__ = (
+        # Keyset order of get-policies
+        Index("ix_policies_created_at_id", "created_at", "id"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=True)
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    chunks = relationship("PolicyChunk", back_populates="policy", cascade="all, delete-orphan")
+
+
+class PolicyChunk(Base):
+    __tablename__ = "policy_chunks"
+    __table_args__ = (UniqueConstraint("policy_id", "chunk_index", name="uq_policy_chunks_policy_chunk"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    policy_id = Column(Integer, ForeignKey("policies.id"), nullable=False, index=True)
+    chunk_index = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+
+    policy = relationship("Policy", back_populates="chunks")
+
+
 class HRPolicyVersion(Base):
     __tablename__ = "hr_policy_versions"
+    __table_args__ = (
+        # Filter and keyset order of get-policy-versions
+        Index("ix_hr_policy_versions_business_type_created", "business", "policy_type", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     business = Column(String, nullable=False)
@@ -30,6 +54,9 @@ class HRPolicyVersion(Base):
 
 class CompetencyTrend(Base):
     __tablename__ = "competency_trends"
+    __table_args__ = (
+        Index("ix_competency_trends_period", "year", "month", "department", "competency_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     competency_name = Column(String, index=True)
@@ -37,13 +64,16 @@ class CompetencyTrend(Base):
     month = Column(Integer)
     year = Column(Integer)
     average_score = Column(Float, default=0)
+    # Running totals maintained by trend_rollups.py; average_score = score_sum / score_count
+    score_sum = Column(Float, nullable=True)
+    score_count = Column(Integer, nullable=True)
 
 
 class JobTitle(Base):
     __tablename__ = "job_titles"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    department_id = Column(UUID(as_uuid=True), ForeignKey("frameworks.id"), nullable=True)
+    department_id = Column(UUID(as_uuid=True), ForeignKey("frameworks.id"), nullable=True, index=True)
     job_title = Column(String, index=True)
     status = Column(String)
     employment_type = Column(String)
@@ -58,13 +88,16 @@ class JobTitle(Base):
         "JobDescription", uselist=False, back_populates="job_title", cascade="all, delete-orphan"
     )
     candidates = relationship("Candidate", back_populates="job", cascade="all, delete-orphan")
+    competency_rows = relationship(
+        "Competency", back_populates="job_title", cascade="all, delete-orphan", order_by="Competency.position"
+    )
 
 
 class JobDescription(Base):
     __tablename__ = "job_descriptions"
 
     id = Column(Integer, primary_key=True, index=True)
-    job_title_id = Column(UUID(as_uuid=True), ForeignKey("job_titles.id"), nullable=False)
+    job_title_id = Column(UUID(as_uuid=True), ForeignKey("job_titles.id"), nullable=False, index=True)
     description = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, onupdate=datetime.utcnow)
@@ -72,6 +105,42 @@ class JobDescription(Base):
     job_title = relationship("JobTitle", back_populates="job_description")
 
 
+# Normalized copy of JobTitle.competencies for SQL filtering (kept in sync by competency_store.py)
+class Competency(Base):
+    __tablename__ = "competencies"
+    __table_args__ = (
+        Index("ix_competencies_job_title_id_name", "job_title_id", "name"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_title_id = Column(UUID(as_uuid=True), ForeignKey("job_titles.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String, nullable=False, index=True)
+    category = Column(String, nullable=True)
+    description = Column(Text, nullable=True)
+    position = Column(Integer, nullable=False, default=0)
+
+    job_title = relationship("JobTitle", back_populates="competency_rows")
+    levels = relationship(
+        "CompetencyLevel", back_populates="competency", cascade="all, delete-orphan",
+        order_by="CompetencyLevel.position", lazy="selectin",
+    )
+
+
+class CompetencyLevel(Base):
+    __tablename__ = "competency_levels"
+    __table_args__ = (
+        Index("ix_competency_levels_competency_id_level", "competency_id", "level"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    competency_id = Column(Integer, ForeignKey("competencies.id", ondelete="CASCADE"), nullable=False)
+    level = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    position = Column(Integer, nullable=False, default=0)
+
+    competency = relationship("Competency", back_populates="levels")
+
+
 class Framework(Base):
     __tablename__ = "frameworks"
 
@@ -101,7 +170,7 @@ class Candidate(Base):
     application_history = Column(String, nullable=True)
     interview_date = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # New column for incremental sync
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # New column for incremental sync
     archived = Column(Boolean, default=False)
 
     # Relationships
@@ -117,7 +186,7 @@ class InterviewFeedback(Base):
     __tablename__ = "interview_feedback"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"))
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"), index=True)
     application_id = Column(UUID(as_uuid=True), nullable=True)
     interviewer_name = Column(String)
     interviewer_email = Column(String)
@@ -133,7 +202,7 @@ class ScorecardEntry(Base):
     __tablename__ = "scorecard_entries"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"))  # Updated to use UUID
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"), index=True)  # Updated to use UUID
     category = Column(String, nullable=True)
     skill = Column(String, nullable=False)
     score = Column(Float, nullable=False)
@@ -141,7 +210,7 @@ class ScorecardEntry(Base):
     interviewer_id = Column(String, nullable=True)
     submitted_at = Column(DateTime, nullable=True)
     metadata_json = Column(JSON, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)  # rollup watermark column
 
     # Relationship
     candidate = relationship("Candidate", back_populates="scorecard_entries")
@@ -165,7 +234,7 @@ class ApplicationHistory(Base):
     __tablename__ = "application_history"
 
     id = Column(String, primary_key=True)  # Using String for id as API might not provide a UUID
-    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"), nullable=False)
+    candidate_id = Column(UUID(as_uuid=True), ForeignKey("candidates.id"), nullable=False, index=True)
     job_id = Column(UUID(as_uuid=True), nullable=True)
     status = Column(String, nullable=True)
     current_stage_id = Column(UUID(as_uuid=True), nullable=True)
@@ -195,7 +264,7 @@ class InterviewQuestion(Base):
     __tablename__ = "interview_questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    job_title_id = Column(UUID(as_uuid=True), ForeignKey("job_titles.id"), nullable=False)
+    job_title_id = Column(UUID(as_uuid=True), ForeignKey("job_titles.id"), nullable=False, index=True)
     question = Column(Text, nullable=False)
     follow_up = Column(Text, nullable=True)
     competency = Column(String, nullable=False)
@@ -210,7 +279,7 @@ class AnswerSuggestion(Base):
     __tablename__ = "answer_suggestions"
 
     id = Column(Integer, primary_key=True, index=True)
-    question_id = Column(Integer, ForeignKey("interview_questions.id"), nullable=False)
+    question_id = Column(Integer, ForeignKey("interview_questions.id"), nullable=False, index=True)
     score = Column(Integer, nullable=False)
     answer = Column(Text, nullable=False)
 
@@ -220,6 +289,11 @@ class AnswerSuggestion(Base):
 
 class CompetencyEvolution(Base):
     __tablename__ = "competency_evolution"
+    __table_args__ = (
+        Index("ix_competency_evolution_name_title_level", "competency_name", "job_title", "job_level"),
+        # History pages: newest first per competency
+        Index("ix_competency_evolution_name_date", "competency_name", "date_changed", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     competency_name = Column(String, index=True)
@@ -246,4 +320,40 @@ class AuditLog(Base):
     admin_username = Column(String, nullable=False)
     action = Column(String, nullable=False)
     target_username = Column(String, nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+# X-ray search hits kept for /candidate/{id} lookups (shared candidate store backend)
+class SourcedCandidateRecord(Base):
+    __tablename__ = "sourced_candidates"
+
+    id = Column(String, primary_key=True)
+    payload = Column(JSON, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    last_accessed = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+# How far each incremental rollup job has processed its source table (see trend_rollups.py)
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String, primary_key=True)
+    processed_until = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Change counter per group of tables, bumped in the writing transaction (see etags.py)
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+# One row per completed run-once data migration (see data_migrations.py)
+class DataMigration(Base):
+    __tablename__ = "data_migrations"
+
+    name = Column(String, primary_key=True)
+    completed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    details = Column(JSON, nullable=True)
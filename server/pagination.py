@@ -0,0 +1,96 @@
+"""
+Keyset (cursor) pagination for endpoints over append-only tables.
+
+Pages are ordered newest first by a sort key that ends in the primary key,
+and the next page starts strictly after the last row of the previous one:
+`WHERE (created_at, id) < (:last_created_at, :last_id)`. Unlike OFFSET, the
+cost of a page does not grow with how deep the client has paged.
+
+The cursor is an opaque URL-safe token holding the last row's sort key. List
+endpoints return it in the `X-Next-Cursor` header (so their body shape stays
+a plain list); object endpoints return it as `next_cursor`. No cursor means
+the last page.
+
+Every response is one page: a request without `limit` gets PAGE_SIZE_DEFAULT
+rows, so response size stays bounded however large the tables grow. Clients
+follow the cursor for more.
+
+Sort key columns may be NULL. NULLs sort first (DESC NULLS FIRST, Postgres's
+default for DESC, so an ascending index still serves the order), and a NULL
+in a cursor is encoded as JSON null.
+
+Configuration (environment):
+    PAGE_SIZE_DEFAULT   rows per page when no limit is given (50)
+    PAGE_SIZE_MAX       upper bound on the limit a client can ask for (200)
+"""
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "200"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def page_size(limit: Optional[int]) -> int:
+    if limit is None:
+        return PAGE_SIZE_DEFAULT
+    return max(1, min(limit, PAGE_SIZE_MAX))
+
+
+def _encode_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[Callable[[Any], Any]]) -> List[Any]:
+    """Decodes a cursor into typed values, e.g. types=(datetime.fromisoformat, int)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if len(values) != len(types):
+            raise ValueError("wrong number of values")
+        return [None if value is None else convert(value) for convert, value in zip(types, values)]
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def _nullable(column) -> bool:
+    return getattr(getattr(column, "expression", column), "nullable", True)
+
+
+def _after(columns: Sequence[Any], values: Sequence[Any]):
+    """Rows after `values` in (DESC NULLS FIRST) order."""
+    if None not in values:
+        # NULL keys sort before any value and compare as unknown, so the row comparison excludes them
+        return tuple_(*columns) < tuple_(*values)
+    clauses, prefix = [], []
+    for column, value in zip(columns, values):
+        step = column.isnot(None) if value is None else column < value
+        clauses.append(and_(*prefix, step))
+        prefix.append(column.is_(None) if value is None else column == value)
+    return or_(*clauses)
+
+
+def keyset(stmt, columns: Sequence[Any], cursor: Optional[str], types: Sequence[Callable[[Any], Any]], limit: int):
+    """Applies newest-first ordering, the cursor bound and limit + 1 (to detect a next page)."""
+    if cursor:
+        stmt = stmt.where(_after(columns, decode_cursor(cursor, types)))
+    stmt = stmt.order_by(*(column.desc().nullsfirst() if _nullable(column) else column.desc() for column in columns))
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int, sort_key: Callable[[Any], Tuple]) -> Tuple[List[Any], Optional[str]]:
+    """Trims the lookahead row and returns (page, next cursor or None)."""
+    page = list(rows[:limit])
+    next_cursor = encode_cursor(sort_key(page[-1])) if len(rows) > limit else None
+    return page, next_cursor
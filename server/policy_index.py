@@ -0,0 +1,215 @@
+"""
+Retrieval index for HR policy questions.
+
+Policies are split into overlapping chunks when they are uploaded and stored in
+`policy_chunks`. Each worker keeps an in-memory BM25 index over those chunks, so
+`/api/query-policy` can send the top-k relevant chunks instead of the whole
+policy library.
+
+A refresh first reads a cheap watermark of `policy_chunks`: its highest id
+and row count, one aggregate over the primary key. While that is unchanged
+the refresh stops there. When it changes, the refresh diffs the chunk ids in
+the table against the ids in the index: it loads the content of chunks it has
+not indexed yet, evicts chunks that are gone (deleted or re-chunked policies)
+and re-reads the policy titles. Diffing the id set rather than keeping an id
+high-water mark means a chunk whose transaction commits after a higher id was
+indexed is still picked up (it changes the count). A title edited without any
+chunk change shows up with the next chunk change.
+"""
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import Policy, PolicyChunk
+
+CHUNK_WORDS = int(os.getenv("POLICY_CHUNK_WORDS", "180"))
+CHUNK_OVERLAP_WORDS = int(os.getenv("POLICY_CHUNK_OVERLAP_WORDS", "40"))
+TOP_K = int(os.getenv("POLICY_TOP_K", "5"))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from", "how", "i", "in",
+    "is", "it", "of", "on", "or", "our", "that", "the", "this", "to", "was", "we", "what", "when",
+    "which", "who", "will", "with", "you", "your",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def chunk_text(text: str, max_words: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP_WORDS) -> List[str]:
+    """Splits text into paragraph-aligned chunks of about `max_words` words with a word overlap."""
+    overlap = min(overlap, max_words // 2)
+    chunks: List[str] = []
+    current: List[str] = []
+    fresh = 0  # words in `current` that are not carried-over overlap
+
+    def flush():
+        nonlocal current, fresh
+        chunks.append(" ".join(current))
+        current = current[-overlap:] if overlap else []
+        fresh = 0
+
+    for paragraph in re.split(r"\n\s*\n", text):
+        words = paragraph.split()
+        if fresh and len(current) + len(words) > max_words:
+            flush()  # prefer breaking between paragraphs
+        for word in words:
+            if len(current) >= max_words:
+                flush()
+            current.append(word)
+            fresh += 1
+
+    if fresh:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+class BM25Index:
+    """Incrementally built BM25 index over policy chunks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.meta: Dict[int, Dict] = {}
+        self.total_length = 0
+        self.backfilled = False
+        # (max chunk id, chunk count) as of the last refresh
+        self.watermark = None
+
+    def add(self, chunk_id: int, policy_id: int, title: Optional[str], chunk_index: int, content: str):
+        tokens = tokenize(content)
+        with self._lock:
+            if chunk_id in self.doc_lengths:
+                return
+            for term, tf in Counter(tokens).items():
+                self.postings.setdefault(term, {})[chunk_id] = tf
+            self.doc_lengths[chunk_id] = len(tokens)
+            self.total_length += len(tokens)
+            self.meta[chunk_id] = {
+                "policy_id": policy_id,
+                "title": title,
+                "chunk_index": chunk_index,
+                "content": content,
+            }
+
+    def remove(self, chunk_id: int):
+        with self._lock:
+            meta = self.meta.pop(chunk_id, None)
+            if meta is None:
+                return
+            for term in set(tokenize(meta["content"])):
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(chunk_id, None)
+                    if not postings:
+                        del self.postings[term]
+            self.total_length -= self.doc_lengths.pop(chunk_id)
+
+    def chunk_ids(self) -> Set[int]:
+        with self._lock:
+            return set(self.doc_lengths)
+
+    def set_titles(self, titles: Dict[int, Optional[str]]):
+        with self._lock:
+            for meta in self.meta.values():
+                meta["title"] = titles.get(meta["policy_id"], meta["title"])
+
+    def search(self, query: str, k: int = TOP_K) -> List[Dict]:
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self.doc_lengths)
+            if not n_docs or not terms:
+                return []
+            avg_length = self.total_length / n_docs
+            scores: Dict[int, float] = {}
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[chunk_id] / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            return [dict(self.meta[chunk_id], chunk_id=chunk_id, score=round(score, 4)) for chunk_id, score in best]
+
+
+policy_index = BM25Index()
+
+
+def index_policy(db: Session, policy: Policy) -> List[PolicyChunk]:
+    """Chunks a policy into `policy_chunks`. The caller commits."""
+    chunks = [
+        PolicyChunk(policy_id=policy.id, chunk_index=i, content=content)
+        for i, content in enumerate(chunk_text(policy.content))
+    ]
+    db.add_all(chunks)
+    return chunks
+
+
+def _backfill_unchunked(db: Session):
+    """Chunks policies stored before chunking existed."""
+    unchunked = (
+        db.query(Policy)
+        .outerjoin(PolicyChunk, PolicyChunk.policy_id == Policy.id)
+        .filter(PolicyChunk.id.is_(None))
+        .all()
+    )
+    for policy in unchunked:
+        try:
+            index_policy(db, policy)
+            db.commit()
+        except IntegrityError:  # another worker chunked it first
+            db.rollback()
+    if unchunked:
+        logging.info(f"Chunked {len(unchunked)} existing policies for retrieval.")
+
+
+def refresh_index(db: Session):
+    """Brings this worker's index in line with `policy_chunks`."""
+    if not policy_index.backfilled:
+        _backfill_unchunked(db)
+        policy_index.backfilled = True
+
+    watermark = tuple(db.query(func.max(PolicyChunk.id), func.count(PolicyChunk.id)).one())
+    if watermark == policy_index.watermark:
+        return
+
+    stored = {chunk_id for (chunk_id,) in db.query(PolicyChunk.id)}
+    indexed = policy_index.chunk_ids()
+    for chunk_id in indexed - stored:
+        policy_index.remove(chunk_id)
+
+    missing = sorted(stored - indexed)
+    query = db.query(
+        PolicyChunk.id, PolicyChunk.policy_id, Policy.title, PolicyChunk.chunk_index, PolicyChunk.content
+    ).join(Policy, Policy.id == PolicyChunk.policy_id)
+    if not indexed:
+        batches = [query] if missing else []  # first load: everything
+    else:
+        batches = [query.filter(PolicyChunk.id.in_(missing[i:i + 500])) for i in range(0, len(missing), 500)]
+    for batch in batches:
+        for row in batch.all():
+            policy_index.add(*row)
+    if indexed:
+        policy_index.set_titles(dict(db.query(Policy.id, Policy.title)))
+    policy_index.watermark = watermark
+
+
+def retrieve(db: Session, query: str, k: int = TOP_K) -> List[Dict]:
+    refresh_index(db)
+    return policy_index.search(query, k)
@@ -0,0 +1,131 @@
+"""
+In-process cache for resolving department names and job titles to IDs.
+
+Most framework endpoints start by turning a department name into a framework
+ID and a (framework ID, job title) pair into a job title ID. Both mappings
+change rarely, so they are cached with a TTL. Only hits are cached; an unknown
+name always goes to the database, so newly created rows are found right away.
+
+Writers call `invalidate_departments()` / `invalidate_job_titles()` after
+committing (Ashby sync, save_competencies, delete_framework). Other workers
+pick up changes within the TTL.
+
+Configuration (environment):
+    RESOLUTION_CACHE_TTL_SECONDS  entry TTL (300)
+    RESOLUTION_CACHE_MAX_ENTRIES  entries per cache (5000)
+"""
+import os
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from cache import TTLCache
+from models import Framework, JobTitle
+
+_TTL = float(os.getenv("RESOLUTION_CACHE_TTL_SECONDS", "300"))
+_MAX_ENTRIES = int(os.getenv("RESOLUTION_CACHE_MAX_ENTRIES", "5000"))
+
+department_ids = TTLCache(_MAX_ENTRIES, _TTL)
+job_title_ids = TTLCache(_MAX_ENTRIES, _TTL)
+
+
+def invalidate_departments():
+    """Drops all department mappings, and the job title mappings keyed by them."""
+    department_ids.clear()
+    job_title_ids.clear()
+
+
+def invalidate_job_titles():
+    job_title_ids.clear()
+
+
+def resolution_cache_stats() -> Dict[str, Any]:
+    return {"departments": department_ids.stats(), "job_titles": job_title_ids.stats()}
+
+
+def _department_query(department: str):
+    return select(Framework.id).where(Framework.department == department).limit(1)
+
+
+def _job_title_query(department_id: uuid.UUID, job_title: str):
+    return select(JobTitle.id).where(
+        JobTitle.job_title == job_title, JobTitle.department_id == department_id
+    ).limit(1)
+
+
+def _matches(job: Optional[JobTitle], department_id: uuid.UUID, job_title: str) -> bool:
+    return job is not None and job.department_id == department_id and job.job_title == job_title
+
+
+# -------------------- SYNC SESSIONS -------------------- #
+
+def resolve_department_id(db: Session, department: str) -> Optional[uuid.UUID]:
+    department_id = department_ids.get(department)
+    if department_id is None:
+        department_id = db.execute(_department_query(department)).scalar()
+        if department_id is not None:
+            department_ids.set(department, department_id)
+    return department_id
+
+
+def resolve_job_title_id(db: Session, department_id: uuid.UUID, job_title: str) -> Optional[uuid.UUID]:
+    key = (department_id, job_title)
+    job_id = job_title_ids.get(key)
+    if job_id is None:
+        job_id = db.execute(_job_title_query(department_id, job_title)).scalar()
+        if job_id is not None:
+            job_title_ids.set(key, job_id)
+    return job_id
+
+
+def load_job_title(db: Session, department_id: uuid.UUID, job_title: str) -> Optional[JobTitle]:
+    """The JobTitle row, fetched by primary key when its ID is cached."""
+    job_id = resolve_job_title_id(db, department_id, job_title)
+    if job_id is None:
+        return None
+    job = db.get(JobTitle, job_id)
+    if not _matches(job, department_id, job_title):
+        # Renamed or deleted since it was cached
+        job_title_ids.pop((department_id, job_title))
+        job = db.query(JobTitle).filter(JobTitle.job_title == job_title, JobTitle.department_id == department_id).first()
+    return job
+
+
+# -------------------- ASYNC SESSIONS -------------------- #
+
+async def aresolve_department_id(db, department: str) -> Optional[uuid.UUID]:
+    department_id = department_ids.get(department)
+    if department_id is None:
+        department_id = (await db.execute(_department_query(department))).scalar()
+        if department_id is not None:
+            department_ids.set(department, department_id)
+    return department_id
+
+
+async def aresolve_job_title_id(db, department_id: uuid.UUID, job_title: str) -> Optional[uuid.UUID]:
+    key = (department_id, job_title)
+    job_id = job_title_ids.get(key)
+    if job_id is None:
+        job_id = (await db.execute(_job_title_query(department_id, job_title))).scalar()
+        if job_id is not None:
+            job_title_ids.set(key, job_id)
+    return job_id
+
+
+async def aload_job_title(db, department_id: uuid.UUID, job_title: str) -> Optional[JobTitle]:
+    key = (department_id, job_title)
+    job_id = job_title_ids.get(key)
+    if job_id is not None:
+        job = await db.get(JobTitle, job_id)
+        if _matches(job, department_id, job_title):
+            return job
+        job_title_ids.pop(key)
+
+    job = (await db.execute(
+        select(JobTitle).where(JobTitle.job_title == job_title, JobTitle.department_id == department_id).limit(1)
+    )).scalars().first()
+    if job is not None:
+        job_title_ids.set(key, job.id)
+    return job
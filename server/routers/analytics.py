@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from deps import get_db, get_current_admin
+
+router = APIRouter()
+
+
+@router.get("/api/analytics/interviewer-calibration")
+def get_interviewer_calibration(
+    min_scores: int = Query(1, ge=1),
+    admin: dict = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """
+    Per-interviewer score mean, variance, z-score against everyone's scores and
+    agreement with candidates' overall recommendations, harshest first.
+    Cached and refreshed incrementally (see interviewer_calibration).
+    """
+    # pandas is only imported once someone asks for analytics
+    from interviewer_calibration import interviewer_calibration
+
+    return interviewer_calibration(db, min_scores)
@@ -1,14 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import logging
 
 # Endpoints for HR policy management
 from models import HRPolicyVersion, Policy
-from schemas import HRPolicyRequest, RefinePolicyRequest, HRPolicyVersionCreate, PolicyUploadRequest, PolicyQueryRequest
-from deps import get_db
+from schemas import (
+    HRPolicyRequest, RefinePolicyRequest, HRPolicyVersionCreate, PolicyUploadRequest, PolicyQueryRequest,
+    PolicyPage, PolicyVersionPage,
+)
+from deps import get_async_db, get_db
+from pagination import PAGE_SIZE_DEFAULT, keyset, page_size, split_page
+from responses import json_response
+from policy_index import index_policy, refresh_index, retrieve
 
-# Assume OpenAI client is initialized elsewhere and imported
-from openai_client import client
+# OpenAI calls go through the circuit breaker / deadline guard
+from llm_guard import LLMUnavailableError, chat_completion, run_blocking
 
 router = APIRouter()
 
@@ -27,7 +39,9 @@ async def refine_policy(request: RefinePolicyRequest):
         Provide the refined policy as plain text.
         """
         logging.info(f"Refining policy with prompt: {prompt}")
-        response = client.chat.completions.create(
+        response = await run_blocking(
+            chat_completion,
+            "refine_policy",
             model="gpt-3.5-turbo",
             messages=[{"role": "system", "content": "You are an expert HR policy consultant."}, {"role": "user", "content": prompt}],
             max_tokens=1200,
@@ -35,6 +49,8 @@ async def refine_policy(request: RefinePolicyRequest):
         )
         refined_policy = response.choices[0].message.content.strip()
         return {"refinedPolicy": refined_policy}
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         logging.error(f"Error refining policy document: {e}")
         raise HTTPException(status_code=500, detail="Failed to refine HR policy document.")
@@ -61,7 +77,9 @@ async def generate_policy(request: HRPolicyRequest):
         Provide the answer as plain text.
         """
         logging.info(f"Generating HR policy with prompt: {prompt}")
-        response = client.chat.completions.create(
+        response = await run_blocking(
+            chat_completion,
+            "generate_policy",
             model="gpt-3.5-turbo",
             messages=[{"role": "system", "content": "You are an HR policy expert."}, {"role": "user", "content": prompt}],
             max_tokens=1500,
@@ -69,6 +87,8 @@ async def generate_policy(request: HRPolicyRequest):
         )
         policy_document = response.choices[0].message.content.strip()
         return {"policyDocument": policy_document}
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         logging.error(f"Error generating HR policy document: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate HR policy document.")
@@ -92,71 +112,158 @@ async def save_policy_version(request: HRPolicyVersionCreate, db: Session = Depe
     return {"success": True, "version_id": new_version.id}
 
 
-@router.get("/api/get-policy-versions")
-async def get_policy_versions(business: str, policy_type: str, db: Session = Depends(get_db)):
-    versions = db.query(HRPolicyVersion).filter(
+def policy_versions_query(business: str, policy_type: str, cursor: Optional[str] = None, limit: int = PAGE_SIZE_DEFAULT,
+                          since: Optional[datetime] = None, until: Optional[datetime] = None,
+                          include_content: bool = True):
+    """The statement behind get-policy-versions (also EXPLAINed by check_query_plans.py)."""
+    columns = [HRPolicyVersion.id, HRPolicyVersion.created_at, HRPolicyVersion.business, HRPolicyVersion.policy_type]
+    if include_content:
+        columns.append(HRPolicyVersion.draft_content)
+    stmt = select(*columns).where(
         HRPolicyVersion.business == business,
         HRPolicyVersion.policy_type == policy_type,
-    ).order_by(HRPolicyVersion.created_at.desc()).all()
-    return {"versions": [
-        {
-            "id": version.id,
-            "draft_content": version.draft_content,
-            "created_at": version.created_at.isoformat(),
-            "business": version.business,
-            "policy_type": version.policy_type,
-        }
-        for version in versions
-    ]}
+    )
+    if since:
+        stmt = stmt.where(HRPolicyVersion.created_at >= since)
+    if until:
+        stmt = stmt.where(HRPolicyVersion.created_at < until)
+    return keyset(stmt, (HRPolicyVersion.created_at, HRPolicyVersion.id), cursor, (datetime.fromisoformat, int), limit)
 
 
-@router.get("/api/get-policies")
-async def get_policies(db: Session = Depends(get_db)):
-    policies = db.query(Policy).order_by(Policy.created_at.desc()).all()
-    return {"policies": [
-        {
-            "id": policy.id,
-            "title": policy.title,
-            "content": policy.content,
-            "created_at": policy.created_at.isoformat(),
-        }
-        for policy in policies
-    ]}
+@router.get("/api/get-policy-versions", response_model=PolicyVersionPage)
+async def get_policy_versions(
+    business: str,
+    policy_type: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_content: bool = True,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Newest first, one page at a time (follow `next_cursor`). include_content=false leaves out the draft text."""
+    limit = page_size(limit)
+    stmt = policy_versions_query(business, policy_type, cursor, limit, since, until, include_content)
+    versions, next_cursor = split_page((await db.execute(stmt)).all(), limit, lambda row: (row.created_at, row.id))
 
+    return json_response({
+        "versions": [
+            {
+                "id": version.id,
+                **({"draft_content": version.draft_content} if include_content else {}),
+                "created_at": version.created_at,
+                "business": version.business,
+                "policy_type": version.policy_type,
+            }
+            for version in versions
+        ],
+        "next_cursor": next_cursor,
+    })
 
-@router.post("/api/upload-policy")
-async def upload_policy(request: PolicyUploadRequest, db: Session = Depends(get_db)):
+
+def policies_query(cursor: Optional[str] = None, limit: int = PAGE_SIZE_DEFAULT, since: Optional[datetime] = None,
+                   until: Optional[datetime] = None, include_content: bool = True):
+    """The statement behind get-policies (also EXPLAINed by check_query_plans.py)."""
+    columns = [Policy.id, Policy.title, Policy.created_at]
+    if include_content:
+        columns.append(Policy.content)
+    stmt = select(*columns)
+    if since:
+        stmt = stmt.where(Policy.created_at >= since)
+    if until:
+        stmt = stmt.where(Policy.created_at < until)
+    return keyset(stmt, (Policy.created_at, Policy.id), cursor, (datetime.fromisoformat, int), limit)
+
+
+@router.get("/api/get-policies", response_model=PolicyPage)
+async def get_policies(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_content: bool = True,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Newest first, one page at a time (follow `next_cursor`). include_content=false leaves out the policy text."""
+    limit = page_size(limit)
+    stmt = policies_query(cursor, limit, since, until, include_content)
+    policies, next_cursor = split_page((await db.execute(stmt)).all(), limit, lambda row: (row.created_at, row.id))
+
+    return json_response({
+        "policies": [
+            {
+                "id": policy.id,
+                "title": policy.title,
+                **({"content": policy.content} if include_content else {}),
+                "created_at": policy.created_at,
+            }
+            for policy in policies
+        ],
+        "next_cursor": next_cursor,
+    })
+
+
+def _store_policy(db: Session, request: PolicyUploadRequest):
     new_policy = Policy(title=request.title, content=request.policyText)
     db.add(new_policy)
+    db.flush()
+    chunks = index_policy(db, new_policy)
     db.commit()
     db.refresh(new_policy)
-    return {"success": True, "policy_id": new_policy.id}
+    refresh_index(db)
+    return new_policy.id, len(chunks)
+
+
+@router.post("/api/upload-policy")
+async def upload_policy(request: PolicyUploadRequest, db: Session = Depends(get_db)):
+    # Chunking and the sync session block, so they run on the threadpool
+    policy_id, chunks = await run_in_threadpool(_store_policy, db, request)
+    return {"success": True, "policy_id": policy_id, "chunks": chunks}
 
 
 @router.post("/api/query-policy")
 async def query_policy(request: PolicyQueryRequest, db: Session = Depends(get_db)):
-    policies = db.query(Policy).all()
-    policies_text = "\n\n".join([f"Policy {i+1}: {p.content}" for i, p in enumerate(policies)])
+    matches = await run_in_threadpool(retrieve, db, request.query)
+    citations = [
+        {
+            "ref": i + 1,
+            "policy_id": match["policy_id"],
+            "title": match["title"],
+            "chunk_index": match["chunk_index"],
+            "score": match["score"],
+        }
+        for i, match in enumerate(matches)
+    ]
+    if not matches:
+        return {"answer": "No policy text relevant to this question was found.", "citations": []}
+
+    policies_text = "\n\n".join(
+        f"[{i + 1}] {match['title'] or 'Policy ' + str(match['policy_id'])} (section {match['chunk_index'] + 1}):\n{match['content']}"
+        for i, match in enumerate(matches)
+    )
     prompt = f"""
-    You are an HR policy expert. Here are the following policies:
+    You are an HR policy expert. Here are the relevant policy excerpts:
     {policies_text}
 
-    Answer the following question regarding these policies:
+    Answer the following question using only these excerpts:
     {request.query}
 
-    Provide a concise answer.
+    Provide a concise answer and cite the excerpts you used as [n].
     """
-    logging.info(f"Querying policies with prompt: {prompt}")
+    logging.info(f"Querying policies with {len(matches)} retrieved chunks for: {request.query}")
     try:
-        response = client.chat.completions.create(
+        response = await run_blocking(
+            chat_completion,
+            "query_policy",
             model="gpt-3.5-turbo",
             messages=[{"role": "system", "content": "You are an expert HR policy consultant."}, {"role": "user", "content": prompt}],
             max_tokens=300,
             temperature=0.7,
         )
         answer = response.choices[0].message.content.strip()
-        return {"answer": answer}
+        return {"answer": answer, "citations": citations}
+    except LLMUnavailableError:
+        raise
     except Exception as e:
         logging.error(f"Error in query-policy: {e}")
         raise HTTPException(status_code=500, detail="Failed to query policies")
-
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 import bcrypt
 import jwt
 from models import User, IPWhitelist, AuditLog
-from schemas import UserUpdateRequest, IPWhitelistRequest, SignupRequest, LoginRequest
+from schemas import UserUpdateRequest, IPWhitelistRequest, SignupRequest, LoginRequest, UserSummary
 from deps import get_db, JWT_SECRET, get_current_admin, log_admin_action
+from pagination import NEXT_CURSOR_HEADER, PAGE_SIZE_DEFAULT, keyset, page_size, split_page
+from responses import json_response
 
 router = APIRouter()
 
@@ -69,19 +75,19 @@ async def approve_user(username: str, admin: dict = Depends(get_current_admin),
 
     return {"success": True, "message": f"User {username} has been approved."}
 
-@router.get("/api/users")
+@router.get("/api/users", response_model=List[UserSummary])
 def get_users(admin: dict = Depends(get_current_admin), db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    return [
+    users = db.query(User.username, User.email, User.is_approved, User.is_suspended, User.role).all()
+    return json_response([
         {
             "username": user.username,
             "email": user.email,
             "is_approved": user.is_approved,
             "is_suspended": user.is_suspended,
-            "role": user.role.strip("'")
+            "role": user.role.strip("'") if user.role else user.role
         }
         for user in users
-    ]
+    ])
 
 @router.put("/api/users/update")
 def update_user_status(request: UserUpdateRequest, admin: dict = Depends(get_current_admin), db: Session = Depends(get_db)):
@@ -103,9 +109,33 @@ def update_user_status(request: UserUpdateRequest, admin: dict = Depends(get_cur
     db.commit()
     return {"success": True, "message": f"User {request.username} updated successfully."}
 
+def audit_logs_query(cursor: Optional[str] = None, limit: int = PAGE_SIZE_DEFAULT,
+                     since: Optional[datetime] = None, until: Optional[datetime] = None):
+    """The statement behind /api/audit-logs (also EXPLAINed by check_query_plans.py)."""
+    stmt = select(AuditLog)
+    if since:
+        stmt = stmt.where(AuditLog.timestamp >= since)
+    if until:
+        stmt = stmt.where(AuditLog.timestamp < until)
+    return keyset(stmt, (AuditLog.timestamp, AuditLog.id), cursor, (datetime.fromisoformat, int), limit)
+
+
 @router.get("/api/audit-logs")
-def get_audit_logs(admin: dict = Depends(get_current_admin), db: Session = Depends(get_db)):
-    logs = db.query(AuditLog).order_by(AuditLog.timestamp.desc()).all()
+def get_audit_logs(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    admin: dict = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Newest first, one page at a time (next cursor in the X-Next-Cursor header)."""
+    limit = page_size(limit)
+    stmt = audit_logs_query(cursor, limit, since, until)
+    logs, next_cursor = split_page(db.execute(stmt).scalars().all(), limit, lambda log: (log.timestamp, log.id))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         {
             "admin_username": log.admin_username,
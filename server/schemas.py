@@ -1,4 +1,7 @@
 # schemas.py
+from datetime import datetime
+from uuid import UUID
+
 from pydantic import BaseModel, Field
 from typing import Optional, List
 
@@ -66,3 +69,54 @@ class PolicyQueryRequest(BaseModel):
     query: str
 
 
+
+
+# --- List responses (documentation only: the endpoints return json_response, see responses.py) ---
+class FrameworkSummary(BaseModel):
+    id: UUID
+    department: Optional[str] = None
+    parent_id: Optional[UUID] = None
+    is_archived: Optional[bool] = None
+
+
+class FrameworkSearchResponse(BaseModel):
+    frameworks: List[FrameworkSummary]
+
+
+class CandidateSummary(BaseModel):
+    id: str
+    name: str
+    email: Optional[str] = None
+
+
+class UserSummary(BaseModel):
+    username: str
+    email: Optional[str] = None
+    is_approved: Optional[bool] = None
+    is_suspended: Optional[bool] = None
+    role: Optional[str] = None
+
+
+class PolicySummary(BaseModel):
+    id: int
+    title: Optional[str] = None
+    content: Optional[str] = Field(None, description="Left out when include_content=false")
+    created_at: datetime
+
+
+class PolicyPage(BaseModel):
+    policies: List[PolicySummary]
+    next_cursor: Optional[str] = None
+
+
+class PolicyVersionSummary(BaseModel):
+    id: int
+    draft_content: Optional[str] = Field(None, description="Left out when include_content=false")
+    created_at: datetime
+    business: str
+    policy_type: str
+
+
+class PolicyVersionPage(BaseModel):
+    versions: List[PolicyVersionSummary]
+    next_cursor: Optional[str] = None
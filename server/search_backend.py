@@ -0,0 +1,86 @@
+"""
+Search backend access and caching for X-ray candidate sourcing.
+
+- One long-lived, pooled `httpx.AsyncClient` is shared by all searches.
+- The backend URL is configurable, so a local fixture server can stand in
+  for the real search engine in benchmarks and tests.
+- Generated X-ray queries and parsed results are cached under a normalized
+  key, so repeated or near-identical searches skip both the OpenAI call and
+  the HTTP round-trip.
+
+Configuration (environment):
+    SEARCH_BACKEND_URL         search endpoint (https://www.google.com/search)
+    SEARCH_QUERY_PARAM         query-string parameter name (q)
+    SEARCH_TIMEOUT_SECONDS     per-request timeout (10)
+    SEARCH_MAX_CONNECTIONS     connection pool size (20)
+    XRAY_CACHE_TTL_SECONDS     generated X-ray query cache TTL (86400)
+    SEARCH_RESULTS_TTL_SECONDS parsed results cache TTL (900)
+    SEARCH_CACHE_MAX_ENTRIES   entries per cache (2000)
+"""
+import json
+import os
+import re
+from typing import Any, Dict, Optional
+
+import httpx
+
+from cache import TTLCache
+
+SEARCH_BACKEND_URL = os.getenv("SEARCH_BACKEND_URL", "https://www.google.com/search")
+SEARCH_QUERY_PARAM = os.getenv("SEARCH_QUERY_PARAM", "q")
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT_SECONDS", "10"))
+SEARCH_MAX_CONNECTIONS = int(os.getenv("SEARCH_MAX_CONNECTIONS", "20"))
+
+CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000"))
+xray_query_cache = TTLCache(CACHE_MAX_ENTRIES, float(os.getenv("XRAY_CACHE_TTL_SECONDS", "86400")))
+search_results_cache = TTLCache(CACHE_MAX_ENTRIES, float(os.getenv("SEARCH_RESULTS_TTL_SECONDS", "900")))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _normalize_text(value: str) -> str:
+    return _WHITESPACE_RE.sub(" ", value).strip().lower()
+
+
+def normalize_search(query: str, filters: Dict[str, Any]) -> str:
+    """Cache key for a search: case/whitespace-insensitive, empty filters dropped, lists sorted."""
+    normalized_filters = {}
+    for key, value in filters.items():
+        if isinstance(value, list):
+            value = sorted(_normalize_text(str(item)) for item in value if str(item).strip())
+        elif value is not None:
+            value = _normalize_text(str(value))
+        if value:
+            normalized_filters[key] = value
+    return json.dumps([_normalize_text(query), normalized_filters], sort_keys=True)
+
+
+def normalize_xray(xray_query: str) -> str:
+    return _normalize_text(xray_query)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            headers={"User-Agent": "Mozilla/5.0"},
+            timeout=SEARCH_TIMEOUT,
+            limits=httpx.Limits(max_connections=SEARCH_MAX_CONNECTIONS, max_keepalive_connections=SEARCH_MAX_CONNECTIONS),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def fetch_search_page(xray_query: str) -> httpx.Response:
+    return await get_http_client().get(SEARCH_BACKEND_URL, params={SEARCH_QUERY_PARAM: xray_query})
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {"xray_queries": xray_query_cache.stats(), "search_results": search_results_cache.stats()}
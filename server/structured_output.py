@@ -0,0 +1,301 @@
+"""
+Schema-enforced structured output for OpenAI chat completions.
+
+Requests are made with function calling against a declared pydantic schema, so
+the model returns arguments instead of free text. The result is validated and,
+when only part of it is invalid (a missing field, a malformed list item), a
+follow-up request repairs just that part instead of regenerating everything.
+Parse outcomes are counted per schema so the failure rate can be monitored.
+"""
+import copy
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field, ValidationError, create_model
+from pydantic.fields import SHAPE_LIST
+
+from llm_guard import chat_completion
+
+
+class StructuredOutputError(Exception):
+    """Raised when a structured response cannot be produced or repaired."""
+
+
+# -------------------- SCHEMAS -------------------- #
+
+class GeneratedInterviewQuestion(BaseModel):
+    competency: str = Field(..., min_length=1, description="Competency the question assesses.")
+    question: str = Field(..., min_length=1, description="Primary interview question.")
+    follow_up: str = Field(..., min_length=1, description="Follow-up question.")
+
+
+class GeneratedInterviewQuestions(BaseModel):
+    """Structured interview questions for a role."""
+    questions: List[GeneratedInterviewQuestion] = Field(..., min_items=1)
+
+
+class CompetencyBreakdown(BaseModel):
+    """Brave / Owners / Inclusive summary of how a role demonstrates its competencies."""
+    Brave: str = Field(..., min_length=1, description="One sentence on how the role is Brave.")
+    Owners: str = Field(..., min_length=1, description="One sentence on how the role shows Ownership.")
+    Inclusive: str = Field(..., min_length=1, description="One sentence on how the role is Inclusive.")
+
+
+class AnswerAssessment(BaseModel):
+    index: int = Field(..., ge=0, description="Index of the question/answer pair being scored.")
+    score: int = Field(..., ge=1, le=4, description="Score from 1 (Poor) to 4 (Great).")
+    explanation: str = Field(..., min_length=1, description="Why the score was given.")
+
+
+class SuggestedAnswer(BaseModel):
+    score: int = Field(..., ge=1, le=4, description="Score this example answer deserves, 1 (Poor) to 4 (Great).")
+    answer: str = Field(..., min_length=1, description="Example candidate answer.")
+
+
+class AnswerRubric(BaseModel):
+    """Scored example answers for an interview question."""
+    answers: List[SuggestedAnswer] = Field(..., min_items=1, max_items=4)
+
+
+class AnswerAssessmentBatch(BaseModel):
+    """Scores and explanations for a batch of interview answers."""
+    assessments: List[AnswerAssessment] = Field(..., min_items=1)
+
+
+# -------------------- PARSE METRICS -------------------- #
+
+_stats_lock = threading.Lock()
+_parse_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _record(schema_name: str, outcome: str, count: int = 1):
+    with _stats_lock:
+        stats = _parse_stats.setdefault(
+            schema_name,
+            {"requests": 0, "first_pass_ok": 0, "repaired": 0, "partial": 0, "failed": 0, "retries": 0, "repair_calls": 0},
+        )
+        stats[outcome] += count
+
+
+def get_parse_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns per-schema parse counters together with the first-pass failure rate."""
+    with _stats_lock:
+        snapshot = copy.deepcopy(_parse_stats)
+    for stats in snapshot.values():
+        requests = stats["requests"]
+        stats["parse_failure_rate"] = round(1 - stats["first_pass_ok"] / requests, 4) if requests else 0.0
+    return snapshot
+
+
+# -------------------- SCHEMA HELPERS -------------------- #
+
+def _inline_refs(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolves pydantic `$ref`/`definitions` so the schema is self-contained."""
+    schema = copy.deepcopy(schema)
+    definitions = schema.pop("definitions", {})
+
+    def resolve(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(copy.deepcopy(definitions[node["$ref"].split("/")[-1]]))
+            resolved = {}
+            for key, value in node.items():
+                if key == "title":
+                    continue
+                if key == "properties":
+                    resolved[key] = {prop: resolve(spec) for prop, spec in value.items()}
+                else:
+                    resolved[key] = resolve(value)
+            return resolved
+        if isinstance(node, list):
+            return [resolve(item) for item in node]
+        return node
+
+    return resolve(schema)
+
+
+def _function_spec(schema: Type[BaseModel]) -> Dict[str, Any]:
+    return {
+        "type": "function",
+        "function": {
+            "name": schema.__name__,
+            "description": (schema.__doc__ or f"Return a {schema.__name__} object.").strip(),
+            "parameters": _inline_refs(schema.schema()),
+        },
+    }
+
+
+def _list_item_model(schema: Type[BaseModel], field_name: str) -> Optional[Type[BaseModel]]:
+    field = schema.__fields__[field_name]
+    if field.shape == SHAPE_LIST and isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+        return field.type_
+    return None
+
+
+def _extract_payload(response) -> Dict[str, Any]:
+    """Reads the function-call arguments, falling back to JSON-mode content."""
+    message = response.choices[0].message
+    tool_calls = getattr(message, "tool_calls", None)
+    raw = tool_calls[0].function.arguments if tool_calls else (message.content or "")
+    raw = raw.strip()
+    if raw.startswith("```"):
+        raw = raw.strip("`").removeprefix("json").strip()
+    payload = json.loads(raw)
+    if not isinstance(payload, dict):
+        raise ValueError("Structured response is not a JSON object")
+    return payload
+
+
+def _call(
+    schema: Type[BaseModel],
+    messages: List[Dict[str, str]],
+    endpoint: str,
+    usage: Optional[Dict[str, int]] = None,
+    **params,
+) -> Dict[str, Any]:
+    response = chat_completion(
+        endpoint,
+        messages=messages,
+        tools=[_function_spec(schema)],
+        tool_choice={"type": "function", "function": {"name": schema.__name__}},
+        **params,
+    )
+    if usage is not None and getattr(response, "usage", None) is not None:
+        usage["total_tokens"] = usage.get("total_tokens", 0) + response.usage.total_tokens
+    return _extract_payload(response)
+
+
+def _split_invalid(schema: Type[BaseModel], payload: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str], Dict[str, List[int]]]:
+    """
+    Validates `payload` field by field. Returns the valid part, the names of invalid
+    scalar fields, and for list-of-model fields the indices of invalid items.
+    """
+    valid: Dict[str, Any] = {}
+    bad_fields: List[str] = []
+    bad_items: Dict[str, List[int]] = {}
+
+    for name, field in schema.__fields__.items():
+        item_model = _list_item_model(schema, name)
+        value = payload.get(name)
+        if item_model is not None and isinstance(value, list):
+            items, bad = [], []
+            for index, item in enumerate(value):
+                try:
+                    items.append(item_model.parse_obj(item).dict())
+                except ValidationError:
+                    bad.append(index)
+            valid[name] = items
+            if bad:
+                bad_items[name] = bad
+            elif field.validate(items, {}, loc=name)[1] is not None:
+                bad_fields.append(name)
+            continue
+        _, error = field.validate(value, {}, loc=name)
+        if error is None and name in payload:
+            valid[name] = value
+        else:
+            bad_fields.append(name)
+
+    return valid, bad_fields, bad_items
+
+
+def _repair_model(schema: Type[BaseModel], bad_fields: List[str], bad_items: Dict[str, List[int]]) -> Type[BaseModel]:
+    fields = {name: (schema.__fields__[name].outer_type_, ...) for name in bad_fields}
+    for name in bad_items:
+        fields[name] = (List[_list_item_model(schema, name)], ...)
+    return create_model(f"{schema.__name__}Repair", **fields)
+
+
+# -------------------- PUBLIC API -------------------- #
+
+def generate_structured(
+    schema: Type[BaseModel],
+    messages: List[Dict[str, str]],
+    *,
+    model: str = "gpt-3.5-turbo",
+    endpoint: str = "structured_output",
+    max_repairs: int = 2,
+    allow_partial: bool = False,
+    usage: Optional[Dict[str, int]] = None,
+    **params,
+) -> BaseModel:
+    """
+    Requests a response matching `schema` and returns it as a validated model.
+
+    Invalid fields and invalid list items are re-requested on their own, up to
+    `max_repairs` times. With `allow_partial`, list items that still fail are
+    dropped instead of raising, as long as the remaining result validates.
+    `endpoint` selects the call deadline (see llm_guard). If `usage` is given,
+    tokens spent on every call, repairs included, are added to its "total_tokens".
+    """
+    name = schema.__name__
+    _record(name, "requests")
+    params["model"] = model
+
+    payload = None
+    for _ in range(max_repairs + 1):
+        try:
+            payload = _call(schema, messages, endpoint, usage, **params)
+            break
+        except (ValueError, json.JSONDecodeError, IndexError, AttributeError) as e:
+            _record(name, "retries")
+            logging.warning(f"Unparseable {name} response, retrying: {e}")
+    if payload is None:
+        _record(name, "failed")
+        raise StructuredOutputError(f"No parseable {name} response from the model")
+
+    valid, bad_fields, bad_items = _split_invalid(schema, payload)
+    if not bad_fields and not bad_items:
+        _record(name, "first_pass_ok")
+        return schema.parse_obj(valid)
+
+    for _ in range(max_repairs):
+        _record(name, "repair_calls")
+        invalid_part = {field: payload.get(field) for field in bad_fields}
+        invalid_part.update({field: [payload[field][i] for i in indices] for field, indices in bad_items.items()})
+        repair_schema = _repair_model(schema, bad_fields, bad_items)
+        repair_messages = messages + [
+            {"role": "assistant", "content": json.dumps(payload)},
+            {
+                "role": "user",
+                "content": (
+                    "Part of your previous answer did not match the required schema: "
+                    f"{json.dumps(invalid_part)}. Return corrected values for only these parts; "
+                    "for list fields return one corrected item per invalid item, in the same order."
+                ),
+            },
+        ]
+        try:
+            repaired = _call(repair_schema, repair_messages, endpoint, usage, **params)
+        except (ValueError, json.JSONDecodeError, IndexError, AttributeError) as e:
+            logging.warning(f"Unparseable {name} repair response: {e}")
+            continue
+
+        for field in bad_fields:
+            if field in repaired:
+                payload[field] = repaired[field]
+        for field, indices in bad_items.items():
+            replacements = repaired.get(field)
+            if isinstance(replacements, list):
+                for index, replacement in zip(indices, replacements):
+                    payload[field][index] = replacement
+
+        valid, bad_fields, bad_items = _split_invalid(schema, payload)
+        if not bad_fields and not bad_items:
+            _record(name, "repaired")
+            return schema.parse_obj(valid)
+
+    if allow_partial and not bad_fields:
+        try:
+            result = schema.parse_obj(valid)
+        except ValidationError:
+            pass
+        else:
+            _record(name, "partial")
+            logging.warning(f"Dropped invalid {name} items after repair attempts: {bad_items}")
+            return result
+
+    _record(name, "failed")
+    raise StructuredOutputError(f"{name} response still invalid after {max_repairs} repair attempts")
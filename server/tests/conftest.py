@@ -0,0 +1,8 @@
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+
+
+# Lets the Postgres models create their tables on in-memory SQLite in tests
+@compiles(UUID, "sqlite")
+def _uuid_as_char(type_, compiler, **kw):
+    return "CHAR(36)"
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import re
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import main  # noqa: E402
+import structured_output  # noqa: E402
+from llm_guard import CircuitOpenError  # noqa: E402
+
+
+def _request(questions):
+    return main.BatchAnswerAssessmentRequest(answers=[
+        {"question": question, "candidate_answer": f"Answer to {question}"} for question in questions
+    ])
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Stubs the LLM: scores every item of a batch, unless the batch holds a question marked 'down'."""
+    calls = []
+
+    def chat_completion(endpoint, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        items = [(int(index), question) for index, question in re.findall(r"\[(\d+)\] Question: (.*)", prompt)]
+        calls.append([index for index, _ in items])
+        if any("down" in question for _, question in items):
+            raise CircuitOpenError("LLM circuit is open")
+        payload = {"assessments": [
+            {"index": index, "score": index % 4 + 1, "explanation": f"Scored {question}"} for index, question in items
+        ]}
+        message = SimpleNamespace(tool_calls=None, content=json.dumps(payload))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    monkeypatch.setattr(structured_output, "chat_completion", chat_completion)
+    monkeypatch.setattr(main, "ASSESS_BATCH_SIZE", 2)
+    return calls
+
+
+def _assess(request):
+    return asyncio.run(main.assess_candidate_answers(request, db=None))
+
+
+def test_answers_are_scored_in_batches_and_keep_their_order(calls):
+    result = _assess(_request([f"q{i}" for i in range(5)]))
+
+    assert sorted(calls) == [[0, 1], [2, 3], [4]]
+    assert [a["index"] for a in result["assessments"]] == [0, 1, 2, 3, 4]
+    assert [a["question"] for a in result["assessments"]] == ["q0", "q1", "q2", "q3", "q4"]
+    assert [a["score"] for a in result["assessments"]] == [1, 2, 3, 4, 1]
+    assert all(a["scored"] for a in result["assessments"])
+
+
+def test_unavailable_batch_leaves_only_its_answers_unscored(calls):
+    result = _assess(_request(["q0", "q1", "down", "q3", "q4"]))
+
+    assert [a["scored"] for a in result["assessments"]] == [True, True, False, False, True]
+    assert [a["score"] for a in result["assessments"]] == [1, 2, None, None, 1]
+    assert result["stored"] == 0
+
+
+def test_unavailable_for_every_batch_fails_the_request(calls):
+    with pytest.raises(CircuitOpenError):
+        _assess(_request(["down", "down too"]))
@@ -0,0 +1,45 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from candidate_store import CandidateStore, SqlCandidateStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    # A file database: the async methods reach it from threadpool threads
+    store = SqlCandidateStore(f"sqlite:///{tmp_path / 'candidates.db'}")
+    yield store
+    store.engine.dispose()
+
+
+def test_candidate_store_is_abstract():
+    with pytest.raises(TypeError):
+        CandidateStore()
+
+
+def test_put_many_upserts_in_one_statement(store):
+    store.put_many([{"id": "a", "name": "Ada"}, {"id": "b", "name": "Bob"}])
+
+    inserts = []
+    event.listen(store.engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT") else None)
+    store.put_many([{"id": "a", "name": "Ada L."}, {"id": "c", "name": "Cy"}, {"id": "c", "name": "Cyd"}])
+
+    assert len(inserts) == 1
+    assert store.get("a") == {"id": "a", "name": "Ada L."}
+    assert store.get("b") == {"id": "b", "name": "Bob"}
+    assert store.get("c") == {"id": "c", "name": "Cyd"}
+
+
+def test_async_methods_run_off_the_event_loop(store):
+    async def roundtrip():
+        await store.aput({"id": "a", "name": "Ada"})
+        return await store.aget("a"), await store.aget("missing")
+
+    assert asyncio.run(roundtrip()) == ({"id": "a", "name": "Ada"}, None)
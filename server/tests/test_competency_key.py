@@ -0,0 +1,36 @@
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import competency_key  # noqa: E402
+
+WORKBOOK = Path(__file__).resolve().parents[2] / "data" / "Competency Key.xlsx"
+
+
+def test_compiled_key_is_reused_until_the_workbook_changes(tmp_path, monkeypatch):
+    source = tmp_path / "key.xlsx"
+    target = tmp_path / "key.xlsx.json"
+    shutil.copy(WORKBOOK, source)
+
+    first = competency_key.load_key(str(source), str(target))
+    assert target.exists()
+    assert first.competencies and first.levels
+    assert first.markdown.startswith("## Competency Key\n### ")
+
+    parses = []
+    real_parse = competency_key.parse_workbook
+    monkeypatch.setattr(competency_key, "parse_workbook", lambda *a, **kw: parses.append(a) or real_parse(*a, **kw))
+
+    second = competency_key.load_key(str(source), str(target))
+    assert parses == []
+    assert second.markdown == first.markdown
+    assert second.snippets == first.snippets
+
+    # A different source hash recompiles
+    with open(source, "ab") as f:
+        f.write(b"\0")
+    third = competency_key.load_key(str(source), str(target))
+    assert len(parses) == 1
+    assert third.source_hash != first.source_hash
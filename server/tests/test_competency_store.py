@@ -0,0 +1,108 @@
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from competency_store import (  # noqa: E402
+    backfill, department_competency_job_titles, department_competency_rows, group_level_descriptions,
+    level_descriptions_query, sync_job_title,
+)
+from models import Base, Competency, CompetencyLevel, Framework, JobTitle  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Framework.__table__, JobTitle.__table__, Competency.__table__, CompetencyLevel.__table__,
+    ])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _competencies(ownership_l2="Drives projects"):
+    return [
+        {"name": "Ownership", "descriptions": {"L1 Junior": "Owns tasks", "L2 Mid": ownership_l2}},
+        {"name": "Communication", "descriptions": {"L1 Junior": "Explains clearly", "L3 Senior": "Aligns teams"}},
+    ]
+
+
+def test_backfill_and_level_filter_in_sql(db):
+    department_id, job_id = uuid.uuid4(), uuid.uuid4()
+    db.add(Framework(id=department_id, department="Engineering"))
+    db.add(JobTitle(id=job_id, department_id=department_id, job_title="Engineer", competencies=_competencies()))
+    db.commit()
+
+    assert backfill(db) == 2
+    db.commit()
+    assert backfill(db) == 0
+
+    rows = db.execute(level_descriptions_query(job_id, "L1")).all()
+    assert group_level_descriptions(rows) == [
+        {"name": "Ownership", "descriptions": {"L1 Junior": "Owns tasks"}},
+        {"name": "Communication", "descriptions": {"L1 Junior": "Explains clearly"}},
+    ]
+    rows = db.execute(level_descriptions_query(job_id, "L3")).all()
+    assert group_level_descriptions(rows) == [{"name": "Communication", "descriptions": {"L3 Senior": "Aligns teams"}}]
+
+    assert department_competency_job_titles(db, department_id) == [
+        {"competency": "Communication", "job_titles": ["Engineer"]},
+        {"competency": "Ownership", "job_titles": ["Engineer"]},
+    ]
+
+
+def test_sync_only_rewrites_changed_competencies(db):
+    job = JobTitle(id=uuid.uuid4(), job_title="Engineer", competencies=_competencies())
+    sync_job_title(db, job)
+    db.add(job)
+    db.commit()
+    db.query(Competency).filter(Competency.name == "Communication").one().category = "Soft Skills"
+    db.commit()
+
+    ownership_id = db.query(Competency.id).filter(Competency.name == "Ownership").scalar()
+    writes = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        words = statement.split()
+        table = words[1] if words[0] == "UPDATE" else words[2]
+        if words[0] in ("INSERT", "UPDATE", "DELETE") and table in ("competencies", "competency_levels"):
+            writes.append((words[0], table, parameters))
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    job.competencies = _competencies(ownership_l2="Leads projects")
+    sync_job_title(db, job)
+    db.commit()
+
+    # Only Ownership's level rows are replaced; the competencies rows and Communication are untouched
+    assert {(verb, table) for verb, table, _ in writes} == {("INSERT", "competency_levels"), ("DELETE", "competency_levels")}
+    assert all(params[0] == ownership_id for verb, _, params in writes if verb == "INSERT")
+    ownership = db.query(Competency).filter(Competency.name == "Ownership").one()
+    assert [(level.level, level.description) for level in ownership.levels] == [
+        ("L1 Junior", "Owns tasks"), ("L2 Mid", "Leads projects"),
+    ]
+    communication = db.query(Competency).filter(Competency.name == "Communication").one()
+    assert communication.category == "Soft Skills"
+    assert db.query(CompetencyLevel).count() == 4
+
+
+def test_department_rows_do_not_load_levels(db):
+    department_id = uuid.uuid4()
+    db.add(Framework(id=department_id, department="Engineering"))
+    db.add(JobTitle(id=uuid.uuid4(), department_id=department_id, job_title="Engineer", competencies=_competencies()))
+    db.commit()
+    backfill(db)
+    db.commit()
+    db.expunge_all()
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    rows = department_competency_rows(db, department_id)
+    assert [row.name for row in rows] == ["Ownership", "Communication"]
+    assert not any("competency_levels" in statement for statement in statements)
@@ -0,0 +1,65 @@
+import sys
+import uuid
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from data_migrations import drop_seeded_trends, migrate_existing_competencies, normalize_competencies, run_once
+from models import Base, Competency, CompetencyEvolution, CompetencyLevel, CompetencyTrend, DataMigration, JobTitle
+
+
+def test_migrate_existing_competencies_runs_once():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        JobTitle.__table__, Competency.__table__, CompetencyLevel.__table__,
+        CompetencyEvolution.__table__, DataMigration.__table__,
+    ])
+    db = sessionmaker(bind=engine)()
+    db.add_all(
+        JobTitle(id=uuid.uuid4(), job_title=f"Role {i}", competencies=[
+            {"name": "Ownership", "descriptions": {"L1": "Owns tasks"}},
+            {"name": f"Skill {i}", "descriptions": {}},
+        ])
+        for i in range(3)
+    )
+    db.add(CompetencyEvolution(competency_name="Ownership", job_title="Role 0", job_level="N/A"))
+    db.commit()
+
+    assert run_once(db, "normalize_competencies", normalize_competencies)
+    assert run_once(db, "migrate_existing_competencies", migrate_existing_competencies)
+    initial = db.query(CompetencyEvolution).filter(CompetencyEvolution.change_type == "Initial Record").all()
+    assert sorted((r.competency_name, r.job_title) for r in initial) == [
+        ("Ownership", "Role 1"), ("Ownership", "Role 2"),
+        ("Skill 0", "Role 0"), ("Skill 1", "Role 1"), ("Skill 2", "Role 2"),
+    ]
+    assert {r.new_value for r in initial if r.competency_name == "Ownership"} == {"{'L1': 'Owns tasks'}"}
+    assert db.get(DataMigration, "migrate_existing_competencies").details == {"result": 5}
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert not run_once(db, "migrate_existing_competencies", migrate_existing_competencies)
+    assert len(statements) == 1
+
+    db.close()
+    engine.dispose()
+
+
+def test_drop_seeded_trends_keeps_rollups():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[CompetencyTrend.__table__, DataMigration.__table__])
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        CompetencyTrend(competency_name="Ownership", department="Sales", year=2025, month=3, average_score=0),
+        CompetencyTrend(competency_name="Ownership", department="Sales", year=2026, month=9, average_score=3.0,
+                        score_sum=6.0, score_count=2),
+    ])
+    db.commit()
+
+    assert run_once(db, "drop_seeded_trends", drop_seeded_trends)
+    assert [(t.year, t.score_count) for t in db.query(CompetencyTrend)] == [(2026, 2)]
+
+    db.close()
+    engine.dispose()
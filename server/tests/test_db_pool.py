@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from db_pool import InstrumentedQueuePool, pool_stats
+
+
+def test_pool_stats_count_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+    held = engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 1
+    assert stats["checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_ms"] >= 50
+
+    held.close()
+    assert pool_stats(engine)["checked_out"] == 0
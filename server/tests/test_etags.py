@@ -0,0 +1,88 @@
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from deps import AppSession, get_db  # noqa: E402
+from etags import conditional, etag_matches  # noqa: E402
+from models import Base, DataVersion, Framework, JobTitle, ScorecardEntry  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        DataVersion.__table__, Framework.__table__, JobTitle.__table__, ScorecardEntry.__table__,
+    ])
+    session = sessionmaker(bind=engine, class_=AppSession)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _version(db, name):
+    row = db.get(DataVersion, name)
+    return row.version if row else 0
+
+
+def test_writes_bump_only_their_scope(db):
+    department_id = uuid.uuid4()
+    db.add(Framework(id=department_id, department="Engineering"))
+    db.commit()
+    assert _version(db, "frameworks") == 1
+
+    job = JobTitle(id=uuid.uuid4(), department_id=department_id, job_title="Engineer")
+    db.add(job)
+    db.commit()
+    job.job_title = "Senior Engineer"
+    db.commit()
+    assert _version(db, "frameworks") == 3
+
+    db.add(ScorecardEntry(candidate_id=uuid.uuid4(), skill="s", score=3))
+    db.commit()
+    assert _version(db, "frameworks") == 3
+    assert _version(db, "interview_questions") == 0
+
+
+def test_matching_if_none_match_returns_304(db):
+    app = FastAPI()
+    calls = []
+
+    @app.get("/departments", dependencies=[Depends(conditional("frameworks"))])
+    def departments():
+        calls.append(1)
+        return {"departments": []}
+
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+
+    first = client.get("/departments")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"]
+
+    cached = client.get("/departments", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert len(calls) == 1
+
+    db.add(Framework(id=uuid.uuid4(), department="Sales"))
+    db.commit()
+    changed = client.get("/departments", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+
+def test_if_none_match_parsing():
+    etag = 'W/"1-frameworks3"'
+    assert etag_matches('"1-frameworks3"', etag)
+    assert etag_matches('W/"other", W/"1-frameworks3"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"1-frameworks2"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,107 @@
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from framework_queries import categorized_framework, interview_job_titles
+from models import Base, CompetencyEvolution, Framework, JobDescription, JobTitle
+from resolution_cache import invalidate_departments, load_job_title, resolve_department_id, resolution_cache_stats
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Framework.__table__, JobTitle.__table__, JobDescription.__table__, CompetencyEvolution.__table__,
+    ])
+    session = sessionmaker(bind=engine)()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    session.statements = statements
+    invalidate_departments()
+    yield session
+    session.close()
+    engine.dispose()
+    invalidate_departments()
+
+
+def _seed(db, department, job_count):
+    framework = Framework(id=uuid.uuid4(), department=department)
+    db.add(framework)
+    for i in range(job_count):
+        job = JobTitle(id=uuid.uuid4(), department_id=framework.id, job_title=f"{department} role {i}", competencies=[])
+        db.add(job)
+        if i % 2 == 0:
+            db.add(JobDescription(job_title_id=job.id, description=f"description {i}"))
+    db.commit()
+
+
+@pytest.mark.parametrize("job_count", [1, 5, 40])
+def test_interview_job_titles_statement_count_is_constant(db, job_count):
+    _seed(db, "Engineering", job_count)
+    db.statements.clear()
+
+    job_titles = interview_job_titles(db, "Engineering")
+
+    assert len(db.statements) == 2
+    assert len(job_titles) == job_count
+    described = [job for job in job_titles if job["job_description"]]
+    assert len(described) == (job_count + 1) // 2
+
+
+def test_interview_job_titles_unknown_department(db):
+    assert interview_job_titles(db, "Missing") is None
+
+
+def test_resolution_cache_skips_lookups_until_invalidated(db):
+    _seed(db, "Sales", 2)
+    department_id = resolve_department_id(db, "Sales")
+    assert load_job_title(db, department_id, "Sales role 1").job_title == "Sales role 1"
+    db.expunge_all()
+    db.statements.clear()
+
+    assert resolve_department_id(db, "Sales") == department_id
+    assert load_job_title(db, department_id, "Sales role 1") is not None
+    assert len(db.statements) == 1  # job title by primary key only
+    assert resolution_cache_stats()["departments"]["hits"] == 1
+
+    db.query(JobTitle).filter(JobTitle.job_title == "Sales role 1").update({"job_title": "Sales lead"})
+    db.commit()
+    assert load_job_title(db, department_id, "Sales role 1") is None
+
+    invalidate_departments()
+    db.statements.clear()
+    assert resolve_department_id(db, "Sales") == department_id
+    assert len(db.statements) == 1
+    assert resolve_department_id(db, "Unknown") is None
+
+
+@pytest.mark.parametrize("job_count", [2, 20])
+def test_categorized_framework_statement_count_is_constant(db, job_count):
+    framework = Framework(id=uuid.uuid4(), department="Product")
+    db.add(framework)
+    for i in range(job_count):
+        competencies = [{"name": f"Skill {j}", "descriptions": {}} for j in range(10)]
+        db.add(JobTitle(id=uuid.uuid4(), department_id=framework.id, job_title=f"Role {i}", competencies=competencies))
+    db.add_all(
+        CompetencyEvolution(competency_name=f"Skill {j}", category="Core" if j % 2 else "Leadership") for j in range(9)
+    )
+    db.add(CompetencyEvolution(competency_name="Skill 1", category="Ignored: not the first record"))
+    framework_id = framework.id
+    db.commit()
+    db.statements.clear()
+
+    result = categorized_framework(db, framework_id, ["Core", "Growth"])
+
+    assert len(db.statements) == 3
+    grouped = result["competencies_by_category"]
+    assert grouped["Growth"] == []
+    assert len(grouped["Core"]) == 4 * job_count
+    assert len(grouped["Leadership"]) == 5 * job_count
+    assert len(grouped["Uncategorized"]) == job_count  # "Skill 9" has no record
+    assert categorized_framework(db, uuid.uuid4(), []) is None
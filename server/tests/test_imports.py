@@ -4,9 +4,33 @@ MODULES = [
     "server.main",
     "server.ashbyapi",
     "server.deps",
+    "server.db_pool",
+    "server.framework_queries",
+    "server.resolution_cache",
+    "server.check_query_plans",
+    "server.pagination",
+    "server.data_migrations",
+    "server.competency_key",
+    "server.competency_store",
+    "server.trend_rollups",
+    "server.responses",
+    "server.bench_serialization",
+    "server.migrate",
+    "server.bench_startup",
     "server.openai_client",
+    "server.candidate_summaries",
+    "server.search_backend",
+    "server.candidate_store",
+    "server.answer_suggestions",
+    "server.policy_index",
+    "server.llm_guard",
+    "server.structured_output",
     "server.routers.users",
     "server.routers.policies",
+    "server.routers.analytics",
+    "server.interviewer_calibration",
+    "server.etags",
+    "server.compression",
 ]
 
 def test_modules_importable():
@@ -0,0 +1,71 @@
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import interviewer_calibration  # noqa: E402
+from interviewer_calibration import CalibrationCache, calibration_stats, pair_totals, recommendation_by_candidate  # noqa: E402
+from models import InterviewFeedback, ScorecardEntry  # noqa: E402
+
+
+def test_stats_match_direct_computation():
+    interviewers = ["harsh"] * 8 + ["kind"] * 8
+    candidates = ["c1", "c1", "c2", "c2"] * 4
+    scores = [1, 2, 1, 2] * 2 + [4, 4, 3, 4] * 2
+    recommendations = recommendation_by_candidate(["c1", "c2", "c2"], ["Strong No", "Yes", "StrongYes"])
+
+    stats = calibration_stats(pair_totals(interviewers, candidates, scores), recommendations)
+    rows = {row["interviewer"]: row for row in stats["interviewers"]}
+
+    assert stats["overall"]["entries"] == 16
+    assert stats["overall"]["mean"] == pytest.approx(np.mean(scores))
+    assert rows["harsh"]["mean"] == pytest.approx(1.5)
+    assert rows["harsh"]["variance"] == pytest.approx(np.var([1, 2] * 4, ddof=1), abs=1e-4)
+    expected_z = (1.5 - np.mean(scores)) / (np.std(scores) / np.sqrt(8))
+    assert rows["harsh"]["z_score"] == pytest.approx(expected_z, abs=1e-4)
+    assert rows["harsh"]["calibration"] == "harsh"
+    assert stats["interviewers"][0]["interviewer"] == "harsh"
+    # harsh is below the mean on both: agrees with the "Strong No" on c1, not the "Yes" on c2
+    assert rows["harsh"]["agreement"] == 0.5
+    assert rows["kind"]["agreement"] == 0.5
+
+
+def test_cache_fetches_only_new_entries(monkeypatch):
+    engine = create_engine("sqlite://")
+    ScorecardEntry.__table__.create(engine)
+    InterviewFeedback.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    monkeypatch.setattr(interviewer_calibration, "CACHE_SECONDS", 0)
+    candidate = uuid.uuid4()
+    old = datetime.utcnow() - timedelta(hours=1)
+    db.add_all(ScorecardEntry(candidate_id=candidate, skill="s", score=score, interviewer_id="a", created_at=old)
+               for score in (2, 4))
+    db.commit()
+
+    cache = CalibrationCache()
+    assert cache.get(db)["overall"]["entries"] == 2
+    watermark = cache.watermark
+
+    db.add(ScorecardEntry(candidate_id=candidate, skill="s", score=3, interviewer_id="b", created_at=old + timedelta(minutes=30)))
+    db.commit()
+    # Created before the watermark: a refresh does not re-read the table
+    assert cache.get(db)["overall"]["entries"] == 2
+    assert cache.watermark > watermark
+
+    db.add(ScorecardEntry(candidate_id=candidate, skill="s", score=3, interviewer_id="b",
+                          created_at=cache.watermark + timedelta(seconds=1)))
+    db.commit()
+    monkeypatch.setattr(interviewer_calibration, "LAG", timedelta(0))
+    result = cache.get(db)
+    assert result["overall"]["entries"] == 3
+    assert sorted(row["interviewer"] for row in result["interviewers"]) == ["a", "b"]
+
+    db.close()
+    engine.dispose()
@@ -0,0 +1,24 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import llm_guard  # noqa: E402
+
+
+def test_half_open_probe_settles_when_the_client_cannot_load(monkeypatch):
+    breaker = llm_guard.CircuitBreaker("probe-model")
+    breaker.state, breaker.opened_at = "open", time.monotonic() - llm_guard.BREAKER_COOLDOWN - 1
+    monkeypatch.setitem(llm_guard._breakers, "probe-model", breaker)
+    monkeypatch.setitem(sys.modules, "openai_client", None)  # importing it raises ImportError
+
+    with pytest.raises(ImportError):
+        llm_guard.chat_completion("test", model="probe-model", messages=[])
+
+    # The failed probe re-opened the breaker instead of leaving it half-open with a probe "in flight"
+    assert breaker.state == "open" and not breaker._probe_in_flight
+    breaker.opened_at -= llm_guard.BREAKER_COOLDOWN + 1
+    assert breaker.allow()
@@ -0,0 +1,86 @@
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pagination
+from models import AuditLog, Base
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, keyset, page_size, split_page
+from routers.users import get_audit_logs
+
+TYPES = (datetime.fromisoformat, int)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[AuditLog.__table__])
+    session = sessionmaker(bind=engine)()
+    start = datetime(2025, 1, 1)
+    # Pairs of rows share a timestamp, so the id tie-breaker matters
+    session.add_all(
+        AuditLog(admin_username="admin", action="approve", timestamp=start + timedelta(minutes=i // 2))
+        for i in range(25)
+    )
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _page(db, cursor, limit):
+    stmt = keyset(select(AuditLog), (AuditLog.timestamp, AuditLog.id), cursor, TYPES, limit)
+    return split_page(db.execute(stmt).scalars().all(), limit, lambda log: (log.timestamp, log.id))
+
+
+def test_keyset_pages_cover_every_row_once_newest_first(db):
+    seen, cursor = [], None
+    while True:
+        page, cursor = _page(db, cursor, 10)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert len(seen) == 25
+    assert len({log.id for log in seen}) == 25
+    keys = [(log.timestamp, log.id) for log in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_page_size_is_capped_and_bad_cursor_is_rejected():
+    assert page_size(None) >= 1
+    assert page_size(10 ** 6) == page_size(10 ** 7)
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not-a-cursor", TYPES)
+    assert error.value.status_code == 400
+
+
+def test_null_sort_keys_page_first_and_exactly_once(db):
+    db.add_all(AuditLog(admin_username="admin", action="legacy") for _ in range(7))
+    db.flush()
+    # Rows written before the column had a default
+    db.query(AuditLog).filter(AuditLog.action == "legacy").update({"timestamp": None})
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = _page(db, cursor, 4)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert len(seen) == len({log.id for log in seen}) == 32
+    assert all(log.timestamp is None for log in seen[:7])
+    assert all(log.timestamp is not None for log in seen[7:])
+
+
+def test_endpoints_page_by_default(db, monkeypatch):
+    monkeypatch.setattr(pagination, "PAGE_SIZE_DEFAULT", 10)
+    response = Response()
+    logs = get_audit_logs(response, cursor=None, limit=None, since=None, until=None, admin={}, db=db)
+    assert len(logs) == 10
+    assert response.headers[NEXT_CURSOR_HEADER]
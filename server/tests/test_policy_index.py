@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import policy_index as policy_index_module  # noqa: E402
+from models import Base, Policy, PolicyChunk  # noqa: E402
+from policy_index import BM25Index, chunk_text, refresh_index  # noqa: E402
+
+
+def test_chunks_overlap_and_cover_text():
+    text = "\n\n".join(" ".join(f"p{i}w{j}" for j in range(70)) for i in range(4))
+    chunks = chunk_text(text, max_words=100, overlap=20)
+    assert all(len(chunk.split()) <= 100 for chunk in chunks)
+    assert set(text.split()) == set(" ".join(chunks).split())
+
+
+def test_bm25_ranks_relevant_chunk_first():
+    index = BM25Index()
+    index.add(1, 1, "Leave", 0, "Annual leave entitlement is 25 days per year.")
+    index.add(2, 2, "Expenses", 0, "Travel expenses must be approved by a line manager.")
+    results = index.search("how many days of annual leave do I get")
+    assert results[0]["policy_id"] == 1
+
+
+def test_refresh_picks_up_late_chunks_and_evicts_removed_policies(monkeypatch):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Policy.__table__, PolicyChunk.__table__])
+    db = sessionmaker(bind=engine)()
+    index = BM25Index()
+    index.backfilled = True  # chunks are written by hand below
+    monkeypatch.setattr(policy_index_module, "policy_index", index)
+
+    db.add_all([Policy(id=1, title="Leave", content="x"), Policy(id=2, title="Expenses", content="x")])
+    db.add(PolicyChunk(id=5, policy_id=2, chunk_index=0, content="Travel expenses need approval."))
+    db.commit()
+    refresh_index(db)
+
+    # A lower id committed after a higher one was indexed
+    db.add(PolicyChunk(id=3, policy_id=1, chunk_index=0, content="Annual leave is 25 days."))
+    db.commit()
+    refresh_index(db)
+    assert index.search("annual leave")[0]["policy_id"] == 1
+
+    db.query(PolicyChunk).filter(PolicyChunk.policy_id == 2).delete()
+    db.query(Policy).filter(Policy.id == 1).update({"title": "Holiday"})
+    db.commit()
+    refresh_index(db)
+    assert index.chunk_ids() == {3}
+    assert index.search("travel expenses") == []
+    assert index.search("annual leave")[0]["title"] == "Holiday"
+    assert "travel" not in index.postings
+
+    # Nothing changed: only the watermark is read
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    refresh_index(db)
+    assert len(statements) == 1
+    db.close()
+    engine.dispose()
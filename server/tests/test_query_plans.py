@@ -0,0 +1,36 @@
+import inspect
+import sys
+import uuid
+from pathlib import Path
+
+from sqlalchemy.dialects import postgresql
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from check_query_plans import CHECKS, Explain, seq_scans  # noqa: E402
+
+
+def test_seq_scans_reports_nested_checked_tables_only():
+    plan = {"Plan": {
+        "Node Type": "Hash Join",
+        "Plans": [
+            {"Node Type": "Seq Scan", "Relation Name": "job_descriptions"},
+            {"Node Type": "Hash", "Plans": [
+                {"Node Type": "Index Scan", "Relation Name": "job_titles"},
+                {"Node Type": "Seq Scan", "Relation Name": "frameworks"},
+            ]},
+        ],
+    }}
+    assert seq_scans(plan) == ["job_descriptions"]
+
+
+def test_checks_compile_the_endpoint_statements_for_postgres():
+    samples = {
+        "department_id": uuid.uuid4(), "job_title_id": uuid.uuid4(), "candidate_id": uuid.uuid4(),
+        "competency_name": "Ownership", "job_level": "L2",
+        "question_id": 1, "business": "Acme", "policy_type": "Leave",
+    }
+    for endpoint, build, _ in CHECKS:
+        arguments = {name: samples[name] for name in inspect.signature(build).parameters}
+        sql = str(Explain(build(**arguments)).compile(dialect=postgresql.dialect()))
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT"), endpoint
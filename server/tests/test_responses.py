@@ -0,0 +1,20 @@
+import json
+import sys
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from responses import json_response  # noqa: E402
+
+
+def test_json_response_matches_default_encoding():
+    content = {
+        "frameworks": [{"id": uuid.uuid4(), "department": "Engineering", "parent_id": None, "is_archived": False}],
+        "created_at": datetime(2026, 10, 19, 12, 0, 0, 123456),
+        "tags": {"a"},
+    }
+    assert json.loads(json_response(content).body) == jsonable_encoder(content)
@@ -1,5 +1,79 @@
+import gzip
 import os
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from compression import CompressionMiddleware, SPAStaticFiles, precompress  # noqa: E402
+import main  # noqa: E402
+
 
 def test_frontend_path():
     path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'client_build')
     assert os.path.basename(path) == 'client_build'
+
+
+def _client(build_dir):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/api/items")
+    def items(count: int):
+        return {"items": [{"name": f"item {i}"} for i in range(count)]}
+
+    app.mount("/", SPAStaticFiles(directory=str(build_dir)), name="frontend")
+    return TestClient(app)
+
+
+def _build(tmp_path):
+    (tmp_path / "static" / "js").mkdir(parents=True)
+    (tmp_path / "index.html").write_text("<html>" + "app " * 100 + "</html>")
+    (tmp_path / "static" / "js" / "main.bc7907e8.js").write_text("console.log('hello');" * 100)
+    return tmp_path
+
+
+def test_api_json_is_compressed_above_threshold(tmp_path):
+    client = _client(_build(tmp_path))
+
+    large = client.get("/api/items", params={"count": 50}, headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.json()["items"][49] == {"name": "item 49"}
+
+    small = client.get("/api/items", params={"count": 1}, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    identity = client.get("/api/items", params={"count": 50}, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+
+
+def test_precompressed_assets_and_spa_fallback(tmp_path):
+    build = _build(tmp_path)
+    assert precompress(str(build), minimum_size=100) >= 2
+    client = _client(build)
+
+    asset = client.get("/static/js/main.bc7907e8.js", headers={"Accept-Encoding": "gzip"})
+    assert asset.headers["content-encoding"] == "gzip"
+    assert asset.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert asset.headers.get_list("vary") == ["Accept-Encoding"]
+    assert "javascript" in asset.headers["content-type"]
+    assert int(asset.headers["content-length"]) == len(gzip.compress(asset.content, compresslevel=9, mtime=0))
+
+    route = client.get("/frameworks/engineering", headers={"Accept-Encoding": "identity"})
+    assert route.status_code == 200 and route.text.startswith("<html>")
+    assert route.headers["cache-control"] == "no-cache"
+
+    assert client.get("/static/js/missing.js").status_code == 404
+    assert client.get("/api/missing").status_code == 404
+
+
+def test_root_serves_the_frontend():
+    client = TestClient(main.create_app())
+    root = client.get("/")
+    assert root.status_code == 200 and root.headers["content-type"].startswith("text/html")
+    with open(os.path.join(os.path.dirname(main.__file__), "client_build", "index.html"), "rb") as index:
+        assert root.content == index.read()
+    assert client.get("/api/health").json() == {"status": "OK"}
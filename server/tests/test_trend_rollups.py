@@ -0,0 +1,76 @@
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from models import (  # noqa: E402
+    Base, Candidate, CompetencyTrend, Framework, JobTitle, RollupWatermark, ScorecardEntry,
+)
+from trend_rollups import rebuild_trends, rollup_trends  # noqa: E402
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Framework.__table__, JobTitle.__table__, Candidate.__table__, ScorecardEntry.__table__,
+        CompetencyTrend.__table__, RollupWatermark.__table__,
+    ])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _trends(db):
+    return sorted(
+        (t.competency_name, t.department, t.year, t.month, t.average_score, t.score_count)
+        for t in db.query(CompetencyTrend)
+    )
+
+
+def test_rollup_is_incremental(db):
+    engineering, sales = uuid.uuid4(), uuid.uuid4()
+    job_id = uuid.uuid4()
+    db.add_all([
+        Framework(id=engineering, department="Engineering"),
+        Framework(id=sales, department="Sales"),
+        JobTitle(id=job_id, department_id=sales, job_title="AE"),
+    ])
+    direct, via_job, unplaced = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    db.add_all([
+        Candidate(id=direct, name="A", department_id=engineering),
+        Candidate(id=via_job, name="B", job_id=job_id),
+        Candidate(id=unplaced, name="C"),
+    ])
+    created = NOW - timedelta(hours=1)
+    db.add_all([
+        ScorecardEntry(candidate_id=direct, skill="Ownership", score=2, submitted_at=datetime(2026, 9, 30), created_at=created),
+        ScorecardEntry(candidate_id=direct, skill="Ownership", score=4, submitted_at=datetime(2026, 9, 2), created_at=created),
+        ScorecardEntry(candidate_id=via_job, skill="Ownership", score=3, created_at=created),
+        ScorecardEntry(candidate_id=unplaced, skill="Ownership", score=1, created_at=created),
+        # Too recent: left for the next run
+        ScorecardEntry(candidate_id=direct, skill="Ownership", score=5, submitted_at=datetime(2026, 9, 15), created_at=NOW),
+    ])
+    db.commit()
+
+    assert rollup_trends(db, now=NOW) == 2
+    assert _trends(db) == [
+        ("Ownership", "Engineering", 2026, 9, 3.0, 2),
+        ("Ownership", "Sales", 2026, 10, 3.0, 1),
+    ]
+    assert rollup_trends(db, now=NOW) == 0
+
+    assert rollup_trends(db, now=NOW + timedelta(hours=1)) == 1
+    assert _trends(db)[0] == ("Ownership", "Engineering", 2026, 9, 11 / 3, 3)
+
+    assert rebuild_trends(db, now=NOW + timedelta(hours=1)) == 2
+    assert _trends(db)[0] == ("Ownership", "Engineering", 2026, 9, 11 / 3, 3)
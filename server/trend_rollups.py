@@ -0,0 +1,170 @@
+"""
+Incremental rollup of scorecard scores into competency_trends.
+
+Each run aggregates only the scorecard entries created since the previous run
+(its watermark in `rollup_watermarks`), grouped by competency (the scorecard
+skill), department and month, and adds the sums and counts into the matching
+competency_trends rows (inserting new ones). /api/get-trends-over-time then
+reads one row per competency, department and month instead of raw scorecards.
+
+Entries are picked up once they are ROLLUP_LAG_SECONDS old, so a transaction
+that was still open when a run started is not skipped. The watermark row is
+locked for the duration of a run, so concurrent runs (several workers)
+serialize instead of double counting.
+
+The department is the candidate's, or else that of the candidate's job.
+Entries whose candidate has neither are not counted.
+
+    python trend_rollups.py            # run once
+    python trend_rollups.py --rebuild  # recompute all rollups from scratch
+
+Configuration (environment):
+    TREND_ROLLUP_INTERVAL_SECONDS  how often the app runs the rollup (900)
+    TREND_ROLLUP_LAG_SECONDS       minimum age of an entry before it is counted (300)
+"""
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import extract, func, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import Candidate, CompetencyTrend, Framework, JobTitle, RollupWatermark, ScorecardEntry
+
+ROLLUP_INTERVAL = float(os.getenv("TREND_ROLLUP_INTERVAL_SECONDS", "900"))
+ROLLUP_LAG = timedelta(seconds=float(os.getenv("TREND_ROLLUP_LAG_SECONDS", "300")))
+WATERMARK_NAME = "competency_trends"
+EPOCH = datetime(1970, 1, 1)
+
+TrendKey = Tuple[str, str, int, int]  # (competency_name, department, year, month)
+
+
+def _lock_watermark(db: Session) -> Optional[RollupWatermark]:
+    watermark = db.query(RollupWatermark).filter(RollupWatermark.name == WATERMARK_NAME).with_for_update().first()
+    if watermark is not None:
+        return watermark
+    try:
+        watermark = RollupWatermark(name=WATERMARK_NAME, processed_until=EPOCH)
+        db.add(watermark)
+        db.flush()  # a concurrent first run fails here and leaves this one to the other process
+    except IntegrityError:
+        db.rollback()
+        return None
+    return watermark
+
+
+def _aggregate(db: Session, after: datetime, until: datetime) -> Dict[TrendKey, Tuple[float, int]]:
+    """Score sum and count per trend key for entries created in (after, until]."""
+    scored_at = func.coalesce(ScorecardEntry.submitted_at, ScorecardEntry.created_at)
+    year = extract("year", scored_at)
+    month = extract("month", scored_at)
+    rows = (
+        db.query(
+            ScorecardEntry.skill, Framework.department, year, month,
+            func.sum(ScorecardEntry.score), func.count(ScorecardEntry.score),
+        )
+        .join(Candidate, Candidate.id == ScorecardEntry.candidate_id)
+        .outerjoin(JobTitle, JobTitle.id == Candidate.job_id)
+        .join(Framework, Framework.id == func.coalesce(Candidate.department_id, JobTitle.department_id))
+        .filter(
+            ScorecardEntry.created_at > after,
+            ScorecardEntry.created_at <= until,
+            ScorecardEntry.score.isnot(None),
+            ScorecardEntry.skill.isnot(None),
+        )
+        .group_by(ScorecardEntry.skill, Framework.department, year, month)
+        .all()
+    )
+    return {
+        (skill, department, int(row_year), int(row_month)): (float(total), int(count))
+        for skill, department, row_year, row_month, total, count in rows
+    }
+
+
+def _upsert(db: Session, aggregates: Dict[TrendKey, Tuple[float, int]]) -> None:
+    """Adds the aggregates into existing trend rows (one query to find them) or inserts new rows."""
+    periods = {(year, month) for _, _, year, month in aggregates}
+    existing: Dict[TrendKey, CompetencyTrend] = {}
+    for trend in (
+        db.query(CompetencyTrend)
+        .filter(
+            tuple_(CompetencyTrend.year, CompetencyTrend.month).in_(periods),
+            CompetencyTrend.competency_name.in_({key[0] for key in aggregates}),
+            CompetencyTrend.department.in_({key[1] for key in aggregates}),
+        )
+        .order_by(CompetencyTrend.id)
+    ):
+        # Older seeding may have left duplicates; the first row carries the totals
+        existing.setdefault((trend.competency_name, trend.department, trend.year, trend.month), trend)
+
+    for key, (total, count) in aggregates.items():
+        trend = existing.get(key)
+        if trend is None:
+            competency_name, department, year, month = key
+            trend = CompetencyTrend(competency_name=competency_name, department=department, year=year, month=month)
+            db.add(trend)
+        trend.score_sum = (trend.score_sum or 0) + total
+        trend.score_count = (trend.score_count or 0) + count
+        trend.average_score = trend.score_sum / trend.score_count
+
+
+def rollup_trends(db: Session, now: Optional[datetime] = None) -> int:
+    """Processes scorecard entries since the watermark. Returns the number of trend rows touched."""
+    until = (now or datetime.utcnow()) - ROLLUP_LAG
+    watermark = _lock_watermark(db)
+    if watermark is None or watermark.processed_until >= until:
+        db.rollback()
+        return 0
+
+    aggregates = _aggregate(db, watermark.processed_until, until)
+    if aggregates:
+        _upsert(db, aggregates)
+    watermark.processed_until = until
+    db.commit()
+    return len(aggregates)
+
+
+def rebuild_trends(db: Session, now: Optional[datetime] = None) -> int:
+    """Clears the rollup totals and the watermark, then aggregates everything again."""
+    db.query(CompetencyTrend).filter(CompetencyTrend.score_count.isnot(None)).update(
+        {CompetencyTrend.score_sum: None, CompetencyTrend.score_count: None, CompetencyTrend.average_score: 0},
+        synchronize_session=False,
+    )
+    db.query(RollupWatermark).filter(RollupWatermark.name == WATERMARK_NAME).delete()
+    db.commit()
+    return rollup_trends(db, now)
+
+
+async def rollup_trends_periodically(session_factory):
+    """Background loop started by the app; the work runs off the event loop."""
+    loop = asyncio.get_running_loop()
+
+    def run():
+        with session_factory() as db:
+            return rollup_trends(db)
+
+    while True:
+        try:
+            touched = await loop.run_in_executor(None, run)
+            if touched:
+                logging.info(f"📈 Rolled up scorecards into {touched} competency trend rows.")
+        except Exception as e:
+            logging.error(f"❌ Competency trend rollup failed: {e}")
+        await asyncio.sleep(ROLLUP_INTERVAL)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Roll scorecard scores up into competency_trends.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute every rollup from scratch")
+    args = parser.parse_args()
+
+    from deps import SessionLocal
+
+    with SessionLocal() as session:
+        count = rebuild_trends(session) if args.rebuild else rollup_trends(session)
+    print(f"Updated {count} competency trend rows.")
@@ -1,2 +1,10 @@
 #!/bin/sh
+set -e
+
+# Migrations are a release step (see migrate.py); replicas start serving right away.
+# RUN_MIGRATIONS=1 runs them here first, for single-instance setups.
+if [ "${RUN_MIGRATIONS:-0}" = "1" ]; then
+    python migrate.py
+fi
+
 exec uvicorn main:app --host 0.0.0.0 --port ${PORT:-8000}